@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import io
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.images.models import ImageCandidate, ImageManifest, VerifiedDate
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+SEED = 1234
+IMAGE_SIZE = (1600, 1200)
+CELEBRITY = "Synthetic Person"
+BIRTH_YEAR = 1970
+END_YEAR = 2025
+
+
+# ---------------------------------------------------------------------
+# IMAGES
+# ---------------------------------------------------------------------
+
+
+@lru_cache(maxsize=512)
+def synthetic_jpeg(name: str, year: int, size: tuple = IMAGE_SIZE) -> bytes:
+    """
+    Deterministic JPEG (seeded by name) with a face-like shape and EXIF
+    dates for `year`; same bytes on every run.
+    """
+    rng = random.Random(f"{SEED}:{name}")
+    w, h = size
+
+    img = Image.new("RGB", size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(w), rng.randrange(h)
+        r = rng.randrange(10, max(11, w // 6))
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
+
+    # Face-ish: skin oval, eyes, mouth
+    cx, cy, fw, fh = w // 2, h // 2, w // 6, h // 4
+    draw.ellipse((cx - fw, cy - fh, cx + fw, cy + fh), fill=(224, 180, 150))
+    for dx in (-fw // 2, fw // 2):
+        draw.ellipse((cx + dx - 15, cy - fh // 3 - 10, cx + dx + 15, cy - fh // 3 + 10), fill=(40, 30, 30))
+    draw.rectangle((cx - fw // 3, cy + fh // 2, cx + fw // 3, cy + fh // 2 + 8), fill=(150, 60, 60))
+
+    stamp = f"{year:04d}:{rng.randrange(1, 13):02d}:{rng.randrange(1, 29):02d} 12:00:00"
+    exif = Image.Exif()
+    exif[0x0132] = stamp  # DateTime
+    exif.get_ifd(0x8769)[0x9003] = stamp  # DateTimeOriginal
+
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=85, exif=exif)
+    return buf.getvalue()
+
+
+def write_corpus(out_dir: Path, count: int) -> List[Path]:
+    """
+    Write `count` synthetic JPEGs spread over the celebrity's timeline.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+    for i in range(count):
+        year = BIRTH_YEAR + 10 + i % (END_YEAR - BIRTH_YEAR - 10)
+        p = out_dir / f"{i:04d}_synthetic_{year}.jpg"
+        if not p.exists():
+            p.write_bytes(synthetic_jpeg(p.stem, year))
+        paths.append(p)
+    return paths
+
+
+# ---------------------------------------------------------------------
+# MANIFESTS
+# ---------------------------------------------------------------------
+
+
+def synthetic_manifest(count: int) -> ImageManifest:
+    """
+    Large manifest with seeded years/confidences/face scores for
+    anchor-selection timing; no files are touched.
+    """
+    rng = random.Random(SEED)
+    cands: List[ImageCandidate] = []
+
+    for i in range(count):
+        year = rng.randrange(BIRTH_YEAR + 10, END_YEAR + 1)
+        verified = rng.random() < 0.6
+        cands.append(
+            ImageCandidate(
+                source=rng.choice(["wikimedia", "bing", "imdb"]),
+                title=f"synthetic {i}",
+                image_url=f"https://example.invalid/{i}.jpg",
+                local_path=f"images/raw/synthetic/{i:05d}.jpg",
+                verified=verified,
+                verified_date=VerifiedDate(
+                    date=f"{year}-06-01",
+                    year=year,
+                    method="exif:DateTimeOriginal",
+                    confidence=round(rng.uniform(0.8, 0.99), 3),
+                )
+                if verified
+                else None,
+                meta={
+                    "query_year": year,
+                    "face_quality": round(rng.random(), 3),
+                    "width": rng.choice([800, 1600, 3000]),
+                    "height": rng.choice([600, 1200, 2000]),
+                },
+            )
+        )
+
+    return ImageManifest(
+        celebrity_name=CELEBRITY,
+        celebrity_slug="synthetic_person",
+        target_year_end=END_YEAR,
+        candidates=cands,
+        verified_count=sum(1 for c in cands if c.verified),
+    )
+
+
+# ---------------------------------------------------------------------
+# FACE EMBEDDINGS
+# ---------------------------------------------------------------------
+
+
+def write_embeddings(root: Path, count: int, identities: int = 2000) -> np.ndarray:
+    """
+    EmbeddingStore file of `count` rows: tight clusters around
+    `identities` random centres (several photos per person). Returns the
+    vectors for use as queries.
+    """
+    from src.face.identity import RECORD
+
+    rng = np.random.default_rng(SEED)
+    centres = rng.normal(0.0, 0.15, (identities, RECORD["vec"].shape[0]))
+    X = centres[rng.integers(0, identities, count)]
+    X += rng.normal(0.0, 0.02, X.shape)
+
+    recs = np.zeros(count, dtype=RECORD)
+    recs["key"] = [i.to_bytes(20, "big") for i in range(count)]
+    recs["vec"] = X
+    root.mkdir(parents=True, exist_ok=True)
+    recs.tofile(root / "embeddings.f16")
+    return X.astype(np.float32)
+
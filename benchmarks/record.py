@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+
+import requests
+
+from src.config.settings import settings
+
+from .stub_server import FIXTURES_DIR, fixture_key
+
+
+def record(url: str) -> str:
+    """
+    Fetch a live response and store it as a replay fixture; the stub
+    server serves it instead of the synthetic response for the same key.
+    """
+    r = requests.get(url, headers={"User-Agent": settings.user_agent}, timeout=30)
+    key = fixture_key("GET", url)
+
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    (FIXTURES_DIR / f"{key}.json").write_text(
+        json.dumps(
+            {
+                "url": url,
+                "status": r.status_code,
+                "headers": {"Content-Type": r.headers.get("Content-Type", "")},
+                "body_b64": base64.b64encode(r.content).decode("ascii"),
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    return key
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="benchmarks.record")
+    parser.add_argument("urls", nargs="+", help="Full request URLs (with query)")
+    args = parser.parse_args()
+
+    for url in args.urls:
+        print(f"📼 {record(url)} ← {url}")
+
+
+if __name__ == "__main__":
+    main()
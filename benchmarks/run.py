@@ -0,0 +1,386 @@
+"""
+Offline benchmark suite.
+
+    python -m benchmarks.run                    # run + compare to baseline
+    python -m benchmarks.run --update-baseline  # store current numbers
+    python -m benchmarks.run --faces DIR        # face stages on real photos
+
+Each result records the parameters it was measured with; only results
+whose parameters match the baseline's are compared.
+
+All HTTP goes to a local stub server (benchmarks/stub_server.py). It
+replays recorded fixtures and synthesizes deterministic responses for
+everything else. Images come from a seeded synthetic corpus
+(benchmarks/corpus.py). Stages whose dependencies are missing (dlib model,
+MediaPipe) are reported as skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from src.utils.filesystem import read_json, write_json
+
+from .corpus import (
+    BIRTH_YEAR,
+    CELEBRITY,
+    END_YEAR,
+    synthetic_manifest,
+    write_corpus,
+    write_embeddings,
+)
+from .stub_server import replay
+
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+RESULTS_PATH = Path("output/benchmarks/latest.json")
+
+DEFAULT_TOLERANCE = 0.25  # relative slowdown tolerated before flagging
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+Result = Dict[str, Any]
+
+
+# ---------------------------------------------------------------------
+# HELPERS
+# ---------------------------------------------------------------------
+
+
+def _result(value: float, unit: str, better: str, **extra: Any) -> Result:
+    return {"value": round(value, 4), "unit": unit, "better": better, **extra}
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+@contextmanager
+def _workspace() -> Iterator[Path]:
+    """
+    Collector paths are relative to CWD; run inside a throwaway tree.
+    """
+    prev = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="ageflow-bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            os.chdir(prev)
+
+
+@contextmanager
+def _unthrottled() -> Iterator[None]:
+    """
+    Benchmarks time our code, not host pacing: lift the per-host limits
+    and keep limiter state in-process.
+    """
+    from src.utils import rate_limit
+
+    saved = (dict(rate_limit.HOST_LIMITS), rate_limit.DEFAULT_LIMIT, rate_limit._limiter)
+    for host in rate_limit.HOST_LIMITS:
+        rate_limit.HOST_LIMITS[host] = (1e6, 1e6)
+    rate_limit.DEFAULT_LIMIT = (1e6, 1e6)
+    rate_limit._limiter = rate_limit.HostRateLimiter(shared=False)
+    try:
+        yield
+    finally:
+        rate_limit.HOST_LIMITS.clear()
+        rate_limit.HOST_LIMITS.update(saved[0])
+        rate_limit.DEFAULT_LIMIT, rate_limit._limiter = saved[1], saved[2]
+
+
+# ---------------------------------------------------------------------
+# BENCHMARKS
+# ---------------------------------------------------------------------
+
+
+def bench_anchor_selection(n: int) -> Result:
+    from src.images.anchor_selector import select_anchors
+
+    manifest = synthetic_manifest(n)
+    t = _best_of(lambda: select_anchors(manifest, BIRTH_YEAR), repeat=5)
+    return _result(t, "s", "lower", candidates=n)
+
+
+def bench_collector() -> Result:
+    from src.images.collector import collect_images_for_celebrity
+
+    with _workspace(), _unthrottled(), replay() as server:
+        t0 = time.perf_counter()
+        manifest = collect_images_for_celebrity(
+            celebrity_name=CELEBRITY,
+            birth_year=BIRTH_YEAR,
+            target_year_end=END_YEAR,
+            force=True,
+        )
+        elapsed = time.perf_counter() - t0
+
+    return _result(
+        elapsed,
+        "s",
+        "lower",
+        requests=server.requests,
+        mb_served=round(server.bytes_sent / 1e6, 2),
+        candidates=len(manifest.candidates),
+        verified=manifest.verified_count,
+    )
+
+
+def bench_download(n: int) -> Result:
+    from src.images.downloader import download_file
+
+    with _workspace() as tmp, _unthrottled(), replay() as server:
+        t0 = time.perf_counter()
+        for i in range(n):
+            download_file(
+                f"https://images.bing-synthetic.test/dl{2000 + i % 20}n{i}.jpg",
+                tmp / f"{i}.jpg",
+            )
+        elapsed = time.perf_counter() - t0
+
+    return _result(
+        server.bytes_sent / 1e6 / elapsed,
+        "MB/s",
+        "higher",
+        images_per_sec=round(n / elapsed, 2),
+    )
+
+
+def bench_exif(paths: List[Path]) -> Result:
+    from src.images.exif import extract_exif_date
+
+    t = _best_of(lambda: [extract_exif_date(p) for p in paths], repeat=3)
+    return _result(len(paths) / t, "img/s", "higher")
+
+
+def bench_face_filter(paths: List[Path]) -> Result:
+    from src.face.quality_filter import FaceQualityFilter
+    from src.utils.image_io import clear_cache
+
+    face_filter = FaceQualityFilter()
+    clear_cache()
+    # Fresh analysis cache: time detection, not persisted-analysis hits
+    with _workspace():
+        t0 = time.perf_counter()
+        for p in paths:
+            face_filter.check(p)
+        elapsed = time.perf_counter() - t0
+    return _result(len(paths) / elapsed, "img/s", "higher")
+
+
+def bench_face_detection(paths: List[Path], backend: str) -> Result:
+    """
+    Detector throughput on decoded images (decode not timed), plus recall
+    against HOG: of the images where HOG finds a face, the share where
+    this backend finds one too.
+    """
+    from src.face.detector import get_detector
+    from src.utils.image_io import LoadedImage, clear_cache, load_image
+
+    clear_cache()
+    images: List[LoadedImage] = [im for im in map(load_image, paths) if im is not None]
+
+    def run(name: str) -> List[bool]:
+        det = get_detector(name)
+        found: List[bool] = []
+        for i in range(0, len(images), det.batch_size):
+            found += [bool(f) for f in det.detect(images[i : i + det.batch_size])]
+        return found
+
+    get_detector(backend)  # model load is not timed
+    t = _best_of(lambda: run(backend), repeat=3)
+    found = run(backend)
+
+    extra: Dict[str, Any] = {"found": sum(found), "images": len(images)}
+    if backend != "hog":
+        try:
+            hog = run("hog")
+        except ImportError:
+            hog = []
+        if any(hog):
+            both = sum(1 for h, f in zip(hog, found) if h and f)
+            extra["recall_vs_hog"] = round(both / sum(hog), 3)
+    return _result(len(images) / t, "img/s", "higher", **extra)
+
+
+def bench_alignment(paths: List[Path]) -> Result:
+    from src.morphing.align import align_face
+    from src.utils.image_io import clear_cache
+
+    clear_cache()
+    with _workspace():
+        t0 = time.perf_counter()
+        for p in paths:
+            try:
+                align_face(str(p))
+            except RuntimeError:
+                pass  # synthetic faces may not be found; the pass is still timed
+        elapsed = time.perf_counter() - t0
+    return _result(len(paths) / elapsed, "img/s", "higher")
+
+
+def bench_embedding_search(n: int) -> Result:
+    from src.face.embedding_index import IVF_MIN_ROWS, EmbeddingIndex
+
+    with _workspace() as tmp:
+        X = write_embeddings(tmp / "emb", n)
+        index = EmbeddingIndex(tmp / "emb")
+        index.within(X[0], 0.55)  # load (+ IVF build at IVF_MIN_ROWS+)
+
+        queries = X[:: max(1, n // 200)]
+        t = _best_of(lambda: [index.within(q, 0.55) for q in queries], repeat=3)
+    mode = "ivf" if n >= IVF_MIN_ROWS else "exact"
+    return _result(t / len(queries) * 1000, "ms/query", "lower", rows=n, mode=mode)
+
+
+# ---------------------------------------------------------------------
+# RUNNER
+# ---------------------------------------------------------------------
+
+
+def run_all(quick: bool, faces_dir: Optional[Path] = None) -> Dict[str, Result]:
+    n_images = 10 if quick else 30
+    results: Dict[str, Result] = {}
+
+    corpus_dir = Path(tempfile.gettempdir()) / "ageflow-bench-corpus"
+    corpus = write_corpus(corpus_dir, n_images)
+    # Synthetic faces only time the face stages; real photos give recall
+    faces = corpus
+    if faces_dir is not None:
+        faces = sorted(
+            p for p in faces_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES
+        )
+
+    n_candidates = 2000 if quick else 20000
+    n_rows = 20_000 if quick else 100_000
+    face_params = {
+        "corpus": "synthetic" if faces_dir is None else str(faces_dir),
+        "images": len(faces),
+    }
+
+    # name → (benchmark, the parameters its number depends on)
+    suite: Dict[str, Tuple[Callable[[], Result], Dict[str, Any]]] = {
+        "anchor_selection": (
+            lambda: bench_anchor_selection(n_candidates),
+            {"candidates": n_candidates},
+        ),
+        "collector_end_to_end": (bench_collector, {}),
+        "download_throughput": (
+            lambda: bench_download(n_images),
+            {"images": n_images},
+        ),
+        "exif_dates": (lambda: bench_exif(corpus), {"images": n_images}),
+        "face_filter": (lambda: bench_face_filter(faces), face_params),
+        "face_detect_hog": (lambda: bench_face_detection(faces, "hog"), face_params),
+        "face_detect_ssd": (lambda: bench_face_detection(faces, "ssd"), face_params),
+        "face_detect_yunet": (
+            lambda: bench_face_detection(faces, "yunet"),
+            face_params,
+        ),
+        "alignment": (lambda: bench_alignment(faces), face_params),
+        "embedding_search": (
+            lambda: bench_embedding_search(n_rows),
+            {"rows": n_rows},
+        ),
+    }
+
+    for name, (fn, params) in suite.items():
+        try:
+            results[name] = {**fn(), "params": params}
+        except (ImportError, FileNotFoundError) as e:
+            results[name] = {"skipped": str(e)}
+        print(f"  {name:<22} {_fmt(results[name])}")
+
+    return results
+
+
+def _fmt(r: Result) -> str:
+    if "skipped" in r:
+        return f"skipped ({r['skipped']})"
+    extra = ", ".join(f"{k}={v}" for k, v in r.items() if k not in ("value", "unit", "better", "params"))
+    return f"{r['value']} {r['unit']}" + (f"  [{extra}]" if extra else "")
+
+
+def compare(
+    results: Dict[str, Result], baseline: Dict[str, Result], tolerance: float
+) -> List[str]:
+    """
+    Names of benchmarks that regressed beyond `tolerance` vs baseline.
+    Numbers measured with different parameters (--quick, --faces) are
+    not comparable and are reported as skipped.
+    """
+    regressions: List[str] = []
+    for name, r in results.items():
+        base: Optional[Result] = baseline.get(name)
+        if "value" not in r or not base or "value" not in base or not base["value"]:
+            continue
+        if r.get("params") != base.get("params"):
+            print(
+                f"  ⚠️ {name:<22} not compared: params {r.get('params')} "
+                f"vs baseline {base.get('params')}"
+            )
+            continue
+
+        ratio = r["value"] / base["value"]
+        worse = ratio > 1 + tolerance if r["better"] == "lower" else ratio < 1 - tolerance
+        mark = "❌" if worse else "✅"
+        print(f"  {mark} {name:<22} {base['value']} → {r['value']} {r['unit']} (x{ratio:.2f})")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="benchmarks.run")
+    parser.add_argument("--quick", action="store_true", help="Smaller corpus")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Store results as baseline"
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--faces", type=Path, help="Folder of real photos for the face stages"
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    print("🏁 Benchmarks")
+    results = run_all(args.quick, args.faces)
+    write_json(RESULTS_PATH, results)
+
+    if args.update_baseline:
+        write_json(BASELINE_PATH, results)
+        print(f"📌 Baseline updated → {BASELINE_PATH}")
+        return
+
+    baseline = read_json(BASELINE_PATH, default={}) or {}
+    if not baseline:
+        print("ℹ️ No baseline yet; run with --update-baseline")
+        return
+
+    print("\n📊 vs baseline")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .corpus import CELEBRITY, synthetic_jpeg
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Query params that never take part in fixture keys
+_VOLATILE_PARAMS = {"api_key"}
+
+_YEAR_RE = re.compile(r"(19\d\d|20\d\d)")
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+# ---------------------------------------------------------------------
+# FIXTURE KEYS (shared with record.py)
+# ---------------------------------------------------------------------
+
+
+def fixture_key(method: str, url: str) -> str:
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query) if k not in _VOLATILE_PARAMS
+    )
+    raw = f"{method.upper()} {parts.hostname}{parts.path}?{urlencode(query)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def load_fixture(method: str, url: str) -> Optional[Response]:
+    p = FIXTURES_DIR / f"{fixture_key(method, url)}.json"
+    if not p.exists():
+        return None
+    data = json.loads(p.read_text(encoding="utf-8"))
+    return data["status"], data.get("headers", {}), base64.b64decode(data["body_b64"])
+
+
+# ---------------------------------------------------------------------
+# SYNTHETIC RESPONSES
+# ---------------------------------------------------------------------
+
+
+def _json(payload: object) -> Response:
+    return 200, {"Content-Type": "application/json"}, json.dumps(payload).encode()
+
+
+def _html(body: str) -> Response:
+    return 200, {"Content-Type": "text/html; charset=utf-8"}, body.encode()
+
+
+def _year_in(text: str, default: int = 2000) -> int:
+    m = _YEAR_RE.search(text)
+    return int(m.group(1)) if m else default
+
+
+def _file_slug(title: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", title.replace("File:", "")).strip("-")
+
+
+def _commons(q: Dict[str, str]) -> Response:
+    if q.get("list") == "search":
+        query = q.get("srsearch", "").replace("filetype:bitmap", "").strip()
+        limit = int(q.get("srlimit", 10))
+        year = _year_in(query, 0)
+
+        if year:
+            # Every third year has nothing, so the planner sees misses
+            n = 0 if year % 3 == 0 else min(limit, 4)
+            titles = [f"File:{CELEBRITY} {year} {i}.jpg" for i in range(n)]
+        else:
+            titles = [
+                f"File:{CELEBRITY} {1985 + 4 * i} broad.jpg" for i in range(min(limit, 8))
+            ]
+        return _json({"query": {"search": [{"title": t, "ns": 6} for t in titles]}})
+
+    if "imageinfo" in q.get("prop", ""):
+        pages = {}
+        for i, title in enumerate(q.get("titles", "").split("|")):
+            slug = _file_slug(title)
+            year = _year_in(title)
+            ii = {
+                "url": f"https://upload.wikimedia.org/synthetic/{slug}.jpg",
+                "width": 1600,
+                "height": 1200,
+                "extmetadata": {
+                    "DateTimeOriginal": {"value": f"{year}-06-01 12:00:00"}
+                },
+            }
+            if q.get("iiurlwidth"):
+                ii["thumburl"] = f"https://upload.wikimedia.org/thumb/{slug}.jpg"
+            pages[str(-1 - i)] = {
+                "title": title,
+                "fullurl": f"https://commons.wikimedia.org/wiki/{quote(title)}",
+                "imageinfo": [ii],
+            }
+        return _json({"query": {"pages": pages}})
+
+    return _json({})
+
+
+def _wikipedia(q: Dict[str, str]) -> Response:
+    images = [{"title": f"File:{CELEBRITY} portrait {y}.jpg"} for y in (1995, 2005, 2015)]
+    return _json({"query": {"pages": {"1": {"title": q.get("titles"), "images": images}}}})
+
+
+def _imdb(path: str) -> Response:
+    if path.startswith("/find"):
+        return _html('<div class="result_text"><a href="/name/nm0000001/">x</a></div>')
+    imgs = "".join(
+        f'<img src="https://m.media-amazon.com/images/M/imdb{1990 + 2 * i}n{i}_V1_.jpg">'
+        for i in range(20)
+    )
+    return _html(f"<html><body>{imgs}</body></html>")
+
+
+def _bing(q: Dict[str, str]) -> Response:
+    query = q.get("q", "")
+    year = _year_in(query)
+    murls = ",".join(
+        f'"murl":"https://images.bing-synthetic.test/bing{year}n{i}.jpg"' for i in range(5)
+    )
+    return _html(f"<html><script>var d=[{{{murls}}}];</script></html>")
+
+
+def _image(name: str, thumb: bool) -> Response:
+    size = (800, 600) if thumb else (1600, 1200)
+    body = synthetic_jpeg(name, _year_in(name), size)
+    return 200, {"Content-Type": "image/jpeg", "Accept-Ranges": "bytes"}, body
+
+
+def synthetic_response(host: str, path: str, q: Dict[str, str]) -> Response:
+    if host == "commons.wikimedia.org" and path.startswith("/wiki/Special:FilePath/"):
+        return _image(_file_slug(unquote(path.rsplit("/", 1)[-1])), thumb=False)
+    if host == "commons.wikimedia.org":
+        return _commons(q)
+    if host == "en.wikipedia.org":
+        return _wikipedia(q)
+    if host == "www.imdb.com":
+        return _imdb(path)
+    if host == "www.bing.com":
+        return _bing(q)
+    if path.lower().endswith((".jpg", ".jpeg")):
+        name = path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+        return _image(name, thumb=path.startswith("/thumb/"))
+    return 404, {"Content-Type": "text/plain"}, b"no fixture"
+
+
+# ---------------------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StubServer"
+
+    def log_message(self, format: str, *args: object) -> None:  # quiet
+        pass
+
+    def _respond(self, head_only: bool) -> None:
+        # Path is /<original host>/<original path>?<query>
+        _, host, rest = self.path.split("/", 2)
+        original = f"https://{host}/{rest}"
+        parts = urlsplit(original)
+
+        fixture = load_fixture(self.command, original)
+        if fixture is not None:
+            status, headers, body = fixture
+        else:
+            status, headers, body = synthetic_response(
+                host, parts.path, dict(parse_qsl(parts.query))
+            )
+
+        total = len(body)
+        rng = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if status == 200 and rng:
+            start = int(rng.group(1))
+            end = min(int(rng.group(2)) if rng.group(2) else total - 1, total - 1)
+            body = body[start : end + 1]
+            status = 206
+            headers = {**headers, "Content-Range": f"bytes {start}-{end}/{total}"}
+
+        self.send_response(status)
+        for k, v in headers.items():
+            if k.lower() not in ("content-length", "transfer-encoding", "content-encoding"):
+                self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if not head_only:
+            self.wfile.write(body)
+        self.server.record(len(body) if not head_only else 0)
+
+    def do_GET(self) -> None:
+        self._respond(head_only=False)
+
+    def do_HEAD(self) -> None:
+        self._respond(head_only=True)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def record(self, n: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += n
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _ReplayAdapter(HTTPAdapter):
+    """
+    Sends every request to the stub server, keeping the original host as
+    the first path segment.
+    """
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(pool_maxsize=32)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):  # type: ignore[override]
+        parts = urlsplit(request.url)
+        request.url = f"{self.base_url}/{parts.hostname}{parts.path}" + (
+            f"?{parts.query}" if parts.query else ""
+        )
+        return super().send(request, **kwargs)
+
+
+@contextmanager
+def replay() -> Iterator[StubServer]:
+    """
+    Run the stub server and route all `requests` traffic through it.
+    """
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    adapter = _ReplayAdapter(server.base_url)
+    original = requests.Session.get_adapter
+    requests.Session.get_adapter = lambda self, url: adapter  # type: ignore[assignment]
+    try:
+        yield server
+    finally:
+        requests.Session.get_adapter = original  # type: ignore[assignment]
+        server.shutdown()
+        server.server_close()
+
+
+def fixture_files() -> List[Path]:
+    return sorted(FIXTURES_DIR.glob("*.json"))
@@ -1,21 +1,98 @@
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
-import shutil
 import sys
+from typing import Dict, Optional, Tuple
 
 import cv2
-import numpy as np
 
-from src.face.quality_filter import FaceQualityFilter
+from src.face.analysis import derive_analysis, save_analysis
+from src.face.detector import DETECTORS
+from src.face.embedding_index import embedding_index
+from src.face.identity import IdentityReference, IdentityVerifier, load_reference
+from src.face.processed_index import ProcessedIndex
+from src.face.quality_filter import FaceCheck, FaceQualityFilter, FaceQualityResult
+from src.utils.filesystem import link_or_copy
+from src.utils.metrics import metrics
+from src.utils.profiling import MODES as PROFILE_MODES, profiled
+from src.utils.resources import cap_worker_memory, peak_rss_mb
 
 
 INPUT_DIR = Path("images/raw")
 ACCEPTED_DIR = Path("faces/accepted")
 REJECTED_DIR = Path("faces/rejected")
 
-
-def main() -> None:
+SAVE_EVERY = 50  # index checkpoint interval (images processed)
+
+
+def _write_accepted(img_path: Path, celeb: str, check: FaceCheck) -> Path:
+    out_img = ACCEPTED_DIR / celeb / img_path.name
+    out_img.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(out_img), check.aligned)
+
+    # Alignment reuses this instead of detecting the face again
+    save_analysis(out_img, derive_analysis(out_img, check.analysis, check.transform))
+    return out_img
+
+
+def _drop_stale_output(index: ProcessedIndex, img_path: Path, keep: Path) -> None:
+    """
+    A changed image may flip between accepted/rejected; remove the old copy.
+    """
+    prev = index.previous(img_path)
+    if prev and prev.output and Path(prev.output) != keep:
+        Path(prev.output).unlink(missing_ok=True)
+
+
+def _identity_verifier() -> Optional[IdentityVerifier]:
+    try:
+        return IdentityVerifier()
+    except (ImportError, FileNotFoundError) as e:
+        print(f"⚠️  Identity check disabled: {e}")
+        return None
+
+
+def _identity_reason(
+    verifier: IdentityVerifier,
+    ref: Optional[IdentityReference],
+    seen: Dict[str, str],
+    img_path: Path,
+) -> Tuple[str, Optional[str]]:
+    """
+    (rejection reason or "", embedding key). Rejects faces that aren't the
+    celebrity, and repeats of a photo already accepted for this folder
+    (`seen`: key → file name).
+    """
+    key, emb = verifier.embed_with_key(img_path)
+    if emb is None:
+        return "", None
+
+    if ref is not None:
+        d = ref.distance(emb)
+        if d > ref.threshold:
+            return f"Identity mismatch (d={d:.2f})", key
+
+    # A re-checked image finds its own earlier acceptance in `seen`
+    for k in [key, *(m.key for m in embedding_index().duplicates_of(key))]:
+        other = seen.get(k)
+        if other is not None and other != img_path.name:
+            return f"Duplicate of {other}", key
+    return "", key
+
+
+def _accepted_keys(index: ProcessedIndex, celeb_dir: Path) -> Dict[str, str]:
+    """
+    Content keys of images accepted for this folder in earlier runs.
+    """
+    return {
+        e.sha1: Path(k).name
+        for k, e in index.entries.items()
+        if e.accepted and Path(k).parent == celeb_dir
+    }
+
+
+def filter_all(full: bool = False, detector: Optional[str] = None) -> None:
     print("🔍 Face filter starting...")
     print(f"📂 INPUT_DIR = {INPUT_DIR.resolve()}")
 
@@ -23,59 +100,133 @@ def main() -> None:
         print("❌ images/raw directory does NOT exist")
         sys.exit(1)
 
-    face_filter = FaceQualityFilter()
+    face_filter = FaceQualityFilter(detector=detector)
+    print(f"🧿 Face detector: {face_filter.detector}")
+    verifier = _identity_verifier()
+    index = ProcessedIndex()
 
     total_images = 0
     accepted = 0
     rejected = 0
+    unchanged = 0
+    processed = 0
+    seen: list[Path] = []
 
-    for celeb_dir in INPUT_DIR.iterdir():
+    for celeb_dir in sorted(INPUT_DIR.iterdir()):
         if not celeb_dir.is_dir():
             continue
 
         print(f"\n👤 Processing celebrity folder: {celeb_dir.name}")
 
-        images = list(celeb_dir.iterdir())
+        # Reference written by the collector; verdicts depend on it too
+        ref = load_reference(celeb_dir.name) if verifier is not None else None
+        accepted_keys = _accepted_keys(index, celeb_dir)
+        version = face_filter.version
+        if ref is not None:
+            version = f"{version}.i{ref.digest}"
+        elif verifier is not None:
+            print("⚠️  No identity reference for this folder; identity not checked")
+
+        images = sorted(celeb_dir.iterdir())
         if not images:
             print("⚠️  No images found in this folder")
             continue
 
+        pending: list[Path] = []
         for img_path in images:
             if not img_path.is_file():
                 continue
 
             total_images += 1
-
-            result, aligned = face_filter.check(img_path)
-
-            if result.ok:
-                if aligned is None:
-                    print(f"SKIPPED {img_path.name}: aligned image missing")
+            seen.append(img_path)
+
+            if not full:
+                entry = index.lookup(img_path, version)
+                if entry is not None:
+                    unchanged += 1
+                    accepted += entry.accepted
+                    rejected += not entry.accepted
                     continue
+            pending.append(img_path)
 
-                out_dir = ACCEPTED_DIR / celeb_dir.name
-                out_dir.mkdir(parents=True, exist_ok=True)
+        # Detection runs in batches over the images that need a verdict
+        for img_path, check in zip(pending, face_filter.check_many(pending)):
+            result = check.result
+            processed += 1
 
-                out_img = out_dir / img_path.name
-                cv2.imwrite(str(out_img), aligned)
+            key = None
+            if result.ok and verifier is not None:
+                reason, key = _identity_reason(verifier, ref, accepted_keys, img_path)
+                if reason:
+                    result = FaceQualityResult(False, reason)
 
+            if result.ok and check.aligned is not None:
+                out = _write_accepted(img_path, celeb_dir.name, check)
                 accepted += 1
+                if key:
+                    accepted_keys[key] = img_path.name
                 print(f"✅ ACCEPTED {img_path.name}")
-
             else:
-                out_dir = REJECTED_DIR / celeb_dir.name
-                out_dir.mkdir(parents=True, exist_ok=True)
-
-                shutil.copy(img_path, out_dir / img_path.name)
+                if result.ok:
+                    print(f"SKIPPED {img_path.name}: aligned image missing")
+                    continue
+                out = REJECTED_DIR / celeb_dir.name / img_path.name
+                link_or_copy(img_path, out)
                 rejected += 1
                 print(f"❌ REJECTED {img_path.name}: {result.reason}")
 
+            _drop_stale_output(index, img_path, out)
+            index.record(img_path, version, result.ok, result.reason, out)
+            if processed % SAVE_EVERY == 0:
+                index.save()
+
+    # Inputs deleted since the last run: drop their entries and outputs
+    pruned = index.prune(seen)
+    for entry in pruned:
+        if entry.output:
+            Path(entry.output).unlink(missing_ok=True)
+    index.save()
+
     print("\n📊 SUMMARY")
     print(f"Total images: {total_images}")
+    print(f"Processed: {processed} (unchanged, skipped: {unchanged})")
+    if pruned:
+        print(f"Removed (input deleted): {len(pruned)}")
     print(f"Accepted: {accepted}")
     print(f"Rejected: {rejected}")
+    print(f"Peak RSS: {peak_rss_mb():.0f} MB")
+    print(f"⏱️ {metrics.summary()}")
+    print(f"📈 Metrics → {metrics.export(Path('output/metrics/filter_faces'), 'filter')}")
     print("✅ Face filtering complete")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="filter_faces")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=PROFILE_MODES,
+        help="Profile the run (cprofile | sampling) → output/profiles/filter_faces/filter",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the processed-file index and re-check every image",
+    )
+    parser.add_argument(
+        "--detector",
+        choices=sorted(DETECTORS),
+        help="Face detector backend (default: FACE_DETECTOR, hog)",
+    )
+    args = parser.parse_args()
+    cap_worker_memory()
+
+    with profiled("filter", args.profile) as prof:
+        if prof is not None:
+            prof.slug = "filter_faces"
+        filter_all(full=args.full, detector=args.detector)
+
+
 if __name__ == "__main__":
     main()
@@ -24,9 +24,28 @@ class Settings:
     target_year_end: int = int(os.getenv("TARGET_YEAR_END", "2025"))
     http_timeout: int = int(os.getenv("HTTP_TIMEOUT", "20"))
     user_agent: str = os.getenv("USER_AGENT", "ageflow/1.0")
+    # Share per-host rate limits across worker processes (data/cache state file)
+    rate_limit_shared: bool = os.getenv("RATE_LIMIT_SHARED", "true").lower() == "true"
+
+    # Face processing memory bounds
+    face_max_side: int = int(os.getenv("FACE_MAX_SIDE", "1600"))
+    # Largest pixel buffer one decode may allocate; bigger files are skipped
+    max_decode_mb: int = int(os.getenv("MAX_DECODE_MB", "512"))
+    # Address-space cap per worker process (0 = unlimited)
+    worker_memory_mb: int = int(os.getenv("WORKER_MEMORY_MB", "0"))
+    # Face detector backend: hog (dlib) | ssd | yunet (OpenCV DNN, models/)
+    face_detector: str = os.getenv("FACE_DETECTOR", "hog")
+    # Max face-embedding distance to the celebrity's reference (dlib ResNet)
+    identity_max_distance: float = float(os.getenv("IDENTITY_MAX_DISTANCE", "0.55"))
+    # Date confidence of a confidently age-estimated year (EXIF/Commons: 0.93-0.98)
+    age_estimate_confidence: float = float(os.getenv("AGE_ESTIMATE_CONFIDENCE", "0.5"))
 
     # APIs
     serpapi_key: str | None = os.getenv("SERPAPI_KEY")
+    # Paid-call budgets (0 = unlimited) and per-celebrity cap
+    serpapi_daily_budget: int = int(os.getenv("SERPAPI_DAILY_BUDGET", "20"))
+    serpapi_monthly_budget: int = int(os.getenv("SERPAPI_MONTHLY_BUDGET", "100"))
+    serpapi_calls_per_celebrity: int = int(os.getenv("SERPAPI_CALLS_PER_CELEBRITY", "6"))
 
     def ensure_dirs(self) -> None:
         self.data_dir.mkdir(parents=True, exist_ok=True)
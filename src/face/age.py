@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from ..utils.image_io import SCREEN_MAX_SIDE, load_image
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .analysis import get_analysis, warp_canonical, warp_max_side
+
+
+log = get_logger("face.age")
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Levi & Hassner age classifier (Adience), run through OpenCV DNN on CPU
+MODEL_PATH = Path("models/age_net.caffemodel")
+CONFIG_PATH = Path("models/age_deploy.prototxt")
+
+INPUT_SIZE = 227
+INPUT_MEAN = (78.4263377603, 87.7689143744, 114.895847746)  # BGR
+
+# Class buckets (years) and the age each one stands for
+AGE_BUCKETS = [(0, 2), (4, 6), (8, 12), (15, 20), (25, 32), (38, 43), (48, 53), (60, 100)]
+BUCKET_AGES = np.array([1.0, 5.0, 10.0, 17.5, 28.5, 40.5, 50.5, 70.0])
+
+# Faces per forward pass
+BATCH_SIZE = 32
+
+
+@dataclass
+class AgeEstimate:
+    age: float  # expected age over the class probabilities
+    spread: float  # std of that distribution (years)
+
+
+# ---------------------------------------------------------------------
+# MODEL (lazy; needs the weights in /models)
+# ---------------------------------------------------------------------
+
+_net: Any = None
+_net_error = ""
+
+
+def _age_net() -> Any:
+    global _net, _net_error
+    if _net is None:
+        try:
+            for p in (MODEL_PATH, CONFIG_PATH):
+                if not p.exists():
+                    raise FileNotFoundError(f"Missing {p.name} in /models")
+            _net = cv2.dnn.readNet(str(MODEL_PATH), str(CONFIG_PATH))
+            _net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            _net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        except (FileNotFoundError, cv2.error) as e:
+            log.warning(f"⚠️ Age estimation unavailable: {e}")
+            _net_error = str(e)
+            _net = False
+    return _net or None
+
+
+def require_age_model() -> None:
+    if _age_net() is None:
+        raise FileNotFoundError(f"age model unavailable: {_net_error}")
+
+
+# ---------------------------------------------------------------------
+# ESTIMATOR
+# ---------------------------------------------------------------------
+
+
+def _summarize(probs: np.ndarray) -> List[AgeEstimate]:
+    """
+    Per row of class probabilities: expected age and its spread.
+    """
+    p = probs / np.maximum(probs.sum(axis=1, keepdims=True), 1e-9)
+    age = p @ BUCKET_AGES
+    var = p @ (BUCKET_AGES**2) - age**2
+    return [
+        AgeEstimate(float(a), float(np.sqrt(max(v, 0.0)))) for a, v in zip(age, var)
+    ]
+
+
+class AgeEstimator:
+    """
+    Apparent age of the face in each image, from the canonical aligned
+    crop of its persisted analysis (no second detection pass). Faces are
+    classified in batches of BATCH_SIZE per forward pass.
+    """
+
+    def __init__(self, max_side: Optional[int] = SCREEN_MAX_SIDE) -> None:
+        require_age_model()
+        self.max_side = max_side
+
+    def _aligned(self, path: Path) -> Optional[np.ndarray]:
+        a = get_analysis(path, self.max_side)
+        if a is None or a.align is None:
+            return None
+        loaded = load_image(path, warp_max_side(a.align, a.orig_size))
+        if loaded is None:
+            return None
+        return warp_canonical(loaded, a)
+
+    def estimate(self, paths: Sequence[Path | str]) -> Dict[str, AgeEstimate]:
+        """
+        Path (as given) → estimate; images without an aligned face are left out.
+        """
+        out: Dict[str, AgeEstimate] = {}
+        batch: List[str] = []
+        faces: List[np.ndarray] = []
+
+        def flush() -> None:
+            if not faces:
+                return
+            blob = cv2.dnn.blobFromImages(
+                faces, 1.0, (INPUT_SIZE, INPUT_SIZE), INPUT_MEAN, swapRB=False
+            )
+            net = _age_net()
+            with metrics.span("age_estimate"):
+                net.setInput(blob)
+                probs = np.asarray(net.forward(), dtype=np.float64).reshape(len(faces), -1)
+            out.update(zip(batch, _summarize(probs)))
+            metrics.observe("age_batch_size", len(faces))
+            batch.clear()
+            faces.clear()
+
+        for p in paths:
+            face = self._aligned(Path(p))
+            if face is None:
+                continue
+            batch.append(str(p))
+            faces.append(face)
+            if len(faces) >= BATCH_SIZE:
+                flush()
+        flush()
+        return out
@@ -4,14 +4,22 @@ import cv2
 import numpy as np
 
 
-def align_face(img, left_eye, right_eye):
+def rotation_matrix(shape, left_eye, right_eye) -> np.ndarray:
+    """
+    2x3 matrix levelling the eyes, rotating about the image centre.
+    """
     dy = right_eye[1] - left_eye[1]
     dx = right_eye[0] - left_eye[0]
     angle = np.degrees(np.arctan2(dy, dx))
 
-    h, w = img.shape[:2]
+    h, w = shape[:2]
     center = (w // 2, h // 2)
-    M = cv2.getRotationMatrix2D(center, angle, 1.0)
+    return cv2.getRotationMatrix2D(center, float(angle), 1.0)
+
+
+def align_face(img, left_eye, right_eye):
+    h, w = img.shape[:2]
+    M = rotation_matrix(img.shape, left_eye, right_eye)
 
     return cv2.warpAffine(
         img, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT
@@ -0,0 +1,543 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from pydantic import BaseModel
+
+from ..config.settings import settings
+from ..utils.filesystem import read_json, write_json
+from ..utils.image_io import SCREEN_MAX_SIDE, LoadedImage, image_size, load_image
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .align import rotation_matrix
+from .geometry import estimate_yaw, eye_tilt, face_ratio
+
+
+log = get_logger("face.analysis")
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Bump when stored analyses would come out differently (2: EXIF-oriented sizes)
+ANALYSIS_VERSION = 2
+ANALYSIS_DIR = settings.cache_dir / "face_analysis"
+
+# Canonical alignment (morphing input)
+OUTPUT_SIZE = 512
+EYE_TARGET_Y = 0.35
+EYE_DISTANCE_TARGET = 0.30 * OUTPUT_SIZE
+
+# Margin around the detected face kept for ROI work (mesh, screening
+# output); bounds buffers by face size rather than frame size.
+ROI_EXPAND = 1.0
+
+# MediaPipe FaceMesh eye contours (image-left eye first, like dlib 36-41)
+LEFT_EYE_IDX = [33, 133, 159, 145, 153, 154, 155, 173]
+RIGHT_EYE_IDX = [362, 263, 386, 374, 380, 381, 382, 398]
+
+Point = Tuple[float, float]
+Box = Tuple[int, int, int, int]
+
+
+# ---------------------------------------------------------------------
+# DATA MODEL
+# ---------------------------------------------------------------------
+
+
+class FaceAnalysis(BaseModel):
+    """
+    Everything the face stages need from one image, in original-file pixel
+    coordinates so it applies to any decode resolution.
+    """
+
+    version: int = ANALYSIS_VERSION
+    file_size: int
+    mtime_ns: int
+    max_side: Optional[int] = None
+    orig_size: Tuple[int, int]
+    detector: str = "hog"  # backend that found the face; "" = no detection ran
+
+    reason: str = ""  # why no usable face was found
+
+    roi: Optional[Box] = None  # expanded face box
+    landmarks68: Optional[List[Point]] = None  # dlib
+    mesh_eyes: Optional[Tuple[Point, Point]] = None  # MediaPipe eye centres
+
+    face_ratio: Optional[float] = None
+    yaw: Optional[float] = None
+    eye_tilt: Optional[float] = None
+    mouth_open: Optional[float] = None  # lip gap / face height
+
+    # 2x3: original pixels → canonical OUTPUT_SIZE face
+    align: Optional[List[List[float]]] = None
+
+
+# ---------------------------------------------------------------------
+# MODELS (lazy; either stack may be missing)
+# ---------------------------------------------------------------------
+
+_dlib_stack: Any = None
+_dlib_error = ""
+_mesh_model: Any = None
+
+
+def _dlib() -> Any:
+    global _dlib_stack, _dlib_error
+    if _dlib_stack is None:
+        try:
+            from .landmarks import get_landmarks
+
+            _dlib_stack = get_landmarks
+        except (ImportError, FileNotFoundError) as e:
+            log.warning(f"⚠️ dlib landmarks unavailable: {e}")
+            _dlib_error = str(e)
+            _dlib_stack = False
+    return _dlib_stack or None
+
+
+def require_dlib() -> None:
+    """
+    Raise ImportError if dlib or its landmark model is missing, for callers
+    that can't work without 68-point landmarks.
+    """
+    if _dlib() is None:
+        raise ImportError(f"dlib face stack unavailable: {_dlib_error}")
+
+
+def _mesh() -> Any:
+    global _mesh_model
+    if _mesh_model is None:
+        try:
+            from mediapipe.python.solutions import face_mesh
+
+            _mesh_model = face_mesh.FaceMesh(
+                static_image_mode=True,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.7,
+            )
+        except ImportError as e:
+            log.warning(f"⚠️ MediaPipe unavailable: {e}")
+            _mesh_model = False
+    return _mesh_model or None
+
+
+# ---------------------------------------------------------------------
+# GEOMETRY
+# ---------------------------------------------------------------------
+
+
+def _h(M: np.ndarray) -> np.ndarray:
+    return np.vstack([np.asarray(M, dtype=np.float64), [0.0, 0.0, 1.0]])
+
+
+def compose(*Ms: np.ndarray) -> np.ndarray:
+    """
+    2x3 affine applying Ms right to left (compose(A, B) = A after B).
+    """
+    out = np.eye(3)
+    for M in Ms:
+        out = out @ _h(M)
+    return out[:2]
+
+
+def _apply(M: np.ndarray, pts: np.ndarray) -> np.ndarray:
+    pts = np.asarray(pts, dtype=np.float64)
+    return pts @ np.asarray(M)[:, :2].T + np.asarray(M)[:, 2]
+
+
+def canonical_transform(left_eye: np.ndarray, right_eye: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Similarity putting the eyes level, EYE_DISTANCE_TARGET apart, centred
+    at EYE_TARGET_Y of an OUTPUT_SIZE square.
+    """
+    dx, dy = right_eye - left_eye
+    eye_dist = float(np.hypot(dx, dy))
+    if eye_dist <= 1.0:
+        return None
+
+    eyes_center = (left_eye + right_eye) / 2.0
+    M = cv2.getRotationMatrix2D(
+        center=(float(eyes_center[0]), float(eyes_center[1])),
+        angle=float(np.degrees(np.arctan2(dy, dx))),
+        scale=EYE_DISTANCE_TARGET / eye_dist,
+    )
+    M[0, 2] += OUTPUT_SIZE / 2 - float(eyes_center[0])
+    M[1, 2] += OUTPUT_SIZE * EYE_TARGET_Y - float(eyes_center[1])
+    return M
+
+
+def _measure(a: FaceAnalysis, lm: np.ndarray) -> None:
+    """
+    Screening metrics from 68 landmarks (original pixels).
+    """
+    top, bottom = lm[27], lm[8]
+    face_height = float(np.linalg.norm(top - bottom))
+
+    a.landmarks68 = [(round(float(x), 2), round(float(y), 2)) for x, y in lm]
+    a.face_ratio = float(face_ratio(top, bottom, a.orig_size[1]))
+    a.yaw = float(estimate_yaw(lm[36], lm[45], lm[30]))
+    a.eye_tilt = float(eye_tilt(lm[36], lm[45]))
+    a.mouth_open = float(np.linalg.norm(lm[62] - lm[66])) / max(face_height, 1e-6)
+
+
+def _decoded(M: List[List[float]], scale: float) -> np.ndarray:
+    """
+    Re-express an original-pixel transform for an image decoded at `scale`.
+    """
+    return compose(M, [[1.0 / scale, 0.0, 0.0], [0.0, 1.0 / scale, 0.0]])
+
+
+def warp_max_side(M: Any, orig_size: Tuple[int, int]) -> Optional[int]:
+    """
+    Decode max_side at which a warp by M (original pixels → OUTPUT_SIZE
+    canonical) never upsamples; None = full resolution. A reduced decode
+    only keeps max_side // 2, hence the doubling.
+    """
+    A = np.asarray(M, dtype=np.float64)[:, :2]
+    zoom = float(np.sqrt(abs(np.linalg.det(A))))
+    longest = max(orig_size)
+    need = 2 * int(np.ceil(zoom * longest))
+    return need if need < longest else None
+
+
+# ---------------------------------------------------------------------
+# ANALYSIS
+# ---------------------------------------------------------------------
+
+
+def analyze_face(
+    image_path: Path | str,
+    max_side: Optional[int] = SCREEN_MAX_SIDE,
+    detector: Optional[str] = None,
+) -> Optional[FaceAnalysis]:
+    """
+    Single pass over one image: face detection + dlib 68 landmarks
+    (screening), MediaPipe eye centres on the face ROI (alignment), and the
+    canonical alignment transform. Either model may be missing; None if
+    unreadable.
+    """
+    return analyze_faces([image_path], max_side, detector)[0]
+
+
+def analyze_faces(
+    image_paths: Sequence[Path | str],
+    max_side: Optional[int] = SCREEN_MAX_SIDE,
+    detector: Optional[str] = None,
+) -> List[Optional[FaceAnalysis]]:
+    """
+    analyze_face over several images with one detector call, so batching
+    backends (detector.SsdDetector) see them in a single forward pass.
+    """
+    from .detector import get_detector
+
+    loaded = [load_image(p, max_side) for p in image_paths]
+    present = [im for im in loaded if im is not None]
+
+    # Landmarks need dlib; without them detection has no consumer
+    get_landmarks = _dlib()
+    det = get_detector(detector) if get_landmarks else None
+    faces: List[List[Box]] = [[] for _ in present]
+    if det is not None and present:
+        with metrics.span("face_detect", detector=det.name):
+            faces = det.detect(present)
+    found = iter(faces)
+
+    out: List[Optional[FaceAnalysis]] = []
+    for p, im in zip(image_paths, loaded):
+        if im is None:
+            out.append(None)
+            continue
+        boxes = next(found)
+        out.append(
+            _analyze_loaded(Path(p), im, max_side, det.name if det else None, boxes)
+        )
+    return out
+
+
+def _analyze_loaded(
+    path: Path,
+    loaded: LoadedImage,
+    max_side: Optional[int],
+    detector: Optional[str],
+    boxes: List[Box],
+) -> FaceAnalysis:
+    """
+    Everything after detection for one image; `detector` is None when the
+    dlib stack is missing (mesh-only analysis).
+    """
+    st = path.stat()
+    a = FaceAnalysis(
+        file_size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        max_side=max_side,
+        orig_size=loaded.orig_size,
+        detector=detector or "",
+    )
+    s = loaded.scale
+    h, w = loaded.bgr.shape[:2]
+    roi: Box = (0, 0, w, h)
+    eyes: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    if detector is not None:
+        from dlib import rectangle
+
+        from .pre_crop import crop_box
+
+        get_landmarks = _dlib()
+        if len(boxes) != 1:
+            # Screening fails either way; skip the mesh pass on rejects
+            a.reason = "No face or multiple faces"
+            return a
+        face = rectangle(*(int(v) for v in boxes[0]))
+
+        lm = get_landmarks(loaded.gray, face).astype(np.float64) / s
+        _measure(a, lm)
+        roi = crop_box(loaded.bgr.shape, face, ROI_EXPAND)
+        a.roi = tuple(int(round(v / s)) for v in roi)  # type: ignore[assignment]
+        eyes = (lm[36:42].mean(axis=0), lm[42:48].mean(axis=0))
+
+    mesh = _mesh()
+    if mesh:
+        x1, y1, x2, y2 = roi
+        rgb = cv2.cvtColor(loaded.bgr[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+        with metrics.span("face_mesh"):
+            result: Any = mesh.process(rgb)
+        del rgb
+
+        if result.multi_face_landmarks:
+            pts = result.multi_face_landmarks[0].landmark
+            cw, ch = x2 - x1, y2 - y1
+
+            def centre(idx: List[int]) -> np.ndarray:
+                xy = np.array([[pts[i].x, pts[i].y] for i in idx]).mean(axis=0)
+                return np.array([xy[0] * cw + x1, xy[1] * ch + y1]) / s
+
+            eyes = (centre(LEFT_EYE_IDX), centre(RIGHT_EYE_IDX))
+            a.mesh_eyes = tuple(  # type: ignore[assignment]
+                (round(float(e[0]), 2), round(float(e[1]), 2)) for e in eyes
+            )
+
+    M = canonical_transform(*eyes) if eyes is not None else None
+    if M is None:
+        a.reason = a.reason or "No face detected"
+    else:
+        a.align = M.tolist()
+    return a
+
+
+# ---------------------------------------------------------------------
+# RENDERING
+# ---------------------------------------------------------------------
+
+
+def warp_canonical(loaded: LoadedImage, a: FaceAnalysis) -> np.ndarray:
+    """
+    OUTPUT_SIZE aligned face; the warp only allocates the output square.
+    """
+    if a.align is None:
+        raise ValueError("analysis has no alignment")
+    return cv2.warpAffine(
+        loaded.bgr,
+        _decoded(a.align, loaded.scale),
+        (OUTPUT_SIZE, OUTPUT_SIZE),
+        flags=cv2.INTER_CUBIC,
+        borderMode=cv2.BORDER_REFLECT,
+    )
+
+
+def render_roi(loaded: LoadedImage, a: FaceAnalysis) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Face ROI rotated so the eye corners are level (the screening output).
+    Returns the image and its 2x3 transform from original pixels.
+    """
+    if a.roi is None or a.landmarks68 is None:
+        raise ValueError("analysis has no landmarks")
+
+    s = loaded.scale
+    h, w = loaded.bgr.shape[:2]
+    x1, y1, x2, y2 = a.roi
+    x1, y1 = max(0, round(x1 * s)), max(0, round(y1 * s))
+    x2, y2 = min(w, round(x2 * s)), min(h, round(y2 * s))
+
+    crop = loaded.bgr[y1:y2, x1:x2]
+    to_crop = np.array([[s, 0.0, -x1], [0.0, s, -y1]])
+    lm = _apply(to_crop, np.array(a.landmarks68))
+
+    R = rotation_matrix(crop.shape, lm[36], lm[45])
+    out = cv2.warpAffine(
+        crop, R, (x2 - x1, y2 - y1), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT
+    )
+    return out, compose(R, to_crop)
+
+
+def derive_analysis(out_path: Path, a: FaceAnalysis, M: np.ndarray) -> FaceAnalysis:
+    """
+    Analysis for an image written from the analysed one through the 2x3
+    transform M (original pixels → written pixels), so it is never
+    re-detected downstream.
+    """
+    st = out_path.stat()
+    size = image_size(out_path)
+    if size is None:
+        raise ValueError(f"unreadable image: {out_path}")
+
+    d = FaceAnalysis(
+        file_size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        max_side=a.max_side,
+        orig_size=size,
+        detector=a.detector,
+        reason=a.reason,
+        roi=(0, 0, size[0], size[1]),
+    )
+    if a.landmarks68 is not None:
+        _measure(d, _apply(M, np.array(a.landmarks68)))
+    if a.mesh_eyes is not None:
+        e = _apply(M, np.array(a.mesh_eyes))
+        d.mesh_eyes = ((float(e[0][0]), float(e[0][1])), (float(e[1][0]), float(e[1][1])))
+    if a.align is not None:
+        d.align = compose(a.align, cv2.invertAffineTransform(np.asarray(M))).tolist()
+    return d
+
+
+# ---------------------------------------------------------------------
+# PERSISTENCE
+# ---------------------------------------------------------------------
+
+
+def analysis_path(image_path: Path | str) -> Path:
+    """
+    data/cache/face_analysis/<image path relative to CWD>.json
+    """
+    p = Path(image_path).resolve()
+    try:
+        rel = p.relative_to(Path.cwd().resolve())
+    except ValueError:
+        digest = hashlib.sha1(str(p.parent).encode("utf-8")).hexdigest()[:12]
+        rel = Path("_external") / digest / p.name
+    return ANALYSIS_DIR / rel.parent / f"{rel.name}.json"
+
+
+def _same_decode(a: FaceAnalysis, max_side: Optional[int]) -> bool:
+    if a.max_side == max_side:
+        return True
+    # Images within both bounds decode identically
+    longest = max(a.orig_size)
+    return all(m is None or longest <= m for m in (a.max_side, max_side))
+
+
+def load_analysis(
+    image_path: Path | str,
+    max_side: Optional[int] = SCREEN_MAX_SIDE,
+    detector: Optional[str] = None,
+) -> Optional[FaceAnalysis]:
+    """
+    Persisted analysis if it still matches the file on disk. With a
+    `detector`, only one that backend produced; without, any. A mesh-only
+    analysis (saved while dlib was missing) is stale once dlib is
+    available, since it has no landmarks for the dlib callers.
+    """
+    data = read_json(analysis_path(image_path), default=None)
+    if not data:
+        return None
+    try:
+        a = FaceAnalysis.model_validate(data)
+        st = Path(image_path).stat()
+    except Exception:
+        return None
+
+    if (
+        a.version != ANALYSIS_VERSION
+        or a.file_size != st.st_size
+        or a.mtime_ns != st.st_mtime_ns
+        or not _same_decode(a, max_side)
+        or (detector is not None and a.detector != detector)
+        or (not a.detector and _dlib() is not None)
+    ):
+        return None
+    return a
+
+
+def save_analysis(image_path: Path | str, a: FaceAnalysis) -> Path:
+    p = analysis_path(image_path)
+    write_json(p, a.model_dump())
+    return p
+
+
+def adopt_analysis(src: Path | str, dst: Path | str) -> bool:
+    """
+    Reuse the persisted analysis of `src` for `dst`, an identical copy
+    (hardlink or copy) of it. False when `src` has no current analysis.
+    """
+    data = read_json(analysis_path(src), default=None)
+    if not data:
+        return False
+    try:
+        a = FaceAnalysis.model_validate(data)
+        src_st = Path(src).stat()
+        dst_st = Path(dst).stat()
+    except Exception:
+        return False
+
+    if (
+        a.version != ANALYSIS_VERSION
+        or (a.file_size, a.mtime_ns) != (src_st.st_size, src_st.st_mtime_ns)
+        or dst_st.st_size != src_st.st_size
+    ):
+        return False
+
+    if Path(src).resolve() != Path(dst).resolve():
+        save_analysis(dst, a.model_copy(update={"mtime_ns": dst_st.st_mtime_ns}))
+    return True
+
+
+def get_analysis(
+    image_path: Path | str,
+    max_side: Optional[int] = SCREEN_MAX_SIDE,
+    force: bool = False,
+    detector: Optional[str] = None,
+) -> Optional[FaceAnalysis]:
+    """
+    Persisted analysis for `image_path`, computing (and saving) it once.
+    `detector` pins the backend (e.g. a filter's); by default any persisted
+    analysis is reused and new ones use settings.face_detector.
+    """
+    return get_analyses([image_path], max_side, force, detector)[0]
+
+
+def get_analyses(
+    image_paths: Sequence[Path | str],
+    max_side: Optional[int] = SCREEN_MAX_SIDE,
+    force: bool = False,
+    detector: Optional[str] = None,
+) -> List[Optional[FaceAnalysis]]:
+    """
+    get_analysis for several images; the misses are analysed together
+    (one batched detector call).
+    """
+    out: List[Optional[FaceAnalysis]] = [None] * len(image_paths)
+    misses: List[int] = []
+    for i, p in enumerate(image_paths):
+        cached = None if force else load_analysis(p, max_side, detector)
+        if cached is not None:
+            metrics.inc("face_analysis", result="hit")
+            out[i] = cached
+        else:
+            misses.append(i)
+    if not misses:
+        return out
+
+    metrics.inc("face_analysis", len(misses), result="miss")
+    fresh = analyze_faces([image_paths[i] for i in misses], max_side, detector)
+    for i, a in zip(misses, fresh):
+        if a is not None:
+            save_analysis(image_paths[i], a)
+        out[i] = a
+    return out
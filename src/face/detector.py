@@ -1,13 +1,179 @@
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import cv2
 import numpy as np
-from dlib import get_frontal_face_detector
-_detector = get_frontal_face_detector()
 
+from ..config.settings import settings
+from ..utils.image_io import LoadedImage
+
+
+Box = Tuple[int, int, int, int]  # x1, y1, x2, y2 in decoded pixels
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Images per detector call for backends that batch
+BATCH_SIZE = 8
+
+# DNN backends see a reduced copy: screening only accepts faces that fill
+# much of the frame, so full resolution buys nothing
+DETECT_MAX_SIDE = 640
+MIN_SCORE = 0.7
+
+# OpenCV's ResNet-10 SSD (Caffe)
+SSD_CONFIG = Path("models/deploy.prototxt")
+SSD_MODEL = Path("models/res10_300x300_ssd_iter_140000.caffemodel")
+SSD_INPUT = (300, 300)
+SSD_MEAN = (104.0, 177.0, 123.0)
+
+# YuNet (ONNX, OpenCV zoo)
+YUNET_MODEL = Path("models/face_detection_yunet_2023mar.onnx")
+YUNET_NMS = 0.3
+YUNET_TOP_K = 50
+
+
+def _require(*paths: Path) -> None:
+    for p in paths:
+        if not p.exists():
+            raise FileNotFoundError(f"Missing {p.name} in /models")
+
+
+def _reduced(bgr: np.ndarray) -> Tuple[np.ndarray, float]:
+    h, w = bgr.shape[:2]
+    s = min(1.0, DETECT_MAX_SIDE / max(h, w))
+    if s == 1.0:
+        return bgr, 1.0
+    size = (max(1, round(w * s)), max(1, round(h * s)))
+    return cv2.resize(bgr, size, interpolation=cv2.INTER_AREA), s
+
+
+# ---------------------------------------------------------------------
+# BACKENDS
+# ---------------------------------------------------------------------
+
+
+class FaceDetector(ABC):
+    name: str
+    batch_size: int = 1
+
+    @abstractmethod
+    def detect(self, images: Sequence[LoadedImage]) -> List[List[Box]]:
+        """
+        Face boxes per image, in that image's decoded pixels.
+        """
+
+
+class HogDetector(FaceDetector):
+    """
+    dlib HOG + linear SVM with one upsample: frontal faces only, one
+    image per pass, cost grows with the decoded area.
+    """
+
+    name = "hog"
+
+    def __init__(self) -> None:
+        from dlib import get_frontal_face_detector
+
+        self._detector = get_frontal_face_detector()
+
+    def detect(self, images: Sequence[LoadedImage]) -> List[List[Box]]:
+        return [
+            [(f.left(), f.top(), f.right(), f.bottom()) for f in self._detector(im.gray, 1)]
+            for im in images
+        ]
+
+
+class SsdDetector(FaceDetector):
+    """
+    ResNet-10 SSD through OpenCV DNN: a whole batch is resized to 300x300
+    and detected in one forward pass (rows carry their batch index).
+    """
+
+    name = "ssd"
+    batch_size = BATCH_SIZE
+
+    def __init__(self) -> None:
+        _require(SSD_CONFIG, SSD_MODEL)
+        self._net = cv2.dnn.readNetFromCaffe(str(SSD_CONFIG), str(SSD_MODEL))
+        self._net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self._net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def detect(self, images: Sequence[LoadedImage]) -> List[List[Box]]:
+        out: List[List[Box]] = [[] for _ in images]
+        if not images:
+            return out
+
+        blob = cv2.dnn.blobFromImages(
+            [_reduced(im.bgr)[0] for im in images], 1.0, SSD_INPUT, SSD_MEAN, swapRB=False
+        )
+        self._net.setInput(blob)
+        for i, _, score, x1, y1, x2, y2 in self._net.forward().reshape(-1, 7):
+            if i < 0 or score < MIN_SCORE:
+                continue
+            h, w = images[int(i)].bgr.shape[:2]
+            out[int(i)].append(
+                (int(x1 * w), int(y1 * h), int(x2 * w), int(y2 * h))
+            )
+        return out
+
+
+class YuNetDetector(FaceDetector):
+    """
+    YuNet through cv2.FaceDetectorYN. The API takes one image per call,
+    so a batch is detected image by image on reduced copies; small and
+    turned faces that HOG misses are still found.
+    """
+
+    name = "yunet"
+    batch_size = BATCH_SIZE
+
+    def __init__(self) -> None:
+        _require(YUNET_MODEL)
+        self._net = cv2.FaceDetectorYN.create(
+            str(YUNET_MODEL), "", (320, 320), MIN_SCORE, YUNET_NMS, YUNET_TOP_K
+        )
+
+    def detect(self, images: Sequence[LoadedImage]) -> List[List[Box]]:
+        out: List[List[Box]] = []
+        for im in images:
+            small, s = _reduced(im.bgr)
+            h, w = small.shape[:2]
+            self._net.setInputSize((w, h))
+            _, faces = self._net.detect(small)
+
+            boxes: List[Box] = []
+            for f in faces if faces is not None else ():
+                x, y, bw, bh = (float(v) / s for v in f[:4])
+                boxes.append((int(x), int(y), int(x + bw), int(y + bh)))
+            out.append(boxes)
+        return out
+
+
+DETECTORS: Dict[str, Type[FaceDetector]] = {
+    "hog": HogDetector,
+    "ssd": SsdDetector,
+    "yunet": YuNetDetector,
+}
+
+_instances: Dict[str, FaceDetector] = {}
 
 
-def detect_single_face(gray: np.ndarray):
-    faces = _detector(gray, 1)
-    if len(faces) != 1:
-        return None
-    return faces[0]
+def get_detector(name: Optional[str] = None) -> FaceDetector:
+    """
+    Shared detector for `name` (default: settings.face_detector). Raises
+    ImportError / FileNotFoundError when its library or model is missing.
+    """
+    name = name or settings.face_detector
+    if name not in DETECTORS:
+        raise ValueError(
+            f"Unknown face detector {name!r} (choose from {', '.join(DETECTORS)})"
+        )
+    if name not in _instances:
+        _instances[name] = DETECTORS[name]()
+    return _instances[name]
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .identity import EMBEDDINGS_DIR, EMBEDDING_DIM, RECORD
+
+
+log = get_logger("face.index")
+
+# Key field of a store record (raw sha1 digest bytes)
+_KEY = RECORD.fields["key"][0]
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Below this many rows exact search beats any coarse structure
+IVF_MIN_ROWS = 50_000
+# Lists probed per query; more = higher recall, slower
+IVF_NPROBE = 8
+# Rebuild the IVF once this share of rows arrived after the last build
+IVF_STALE_FRACTION = 0.2
+
+KMEANS_ITERS = 10
+KMEANS_SAMPLE = 20_000
+
+# Distance-matrix entries per product; bounds temporaries (~64 MB)
+MAX_PAIRS = 1 << 24
+
+# Same photo re-encoded / re-cropped; different photos of one person
+# sit well above this (~0.3-0.5)
+DUPLICATE_DISTANCE = 0.08
+
+
+@dataclass
+class Match:
+    key: str  # content sha1 (EmbeddingStore key)
+    distance: float
+
+
+# ---------------------------------------------------------------------
+# MATH
+# ---------------------------------------------------------------------
+
+
+def _sq_dists(Q: np.ndarray, X: np.ndarray, x_sq: np.ndarray) -> np.ndarray:
+    """
+    Squared Euclidean distances (len(Q), len(X)) via one matrix product.
+    """
+    q_sq = np.einsum("ij,ij->i", Q, Q)[:, None]
+    return np.maximum(q_sq + x_sq[None, :] - 2.0 * (Q @ X.T), 0.0)
+
+
+def _nearest_centroid(X: np.ndarray, C: np.ndarray) -> np.ndarray:
+    c_sq = np.einsum("ij,ij->i", C, C)
+    out = np.empty(len(X), dtype=np.int32)
+    step = max(1, MAX_PAIRS // len(C))
+    for i in range(0, len(X), step):
+        out[i : i + step] = _sq_dists(X[i : i + step], C, c_sq).argmin(1)
+    return out
+
+
+def _kmeans(X: np.ndarray, k: int, seed: int = 0) -> np.ndarray:
+    """
+    Lloyd's k-means on a sample; centroids only (assignment is separate).
+    """
+    rng = np.random.default_rng(seed)
+    sample = X[rng.choice(len(X), min(len(X), KMEANS_SAMPLE), replace=False)]
+    C = sample[rng.choice(len(sample), k, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERS):
+        assign = _nearest_centroid(sample, C)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(C)
+        np.add.at(sums, assign, sample)
+        filled = counts > 0  # empty lists keep their old centroid
+        C[filled] = sums[filled] / counts[filled, None]
+    return C
+
+
+# ---------------------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------------------
+
+
+class EmbeddingIndex:
+    """
+    Nearest-neighbour search over every stored face embedding.
+
+    New records of the EmbeddingStore file (appended by any process) are
+    read on refresh() into in-memory float32 buffers, converted once
+    rather than per query; keys stay exact 20-byte digests. Small corpora
+    use one exact batched product; at IVF_MIN_ROWS+ an inverted-file
+    index (k-means lists, persisted next to the store as .npy) narrows
+    each query to IVF_NPROBE lists plus the rows added since it was built.
+    """
+
+    def __init__(self, root: Path = EMBEDDINGS_DIR) -> None:
+        self.root = root
+        self.store_path = root / "embeddings.f16"
+        self.centroids_path = root / "ivf_centroids.npy"
+        self.assign_path = root / "ivf_assign.npy"
+
+        self._lock = threading.Lock()
+        self._n = 0
+        # Capacity-doubling buffers; rows [:_n] are live
+        self._keys_buf = np.empty(0, dtype=_KEY)
+        self._X_buf = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        self._sq_buf = np.empty(0, dtype=np.float32)
+        self._row_of: Dict[bytes, int] = {}
+
+        # IVF: centroids (+ norms), rows grouped by list, offsets, rows covered
+        self._C: Optional[np.ndarray] = None
+        self._c_sq: Optional[np.ndarray] = None
+        self._order: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._ivf_rows = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def _X(self) -> np.ndarray:
+        return self._X_buf[: self._n]
+
+    @property
+    def _x_sq(self) -> np.ndarray:
+        return self._sq_buf[: self._n]
+
+    @property
+    def _keys(self) -> np.ndarray:
+        return self._keys_buf[: self._n]
+
+    def _reserve(self, n: int) -> None:
+        cap = len(self._X_buf)
+        if n <= cap:
+            return
+        cap = max(n, 2 * cap, 1024)
+        X = np.empty((cap, EMBEDDING_DIM), dtype=np.float32)
+        sq = np.empty(cap, dtype=np.float32)
+        keys = np.empty(cap, dtype=_KEY)
+        X[: self._n], sq[: self._n], keys[: self._n] = self._X, self._x_sq, self._keys
+        self._X_buf, self._sq_buf, self._keys_buf = X, sq, keys
+
+    # -----------------------------------------------------------------
+    # LOADING
+    # -----------------------------------------------------------------
+
+    def refresh(self) -> int:
+        """
+        Load rows appended since the last call; returns the row count.
+        """
+        with self._lock:
+            try:
+                size = self.store_path.stat().st_size
+            except OSError:
+                return self._n
+            n = size // RECORD.itemsize
+            if n <= self._n:
+                return self._n
+
+            mm = np.memmap(self.store_path, dtype=RECORD, mode="r", shape=(n,))
+            new = mm[self._n : n]
+            vecs = np.asarray(new["vec"], dtype=np.float32)
+            keys = np.asarray(new["key"])
+            del mm
+
+            self._reserve(n)
+            self._X_buf[self._n : n] = vecs
+            self._sq_buf[self._n : n] = np.einsum("ij,ij->i", vecs, vecs)
+            self._keys_buf[self._n : n] = keys
+            for i, k in enumerate(keys, start=self._n):
+                self._row_of[bytes(k)] = i  # a re-embedded key: latest row wins
+            self._n = n
+
+            if self._C is None:
+                self._load_ivf()
+            return n
+
+    def _load_ivf(self) -> None:
+        if not (self.centroids_path.exists() and self.assign_path.exists()):
+            return
+        C = np.load(self.centroids_path)
+        assign = np.load(self.assign_path, mmap_mode="r")
+        if len(assign) > self._n or C.shape[1:] != (EMBEDDING_DIM,):
+            return  # built over a different store; rebuild on demand
+        self._set_ivf(C, np.asarray(assign))
+
+    def _set_ivf(self, C: np.ndarray, assign: np.ndarray) -> None:
+        self._C = C.astype(np.float32)
+        self._c_sq = np.einsum("ij,ij->i", self._C, self._C)
+        self._order = np.argsort(assign, kind="stable").astype(np.int64)
+        self._offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assign, minlength=len(C)))]
+        )
+        self._ivf_rows = len(assign)
+
+    def build_ivf(self, nlist: Optional[int] = None) -> None:
+        """
+        (Re)build and persist the inverted lists over all current rows.
+        """
+        self.refresh()
+        with self._lock:
+            k = nlist or max(1, int(np.sqrt(self._n)))
+            with metrics.span("ivf_build"):
+                C = _kmeans(self._X, k)
+                assign = _nearest_centroid(self._X, C)
+            self.root.mkdir(parents=True, exist_ok=True)
+            np.save(self.centroids_path, C)
+            np.save(self.assign_path, assign)
+            self._set_ivf(C, assign)
+        log.info(f"🧭 Embedding IVF built: {self._n} rows, {k} lists")
+
+    def _maybe_build(self) -> None:
+        if self._n < IVF_MIN_ROWS:
+            return
+        stale = self._n - self._ivf_rows > IVF_STALE_FRACTION * self._n
+        if self._C is None or stale:
+            self.build_ivf()
+
+    # -----------------------------------------------------------------
+    # QUERIES
+    # -----------------------------------------------------------------
+
+    def _candidates(self, q: np.ndarray, nprobe: int) -> np.ndarray:
+        """
+        Row ids worth scoring for one query; all rows without an IVF.
+        """
+        if self._C is None:
+            return np.arange(self._n)
+        lists = np.argsort(_sq_dists(q[None, :], self._C, self._c_sq)[0])[:nprobe]
+        parts = [self._order[self._offsets[j] : self._offsets[j + 1]] for j in lists]
+        parts.append(np.arange(self._ivf_rows, self._n))  # not yet in any list
+        return np.concatenate(parts)
+
+    def _score(
+        self, Q: np.ndarray, nprobe: int
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (row ids, squared distances) per query row.
+        """
+        if self._C is None:
+            rows = np.arange(self._n)
+            step = max(1, MAX_PAIRS // max(self._n, 1))
+            for i in range(0, len(Q), step):
+                for d in _sq_dists(Q[i : i + step], self._X, self._x_sq):
+                    yield rows, d
+            return
+        for q in Q:
+            rows = self._candidates(q, nprobe)
+            yield rows, _sq_dists(q[None, :], self._X[rows], self._x_sq[rows])[0]
+
+    def _matches(self, rows: np.ndarray, d2: np.ndarray) -> List[Match]:
+        out: List[Match] = []
+        seen = set()
+        for i in np.argsort(d2, kind="stable"):
+            key = bytes(self._keys[rows[i]])
+            if key in seen:
+                continue
+            seen.add(key)
+            out.append(Match(key.hex(), float(np.sqrt(d2[i]))))
+        return out
+
+    @metrics.timed("embedding_search", kind="knn")
+    def search(
+        self, queries: np.ndarray, k: int = 10, nprobe: int = IVF_NPROBE
+    ) -> List[List[Match]]:
+        """
+        k nearest stored faces for each query vector, closest first.
+        """
+        self.refresh()
+        self._maybe_build()
+        Q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        out: List[List[Match]] = []
+        for rows, d2 in self._score(Q, nprobe):
+            if len(d2) > 2 * k:
+                # Headroom for keys stored twice, dropped by _matches
+                top = np.argpartition(d2, 2 * k)[: 2 * k]
+                rows, d2 = rows[top], d2[top]
+            out.append(self._matches(rows, d2)[:k])
+        return out
+
+    @metrics.timed("embedding_search", kind="radius")
+    def within(
+        self, query: np.ndarray, radius: float, nprobe: int = IVF_NPROBE
+    ) -> List[Match]:
+        """
+        Every stored face within `radius` of `query`, closest first, e.g.
+        all images showing one identity (radius = its threshold).
+        """
+        self.refresh()
+        self._maybe_build()
+        q = np.asarray(query, dtype=np.float32)[None, :]
+        rows, d2 = next(self._score(q, nprobe))
+        hit = d2 <= radius * radius
+        return self._matches(rows[hit], d2[hit])
+
+    def vector(self, key: str) -> Optional[np.ndarray]:
+        self.refresh()
+        row = self._row_of.get(bytes.fromhex(key))
+        return None if row is None else self._X[row]
+
+    def duplicates_of(
+        self, key: str, radius: float = DUPLICATE_DISTANCE
+    ) -> List[Match]:
+        """
+        Other stored faces that are (nearly) the same photo as `key`.
+        """
+        vec = self.vector(key)
+        if vec is None:
+            return []
+        return [m for m in self.within(vec, radius) if m.key != key]
+
+
+_index: Optional[EmbeddingIndex] = None
+
+
+def embedding_index() -> EmbeddingIndex:
+    """
+    Process-wide index over the default embedding store.
+    """
+    global _index
+    if _index is None:
+        _index = EmbeddingIndex()
+    return _index
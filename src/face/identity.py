@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.settings import settings
+from ..utils.filesystem import file_sha1, read_json, write_json
+from ..utils.image_io import SCREEN_MAX_SIDE, load_image
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .analysis import get_analysis, require_dlib
+
+
+log = get_logger("face.identity")
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+MODEL_PATH = Path("models/dlib_face_recognition_resnet_model_v1.dat")
+EMBEDDING_DIM = 128
+
+# One directory per model: vectors from different models never mix
+EMBEDDINGS_DIR = settings.cache_dir / "face_embeddings" / "dlib_resnet_v1"
+REFERENCE_DIR = settings.cache_dir / "face_identity"
+
+# Sources whose portraits seed the reference (infobox / Commons)
+REFERENCE_SOURCES = ("wikipedia_page", "wikimedia")
+
+# Fixed-size record: sha1 digest + float16 vector (256 B). The digest is
+# a raw void field: "S20" would strip trailing NUL bytes on read
+RECORD = np.dtype([("key", "V20"), ("vec", "<f2", (EMBEDDING_DIM,))])
+
+
+# ---------------------------------------------------------------------
+# EMBEDDING STORE
+# ---------------------------------------------------------------------
+
+
+class EmbeddingStore:
+    """
+    Append-only float16 embeddings keyed by file content (sha1), so a
+    file linked into several celebrities' folders is embedded once.
+
+    One flat file of fixed-size records; each put is a single appended
+    write, safe to share between worker processes.
+    """
+
+    def __init__(self, root: Path = EMBEDDINGS_DIR) -> None:
+        self.root = root
+        self.path = root / "embeddings.f16"
+        # key → files it was seen as (tab-separated lines, append-only)
+        self.paths_file = root / "paths.tsv"
+        self._lock = threading.Lock()
+        self._rows: Optional[Dict[bytes, np.ndarray]] = None
+        self._seen_bytes = 0
+        self._paths: Optional[Dict[str, Set[str]]] = None
+
+    def _refresh(self) -> Dict[bytes, np.ndarray]:
+        """
+        Pick up records appended since the last read (ours or another
+        process's); a torn trailing record is ignored until complete.
+        """
+        if self._rows is None:
+            self._rows = {}
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return self._rows
+
+        whole = size - size % RECORD.itemsize
+        if whole > self._seen_bytes:
+            with self.path.open("rb") as f:
+                f.seek(self._seen_bytes)
+                recs = np.frombuffer(f.read(whole - self._seen_bytes), dtype=RECORD)
+            for r in recs:
+                self._rows[bytes(r["key"])] = r["vec"]
+            self._seen_bytes = whole
+        return self._rows
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        k = bytes.fromhex(key)
+        with self._lock:
+            vec = (self._rows or {}).get(k)
+            if vec is None:  # maybe appended by another process since
+                vec = self._refresh().get(k)
+        return None if vec is None else vec.astype(np.float32)
+
+    def put(self, key: str, vec: np.ndarray) -> None:
+        rec = np.zeros(1, dtype=RECORD)
+        rec["key"] = bytes.fromhex(key)
+        rec["vec"] = vec.astype(np.float16)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as f:
+                f.write(rec.tobytes())
+            self._refresh()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._refresh())
+
+    # -----------------------------------------------------------------
+    # FILES PER KEY
+    # -----------------------------------------------------------------
+
+    def _load_paths(self) -> Dict[str, Set[str]]:
+        if self._paths is None:
+            self._paths = {}
+            if self.paths_file.exists():
+                for line in self.paths_file.read_text(encoding="utf-8").splitlines():
+                    key, _, path = line.partition("\t")
+                    if path:
+                        self._paths.setdefault(key, set()).add(path)
+        return self._paths
+
+    def note_path(self, key: str, path: Path) -> None:
+        p = path.as_posix()
+        with self._lock:
+            known = self._load_paths().setdefault(key, set())
+            if p in known:
+                return
+            known.add(p)
+            self.paths_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.paths_file.open("a", encoding="utf-8") as f:
+                f.write(f"{key}\t{p}\n")
+
+    def paths_for(self, key: str) -> List[str]:
+        """
+        Files (any celebrity) whose content has this key and still exist.
+        """
+        with self._lock:
+            self._paths = None  # pick up other processes' notes
+            known = sorted(self._load_paths().get(key, ()))
+        return [p for p in known if Path(p).exists()]
+
+
+# ---------------------------------------------------------------------
+# MODEL (lazy; needs dlib + the ResNet weights)
+# ---------------------------------------------------------------------
+
+_encoder_model: Any = None
+_encoder_error = ""
+
+
+def _encoder() -> Any:
+    global _encoder_model, _encoder_error
+    if _encoder_model is None:
+        try:
+            import dlib
+
+            if not MODEL_PATH.exists():
+                raise FileNotFoundError(f"Missing {MODEL_PATH.name} in /models")
+            _encoder_model = dlib.face_recognition_model_v1(str(MODEL_PATH))
+        except (ImportError, FileNotFoundError) as e:
+            log.warning(f"⚠️ Face embeddings unavailable: {e}")
+            _encoder_error = str(e)
+            _encoder_model = False
+    return _encoder_model or None
+
+
+def require_encoder() -> None:
+    """
+    Raise ImportError unless both the landmark stack and the embedding
+    model are available.
+    """
+    require_dlib()
+    if _encoder() is None:
+        raise ImportError(f"face embedding model unavailable: {_encoder_error}")
+
+
+# ---------------------------------------------------------------------
+# REFERENCE
+# ---------------------------------------------------------------------
+
+
+@dataclass
+class IdentityReference:
+    """
+    Robust centre of a celebrity's trusted portraits: the coordinate-wise
+    median of the largest mutually-close group, so a wrong person or a
+    group shot among the references can't drag it off.
+    """
+
+    centroid: np.ndarray
+    members: List[str]  # sha1 of the images in the consensus group
+    threshold: float
+
+    @property
+    def digest(self) -> str:
+        raw = ",".join(sorted(self.members)) + f"|{self.threshold}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:8]
+
+    def distance(self, emb: np.ndarray) -> float:
+        return float(np.linalg.norm(emb - self.centroid))
+
+    def matches(self, emb: np.ndarray) -> bool:
+        return self.distance(emb) <= self.threshold
+
+
+def build_reference(
+    embeddings: Dict[str, np.ndarray],
+    preferred: Sequence[str] = (),
+    threshold: Optional[float] = None,
+) -> Optional[IdentityReference]:
+    """
+    Reference from trusted embeddings (sha1 → vector). The seed is the
+    embedding with the most neighbours within `threshold` (ties go to
+    `preferred` keys); None if no two references agree, including when
+    there are fewer than two.
+    """
+    thr = settings.identity_max_distance if threshold is None else threshold
+    keys = list(embeddings)
+    if len(keys) < 2:
+        return None
+
+    X = np.stack([embeddings[k] for k in keys])
+    D = np.linalg.norm(X[:, None, :] - X[None, :, :], axis=-1)
+    close = D <= thr
+    pref = set(preferred)
+    seed = max(range(len(keys)), key=lambda i: (close[i].sum(), keys[i] in pref))
+
+    group = np.flatnonzero(close[seed])
+    if len(group) < 2:
+        return None
+    return IdentityReference(
+        centroid=np.median(X[group], axis=0),
+        members=[keys[i] for i in group],
+        threshold=thr,
+    )
+
+
+def reference_path(slug: str) -> Path:
+    return REFERENCE_DIR / f"{slug}.json"
+
+
+def save_reference(slug: str, ref: IdentityReference) -> Path:
+    p = reference_path(slug)
+    write_json(
+        p,
+        {
+            "centroid": [round(float(v), 5) for v in ref.centroid],
+            "members": ref.members,
+            "threshold": ref.threshold,
+        },
+    )
+    return p
+
+
+def load_reference(slug: str) -> Optional[IdentityReference]:
+    data = read_json(reference_path(slug), default=None)
+    if not data:
+        return None
+    try:
+        return IdentityReference(
+            centroid=np.asarray(data["centroid"], dtype=np.float32),
+            members=list(data["members"]),
+            threshold=float(data["threshold"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------
+# VERIFIER
+# ---------------------------------------------------------------------
+
+
+class IdentityVerifier:
+    """
+    Face embeddings for images the face stage can analyse, from the
+    persisted 68-point landmarks (no second detection pass).
+    """
+
+    def __init__(
+        self,
+        store: Optional[EmbeddingStore] = None,
+        max_side: Optional[int] = SCREEN_MAX_SIDE,
+    ) -> None:
+        require_encoder()
+        self.store = store or EmbeddingStore()
+        self.max_side = max_side
+
+    def embed(self, image_path: Path | str) -> Optional[np.ndarray]:
+        """
+        Embedding of the single face in `image_path`, or None when the
+        analysis found no usable face.
+        """
+        return self.embed_with_key(image_path)[1]
+
+    def embed_with_key(
+        self, image_path: Path | str
+    ) -> Tuple[str, Optional[np.ndarray]]:
+        """
+        (content key, embedding); the key addresses the embedding index.
+        """
+        path = Path(image_path)
+        key = file_sha1(path)
+        cached = self.store.get(key)
+        if cached is None:
+            metrics.inc("face_embeddings", result="miss")
+            cached = self._compute(path)
+            if cached is not None:
+                self.store.put(key, cached)
+        else:
+            metrics.inc("face_embeddings", result="hit")
+
+        if cached is not None:
+            self.store.note_path(key, path)
+        return key, cached
+
+    def _compute(self, path: Path) -> Optional[np.ndarray]:
+        import dlib
+
+        a = get_analysis(path, self.max_side)
+        if a is None or a.landmarks68 is None:
+            return None
+
+        # Same decode the analysis used; usually still in the shared cache
+        loaded = load_image(path, a.max_side)
+        if loaded is None:
+            return None
+
+        pts = np.asarray(a.landmarks68, dtype=np.float64) * loaded.scale
+        x1, y1 = pts.min(axis=0)
+        x2, y2 = pts.max(axis=0)
+        shape = dlib.full_object_detection(
+            dlib.rectangle(int(x1), int(y1), int(x2), int(y2)),
+            [dlib.point(int(round(x)), int(round(y))) for x, y in pts],
+        )
+        rgb = cv2.cvtColor(loaded.bgr, cv2.COLOR_BGR2RGB)
+
+        with metrics.span("face_embed"):
+            vec = _encoder().compute_face_descriptor(rgb, shape)
+        return np.asarray(vec, dtype=np.float32)
+
+    def reference(
+        self, paths: Sequence[Path | str], preferred: Sequence[Path | str] = ()
+    ) -> Optional[IdentityReference]:
+        """
+        Reference from trusted images; `preferred` ones win ties.
+        """
+        embeddings: Dict[str, np.ndarray] = {}
+        pref_keys: List[str] = []
+        pref = {Path(p) for p in preferred}
+        for p in map(Path, paths):
+            key, emb = self.embed_with_key(p)
+            if emb is None:
+                continue
+            embeddings[key] = emb
+            if p in pref:
+                pref_keys.append(key)
+        return build_reference(embeddings, pref_keys)
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+from typing import Tuple
+
 import cv2
 import numpy as np
 from dlib import rectangle
 
 
-def crop_face(img: np.ndarray, face: rectangle, expand: float = 0.6) -> np.ndarray:
+def crop_box(
+    shape: Tuple[int, ...], face: rectangle, expand: float = 0.6
+) -> Tuple[int, int, int, int]:
     """
-    Crop image around detected face and expand margins.
+    (x1, y1, x2, y2) of the expanded square around a face, clipped to the image.
     """
-    h, w = img.shape[:2]
+    h, w = shape[:2]
 
     x1 = face.left()
     y1 = face.top()
@@ -29,4 +33,12 @@ def crop_face(img: np.ndarray, face: rectangle, expand: float = 0.6) -> np.ndarr
     nx2 = min(w, cx + size // 2)
     ny2 = min(h, cy + size // 2)
 
-    return img[ny1:ny2, nx1:nx2]
+    return nx1, ny1, nx2, ny2
+
+
+def crop_face(img: np.ndarray, face: rectangle, expand: float = 0.6) -> np.ndarray:
+    """
+    Crop image around detected face and expand margins.
+    """
+    x1, y1, x2, y2 = crop_box(img.shape, face, expand)
+    return img[y1:y2, x1:x2]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ..config.settings import settings
+from ..utils.filesystem import file_sha1, read_json, write_json
+
+
+INDEX_PATH = settings.cache_dir / "filter_faces_index.json"
+
+
+@dataclass
+class ProcessedEntry:
+    size: int
+    mtime_ns: int
+    sha1: str
+    version: str
+    accepted: bool
+    reason: str = ""
+    output: str = ""
+
+
+class ProcessedIndex:
+    """
+    Which raw images filter_faces has already handled, and with what
+    result. An entry is current when the filter version matches and the
+    file is unchanged: same size+mtime, or (after a touch/copy) same hash.
+    """
+
+    def __init__(self, path: Path = INDEX_PATH) -> None:
+        self.path = path
+        raw = read_json(path, default={}) or {}
+        self.entries: Dict[str, ProcessedEntry] = {}
+        for key, e in raw.items():
+            try:
+                self.entries[key] = ProcessedEntry(**e)
+            except TypeError:
+                continue  # written by an older layout; reprocess
+        self.dirty = False
+
+    @staticmethod
+    def key(path: Path) -> str:
+        return path.as_posix()
+
+    def lookup(self, path: Path, version: str) -> Optional[ProcessedEntry]:
+        """
+        Current entry for `path`, or None if it needs (re)processing.
+        Hashes the file only when its stat changed.
+        """
+        e = self.entries.get(self.key(path))
+        if e is None or e.version != version:
+            return None
+        if e.output and not Path(e.output).exists():
+            return None
+
+        st = path.stat()
+        if (e.size, e.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return e
+        if e.size != st.st_size or e.sha1 != file_sha1(path):
+            return None
+
+        # Touched but identical: refresh stat so the next run is stat-only
+        e.mtime_ns = st.st_mtime_ns
+        self.dirty = True
+        return e
+
+    def record(
+        self,
+        path: Path,
+        version: str,
+        accepted: bool,
+        reason: str = "",
+        output: Optional[Path] = None,
+    ) -> ProcessedEntry:
+        st = path.stat()
+        e = ProcessedEntry(
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            sha1=file_sha1(path),
+            version=version,
+            accepted=accepted,
+            reason=reason,
+            output=output.as_posix() if output else "",
+        )
+        self.entries[self.key(path)] = e
+        self.dirty = True
+        return e
+
+    def previous(self, path: Path) -> Optional[ProcessedEntry]:
+        """
+        Entry from any earlier run, current or not (to clean up its output).
+        """
+        return self.entries.get(self.key(path))
+
+    def prune(self, seen: Iterable[Path]) -> List[ProcessedEntry]:
+        """
+        Drop entries for images that no longer exist in the input tree;
+        returns them so their outputs can be removed too.
+        """
+        keep = {self.key(p) for p in seen}
+        gone = [k for k in self.entries if k not in keep]
+        if gone:
+            self.dirty = True
+        return [self.entries.pop(k) for k in gone]
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        write_json(self.path, {k: asdict(e) for k, e in sorted(self.entries.items())})
+        self.dirty = False
@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-import cv2
 import numpy as np
 
-from .detector import detect_single_face
-from .landmarks import get_landmarks
-from .geometry import eye_tilt, estimate_yaw, face_ratio
-from .align import align_face
+from ..config.settings import settings
+from ..utils.image_io import SCREEN_MAX_SIDE, load_image
+from ..utils.metrics import metrics
+from .analysis import (
+    ANALYSIS_VERSION,
+    FaceAnalysis,
+    get_analyses,
+    render_roi,
+    require_dlib,
+)
+from .detector import get_detector
+
+
+# Bump when screening logic changes in a way thresholds don't capture
+FILTER_VERSION = 1
 
 
 class FaceQualityResult:
@@ -18,6 +31,19 @@ class FaceQualityResult:
         self.reason = reason
 
 
+@dataclass
+class FaceCheck:
+    """
+    Full outcome of one check: verdict, screening output and the analysis
+    it was derived from (transform: original pixels → `aligned`).
+    """
+
+    result: FaceQualityResult
+    aligned: Optional[np.ndarray] = None
+    analysis: Optional[FaceAnalysis] = None
+    transform: Optional[np.ndarray] = None
+
+
 class FaceQualityFilter:
     def __init__(
         self,
@@ -25,49 +51,108 @@ class FaceQualityFilter:
         max_eye_tilt: float = 8.0,
         min_face_ratio: float = 0.40,
         max_face_ratio: float = 0.75,
+        max_side: Optional[int] = SCREEN_MAX_SIDE,
+        detector: Optional[str] = None,
     ):
+        # Screening needs 68-point landmarks; fail early without them
+        require_dlib()
+        # Backend name (detector.DETECTORS); fails early on a missing model
+        self.detector = detector or settings.face_detector
+        self._batch_size = get_detector(self.detector).batch_size
+
         self.max_yaw = max_yaw
         self.max_eye_tilt = max_eye_tilt
         self.min_face_ratio = min_face_ratio
         self.max_face_ratio = max_face_ratio
+        # Decode bound; checks are scale-invariant so full resolution is wasted
+        self.max_side = max_side
+
+    @property
+    def version(self) -> str:
+        """
+        Identifies everything that determines a verdict; processed-file
+        indexes treat results from another version as stale.
+        """
+        params: list = [
+            self.max_yaw,
+            self.max_eye_tilt,
+            self.min_face_ratio,
+            self.max_face_ratio,
+            self.max_side,
+        ]
+        if self.detector != "hog":  # HOG verdicts from before backends stay valid
+            params.append(self.detector)
+        digest = hashlib.sha1(json.dumps(params).encode("utf-8")).hexdigest()[:8]
+        return f"f{FILTER_VERSION}.a{ANALYSIS_VERSION}.{digest}"
 
     def check(self, image_path: Path) -> Tuple[FaceQualityResult, Optional[np.ndarray]]:
-        img = cv2.imread(str(image_path))
-        if img is None:
-            return FaceQualityResult(False, "Unreadable image"), None
-
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        h, w = gray.shape
-
-        face = detect_single_face(gray)
-        if face is None:
-            return FaceQualityResult(False, "No face or multiple faces"), None
+        fc = self.check_detailed(image_path)
+        return fc.result, fc.aligned
+
+    def check_detailed(self, image_path: Path) -> FaceCheck:
+        return next(self.check_many([image_path]))
+
+    def check_many(self, image_paths: Iterable[Path]) -> Iterator[FaceCheck]:
+        """
+        check_detailed per path, in order. Images are analysed in groups of
+        the detector's batch size, so batching backends run one forward
+        pass per group.
+        """
+        batch: List[Path] = []
+        for p in image_paths:
+            batch.append(p)
+            if len(batch) >= self._batch_size:
+                yield from self._check_batch(batch)
+                batch = []
+        if batch:
+            yield from self._check_batch(batch)
+
+    def _check_batch(self, image_paths: List[Path]) -> Iterator[FaceCheck]:
+        analyses = get_analyses(image_paths, self.max_side, detector=self.detector)
+        for p, a in zip(image_paths, analyses):
+            with metrics.span("face_check") as span:
+                fc = self._finish(p, a)
+                span["result"] = "accepted" if fc.result.ok else "rejected"
+            metrics.inc("face_checks", result=span["result"])
+            yield fc
+
+    def evaluate(self, a: FaceAnalysis) -> FaceQualityResult:
+        """
+        Apply the thresholds to a (possibly persisted) analysis; changing
+        thresholds never requires re-detection.
+        """
+        if a.reason:
+            return FaceQualityResult(False, a.reason)
+        if a.landmarks68 is None:
+            return FaceQualityResult(False, "No landmarks")
+
+        ratio = a.face_ratio or 0.0
+        if not (self.min_face_ratio <= ratio <= self.max_face_ratio):
+            return FaceQualityResult(False, f"Bad face ratio {ratio:.2f}")
 
-        lm = get_landmarks(gray, face)
+        if (a.yaw or 0.0) > self.max_yaw:
+            return FaceQualityResult(False, f"Yaw too large {a.yaw:.1f}°")
 
-        left_eye = lm[36]
-        right_eye = lm[45]
-        nose = lm[30]
-        top = lm[27]
-        bottom = lm[8]
+        if (a.eye_tilt or 0.0) > self.max_eye_tilt:
+            return FaceQualityResult(False, f"Eye tilt {a.eye_tilt:.1f}°")
 
-        ratio = face_ratio(top, bottom, h)
-        if not (self.min_face_ratio <= ratio <= self.max_face_ratio):
-            return FaceQualityResult(False, f"Bad face ratio {ratio:.2f}"), None
+        if (a.mouth_open or 0.0) > 0.15:
+            return FaceQualityResult(False, "Mouth too open")
 
-        yaw = estimate_yaw(left_eye, right_eye, nose)
-        if yaw > self.max_yaw:
-            return FaceQualityResult(False, f"Yaw too large {yaw:.1f}°"), None
+        return FaceQualityResult(True)
 
-        tilt = eye_tilt(left_eye, right_eye)
-        if tilt > self.max_eye_tilt:
-            return FaceQualityResult(False, f"Eye tilt {tilt:.1f}°"), None
+    def _finish(self, image_path: Path, analysis: Optional[FaceAnalysis]) -> FaceCheck:
+        if analysis is None:
+            return FaceCheck(FaceQualityResult(False, "Unreadable image"))
 
-        mouth_open = np.linalg.norm(lm[62] - lm[66])
-        face_height = np.linalg.norm(top - bottom)
+        result = self.evaluate(analysis)
+        if not result.ok:
+            return FaceCheck(result, analysis=analysis)
 
-        if mouth_open > face_height * 0.15:
-            return FaceQualityResult(False, "Mouth too open"), None
+        # Same decode the analysis used; usually still in the shared cache
+        loaded = load_image(image_path, self.max_side)
+        if loaded is None:
+            return FaceCheck(FaceQualityResult(False, "Unreadable image"))
 
-        aligned = align_face(img, left_eye, right_eye)
-        return FaceQualityResult(True), aligned
+        aligned, transform = render_roi(loaded, analysis)
+        return FaceCheck(result, aligned, analysis, transform)
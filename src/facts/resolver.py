@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
 
 from ..config.settings import settings
 from ..utils.slug import slugify
@@ -8,8 +11,9 @@ from ..utils.filesystem import read_json, write_json
 from ..utils.logger import get_logger
 
 from .models import CelebrityFacts, SourceFlags
-from .wikipedia import search_best_title, resolve_page
-from .wikidata import get_facts
+from . import wikidata, wikipedia
+from .wikipedia import WikipediaResolved, search_best_title, resolve_page, resolve_pages
+from .wikidata import WikidataFacts, get_facts, get_facts_many
 from .validator import validate_birth_date
 
 log = get_logger("facts")
@@ -39,16 +43,24 @@ def resolve_celebrity_facts(name: str, force: bool = False) -> CelebrityFacts:
 
     # 3) Wikidata DOB
     wd = get_facts(wp.wikidata_id)
+    facts = _build_facts(name, wp, wd)
+
+    write_json(out_path, facts.model_dump())
+    log.info(f"✅ facts cached → {out_path.as_posix()}")
+    return facts
+
+
+def _build_facts(name: str, wp: WikipediaResolved, wd: WikidataFacts) -> CelebrityFacts:
     v = validate_birth_date(wd.birth_date)
     if not v.ok:
         raise ValueError(f"Facts validation failed for '{name}': {v.reason}")
 
-    facts = CelebrityFacts(
+    return CelebrityFacts(
         name=name,
         slug=slugify(name),
         wikipedia_title=wp.title,
         wikipedia_url=wp.url,
-        wikidata_id=wp.wikidata_id,
+        wikidata_id=wd.wikidata_id,
         birth_date=wd.birth_date or "",
         confidence=float(v.confidence),
         target_year_end=settings.target_year_end,
@@ -62,10 +74,120 @@ def resolve_celebrity_facts(name: str, force: bool = False) -> CelebrityFacts:
             },
             "wikidata": {
                 "occupations_qids": wd.occupations,
+                "occupations": wd.occupation_labels,
+                "death_date": wd.death_date,
+                "image": wd.image,
             },
         },
     )
 
-    write_json(out_path, facts.model_dump())
-    log.info(f"✅ facts cached → {out_path.as_posix()}")
-    return facts
+
+# ---------------------------------------------------------------------
+# BULK
+# ---------------------------------------------------------------------
+
+
+# Request/response failures a bulk run survives (per batch or per name)
+_REQUEST_ERRORS = (requests.RequestException, ValueError)
+
+
+def _pages_by_batch(titles: List[str]) -> Dict[str, Optional[WikipediaResolved]]:
+    """
+    resolve_pages one batch at a time; a failed batch maps its titles to None.
+    """
+    out: Dict[str, Optional[WikipediaResolved]] = {}
+    for i in range(0, len(titles), wikipedia.BATCH_SIZE):
+        batch = titles[i : i + wikipedia.BATCH_SIZE]
+        try:
+            out.update(resolve_pages(batch))
+        except _REQUEST_ERRORS as e:
+            log.warning(f"⚠️ Wikipedia batch of {len(batch)} failed: {e}")
+            out.update(dict.fromkeys(batch))
+    return out
+
+
+def _facts_by_batch(qids: List[str]) -> Dict[str, WikidataFacts]:
+    """
+    get_facts_many one batch at a time; a failed batch is left out.
+    """
+    out: Dict[str, WikidataFacts] = {}
+    for i in range(0, len(qids), wikidata.BATCH_SIZE):
+        batch = qids[i : i + wikidata.BATCH_SIZE]
+        try:
+            out.update(get_facts_many(batch))
+        except _REQUEST_ERRORS as e:
+            log.warning(f"⚠️ Wikidata batch of {len(batch)} failed: {e}")
+    return out
+
+
+def _search_title(name: str) -> Optional[str]:
+    try:
+        return search_best_title(name)
+    except _REQUEST_ERRORS as e:
+        log.warning(f"⚠️ Title search failed for {name}: {e}")
+        return None
+
+
+def resolve_many(
+    names: List[str], force: bool = False
+) -> Dict[str, Optional[CelebrityFacts]]:
+    """
+    Resolve a whole queue in a few round trips: names are tried directly as
+    Wikipedia titles (50 per query), only misses fall back to per-name
+    search, and birth dates come from batched wbgetentities.
+    Failures (including a failed batch or search) map to None and are
+    logged, not raised.
+
+    Unlike resolve_celebrity_facts, which always takes the top search hit,
+    a name that is itself an article title (redirects followed, not a
+    disambiguation page) resolves to that article without searching.
+    """
+    settings.ensure_dirs()
+    out: Dict[str, Optional[CelebrityFacts]] = {}
+
+    todo: List[str] = []
+    for name in dict.fromkeys(names):
+        path = facts_path_for(name)
+        if path.exists() and not force:
+            out[name] = CelebrityFacts.model_validate(read_json(path))
+        else:
+            todo.append(name)
+
+    if not todo:
+        return out
+
+    # 1) Titles: direct batch, then search for what didn't resolve
+    pages = _pages_by_batch(todo)
+    misses = [n for n in todo if pages.get(n) is None or not pages[n].wikidata_id]
+    if misses:
+        log.info(f"🔎 {len(misses)} name(s) need a title search")
+        searched = {n: _search_title(n) for n in misses}
+        found = _pages_by_batch([t for t in dict.fromkeys(searched.values()) if t])
+        for n, t in searched.items():
+            pages[n] = found.get(t) if t else None
+
+    # 2) Wikidata, batched
+    qids = [wp.wikidata_id for wp in pages.values() if wp and wp.wikidata_id]
+    wd_by_id = _facts_by_batch(list(dict.fromkeys(qids)))
+
+    # 3) Validate + write
+    for name in todo:
+        wp = pages.get(name)
+        wd = wd_by_id.get(wp.wikidata_id) if wp and wp.wikidata_id else None
+        if wp is None or wd is None:
+            log.warning(f"⚠️ Could not resolve facts for: {name}")
+            out[name] = None
+            continue
+        try:
+            facts = _build_facts(name, wp, wd)
+        except ValueError as e:
+            log.warning(f"⚠️ {e}")
+            out[name] = None
+            continue
+
+        write_json(facts_path_for(name), facts.model_dump())
+        out[name] = facts
+
+    ok = sum(1 for n in todo if out.get(n) is not None)
+    log.info(f"✅ Bulk facts: {ok}/{len(todo)} resolved ({len(names) - len(todo)} cached)")
+    return out
@@ -1,11 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
 
 import requests
 
 from ..config.settings import settings
+from ..utils.filesystem import read_json, write_json
+from ..utils.metrics import metrics
+from ..utils.rate_limit import rate_limited_get
+
+
+API = "https://www.wikidata.org/w/api.php"
+BATCH_SIZE = 50  # wbgetentities `ids` limit
+
+# Only these claims are read; everything else in the entity is ignored
+P_BIRTH = "P569"
+P_DEATH = "P570"
+P_OCCUPATION = "P106"
+P_IMAGE = "P18"
+
+LABELS_CACHE = settings.cache_dir / "wikidata_labels.json"
 
 
 @dataclass
@@ -13,6 +29,9 @@ class WikidataFacts:
     wikidata_id: str
     birth_date: Optional[str]  # YYYY-MM-DD
     occupations: list[str]
+    death_date: Optional[str] = None
+    image: Optional[str] = None  # Commons file name
+    occupation_labels: list[str] = field(default_factory=list)
 
 
 def _session() -> requests.Session:
@@ -21,61 +40,163 @@ def _session() -> requests.Session:
     return s
 
 
+# ---------------------------------------------------------------------
+# FETCH
+# ---------------------------------------------------------------------
+
+
+def _get_entities(
+    s: requests.Session, ids: List[str], props: str, **extra: str
+) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for i in range(0, len(ids), BATCH_SIZE):
+        params = {
+            "action": "wbgetentities",
+            "format": "json",
+            "ids": "|".join(ids[i : i + BATCH_SIZE]),
+            "props": props,
+            **extra,
+        }
+        r = rate_limited_get(API, session=s, params=params, timeout=settings.http_timeout)
+        r.raise_for_status()
+        for qid, entity in (r.json().get("entities") or {}).items():
+            if "missing" not in entity:
+                out[qid] = entity
+    return out
+
+
+@metrics.timed("facts_request", source="wikidata_batch")
+def fetch_entities(wikidata_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Claims for many Q-ids via wbgetentities (props=claims skips labels,
+    descriptions and sitelinks), BATCH_SIZE ids per request.
+    """
+    return _get_entities(_session(), list(dict.fromkeys(wikidata_ids)), "claims")
+
+
+@metrics.timed("facts_request", source="wikidata")
 def fetch_entity(wikidata_id: str) -> Dict[str, Any]:
-    s = _session()
-    url = "https://www.wikidata.org/wiki/Special:EntityData/{}.json".format(wikidata_id)
-    r = s.get(url, timeout=settings.http_timeout)
-    r.raise_for_status()
-    return r.json()
+    """
+    Claims of one entity; a fraction of Special:EntityData's full JSON.
+    """
+    return _get_entities(_session(), [wikidata_id], "claims").get(wikidata_id, {})
 
 
-def _first_time_claim(entity: Dict[str, Any], prop: str) -> Optional[str]:
+# ---------------------------------------------------------------------
+# PARSING
+# ---------------------------------------------------------------------
+
+
+def _statements(claims: Dict[str, Any], prop: str) -> List[Any]:
     """
-    Extracts first time value from claims (e.g. P569 date of birth).
-    Returns ISO date YYYY-MM-DD if possible.
+    Values of `prop`, preferred rank first, deprecated dropped.
     """
-    claims = (
-        (entity.get("entities") or {}).get(next(iter(entity.get("entities", {}))), {})
-        or {}
-    ).get("claims") or {}
-    arr = claims.get(prop) or []
-    for c in arr:
-        mainsnak = c.get("mainsnak") or {}
-        datavalue = mainsnak.get("datavalue") or {}
-        value = datavalue.get("value") or {}
-        time_str = value.get("time")
-        if time_str and isinstance(time_str, str):
-            # Format like "+1974-11-11T00:00:00Z"
-            # We normalize to YYYY-MM-DD
-            t = time_str.lstrip("+")
-            if "T" in t:
-                t = t.split("T")[0]
-            if len(t) >= 10:
-                return t[:10]
-    return None
-
-
-def _extract_occupations(entity: Dict[str, Any]) -> list[str]:
-    # Occupation property P106 points to other Q-ids; we can keep labels later if needed.
-    # For now return empty or Q-ids; resolver can keep raw.
-    claims = (
-        (entity.get("entities") or {}).get(next(iter(entity.get("entities", {}))), {})
-        or {}
-    ).get("claims") or {}
-    occ = []
-    for c in claims.get("P106", []) or []:
-        dv = ((c.get("mainsnak") or {}).get("datavalue") or {}).get("value") or {}
-        qid = dv.get("id")
-        if qid:
-            occ.append(qid)
-    return occ
+    best: List[Any] = []
+    normal: List[Any] = []
+    for c in claims.get(prop) or []:
+        rank = c.get("rank", "normal")
+        if rank == "deprecated":
+            continue
+        value = (((c.get("mainsnak") or {}).get("datavalue")) or {}).get("value")
+        if value is None:
+            continue
+        (best if rank == "preferred" else normal).append(value)
+    return best + normal
 
 
-def get_facts(wikidata_id: str) -> WikidataFacts:
-    data = fetch_entity(wikidata_id)
-    entity = data  # contains "entities"
-    birth_date = _first_time_claim(entity, "P569")
-    occupations = _extract_occupations(entity)
+def _iso_date(value: Any) -> Optional[str]:
+    # Format like "+1974-11-11T00:00:00Z" → YYYY-MM-DD
+    time_str = value.get("time") if isinstance(value, dict) else None
+    if not time_str or not isinstance(time_str, str):
+        return None
+    t = time_str.lstrip("+").split("T")[0]
+    return t[:10] if len(t) >= 10 else None
+
+
+def parse_claims(wikidata_id: str, entity: Dict[str, Any]) -> WikidataFacts:
+    """
+    Read the handful of properties we use straight from `claims`; nothing
+    else in the entity is walked.
+    """
+    claims = entity.get("claims") or {}
+
+    birth = next(filter(None, map(_iso_date, _statements(claims, P_BIRTH))), None)
+    death = next(filter(None, map(_iso_date, _statements(claims, P_DEATH))), None)
+    occupations = [
+        v["id"] for v in _statements(claims, P_OCCUPATION) if isinstance(v, dict) and v.get("id")
+    ]
+    image = next((v for v in _statements(claims, P_IMAGE) if isinstance(v, str)), None)
+
     return WikidataFacts(
-        wikidata_id=wikidata_id, birth_date=birth_date, occupations=occupations
+        wikidata_id=wikidata_id,
+        birth_date=birth,
+        occupations=list(dict.fromkeys(occupations)),
+        death_date=death,
+        image=image,
     )
+
+
+# ---------------------------------------------------------------------
+# OCCUPATION LABELS (cached; the same few hundred Q-ids recur)
+# ---------------------------------------------------------------------
+
+_labels: Optional[Dict[str, str]] = None
+_labels_lock = threading.Lock()
+
+
+def occupation_labels(qids: List[str]) -> Dict[str, str]:
+    """
+    English labels for occupation Q-ids, fetched once and kept in
+    data/cache/wikidata_labels.json.
+    """
+    global _labels
+    with _labels_lock:
+        if _labels is None:
+            _labels = read_json(LABELS_CACHE, default={}) or {}
+
+        missing = [q for q in dict.fromkeys(qids) if q not in _labels]
+        if missing:
+            metrics.inc("wikidata_labels", len(missing), result="miss")
+            try:
+                entities = _get_entities(
+                    _session(), missing, "labels", languages="en", languagefallback="1"
+                )
+            except requests.RequestException:
+                entities = {}  # labels are cosmetic; retry next time
+            for qid, entity in entities.items():
+                label = ((entity.get("labels") or {}).get("en") or {}).get("value")
+                if label:
+                    _labels[qid] = label
+            if entities:
+                write_json(LABELS_CACHE, _labels)
+
+        return {q: _labels[q] for q in qids if q in _labels}
+
+
+def _with_labels(facts: List[WikidataFacts]) -> None:
+    labels = occupation_labels([q for f in facts for q in f.occupations])
+    for f in facts:
+        f.occupation_labels = [labels[q] for q in f.occupations if q in labels]
+
+
+# ---------------------------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------------------------
+
+
+def get_facts(wikidata_id: str) -> WikidataFacts:
+    facts = parse_claims(wikidata_id, fetch_entity(wikidata_id))
+    _with_labels([facts])
+    return facts
+
+
+def get_facts_many(wikidata_ids: List[str]) -> Dict[str, WikidataFacts]:
+    """
+    get_facts() for many Q-ids in a handful of requests.
+    """
+    out = {
+        qid: parse_claims(qid, entity)
+        for qid, entity in fetch_entities(wikidata_ids).items()
+    }
+    _with_labels(list(out.values()))
+    return out
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 import requests
 
 from ..config.settings import settings
+from ..utils.metrics import metrics
+from ..utils.rate_limit import rate_limited_get
+
+
+API = "https://en.wikipedia.org/w/api.php"
+BATCH_SIZE = 50  # MediaWiki `titles` limit for regular clients
 
 
 @dataclass
@@ -24,6 +30,7 @@ def _session() -> requests.Session:
     return s
 
 
+@metrics.timed("facts_request", source="wikipedia_search")
 def search_best_title(name: str) -> Optional[str]:
     """
     Uses MediaWiki opensearch to get best matching title.
@@ -44,6 +51,94 @@ def search_best_title(name: str) -> Optional[str]:
     return titles[0] if titles else None
 
 
+def _page_params(titles: List[str]) -> Dict[str, Any]:
+    return {
+        "action": "query",
+        "format": "json",
+        "formatversion": 2,
+        "prop": "info|pageprops|extracts",
+        "inprop": "url",
+        "ppprop": "wikibase_item|wikibase-shortdesc|disambiguation",
+        "exintro": 1,
+        "explaintext": 1,
+        "exlimit": "max",
+        "redirects": 1,
+        "titles": "|".join(titles),
+    }
+
+
+def _to_resolved(page: Dict[str, Any]) -> WikipediaResolved:
+    title = page["title"]
+    props = page.get("pageprops") or {}
+    return WikipediaResolved(
+        title=title,
+        pageid=int(page["pageid"]),
+        url=page.get("fullurl") or f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
+        description=props.get("wikibase-shortdesc"),
+        extract=page.get("extract"),
+        wikidata_id=props.get("wikibase_item"),
+    )
+
+
+def _query_pages(
+    s: requests.Session, titles: List[str]
+) -> tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    One titles batch, following `continue` (extracts page through 20 at a
+    time). Returns pages by final title and input title → final title.
+    """
+    params = _page_params(titles)
+    pages: Dict[str, Dict[str, Any]] = {}
+    aliases: Dict[str, str] = {}
+
+    while True:
+        r = rate_limited_get(API, session=s, params=params, timeout=settings.http_timeout)
+        r.raise_for_status()
+        j = r.json()
+        q = j.get("query") or {}
+
+        for hop in (q.get("normalized") or []) + (q.get("redirects") or []):
+            aliases[hop["from"]] = hop["to"]
+        for page in q.get("pages") or []:
+            pages.setdefault(page["title"], {}).update(page)
+
+        if "continue" not in j:
+            return pages, aliases
+        params = {**_page_params(titles), **j["continue"]}
+
+
+@metrics.timed("facts_request", source="wikipedia_pages")
+def resolve_pages(titles: List[str]) -> Dict[str, Optional[WikipediaResolved]]:
+    """
+    Resolve many titles in batches of BATCH_SIZE (redirects followed).
+    Missing pages and disambiguation pages map to None.
+    """
+    s = _session()
+    out: Dict[str, Optional[WikipediaResolved]] = {}
+
+    for i in range(0, len(titles), BATCH_SIZE):
+        batch = titles[i : i + BATCH_SIZE]
+        pages, aliases = _query_pages(s, batch)
+
+        for title in batch:
+            final = title
+            for _ in range(3):  # normalized → redirect → (normalized)
+                final = aliases.get(final, final)
+            page = pages.get(final)
+            if (
+                not page
+                or page.get("missing")
+                or "pageid" not in page
+                or "disambiguation" in (page.get("pageprops") or {})
+            ):
+                out[title] = None
+            else:
+                out[title] = _to_resolved(page)
+
+    return out
+
+
+@metrics.timed("facts_request", source="wikipedia_page")
 def resolve_page(title: str) -> WikipediaResolved:
     """
     Fetch pageid + canonical url + wikidata Q-id via pageprops.
@@ -55,7 +150,7 @@ def resolve_page(title: str) -> WikipediaResolved:
         "format": "json",
         "prop": "info|pageprops|extracts",
         "inprop": "url",
-        "ppprop": "wikibase_item",
+        "ppprop": "wikibase_item|wikibase-shortdesc",
         "exintro": 1,
         "explaintext": 1,
         "redirects": 1,
@@ -80,17 +175,19 @@ def resolve_page(title: str) -> WikipediaResolved:
         or f"https://en.wikipedia.org/wiki/{canonical_title.replace(' ', '_')}"
     )
     extract = page.get("extract")
-    wikidata_id = (page.get("pageprops") or {}).get("wikibase_item")
-
-    # Description is available via REST summary endpoint; optional.
-    description = None
-    try:
-        rest = f"https://en.wikipedia.org/api/rest_v1/page/summary/{canonical_title.replace(' ', '%20')}"
-        rr = s.get(rest, timeout=settings.http_timeout)
-        if rr.ok:
-            description = (rr.json() or {}).get("description")
-    except Exception:
-        pass
+    props = page.get("pageprops") or {}
+    wikidata_id = props.get("wikibase_item")
+
+    # Short description comes with pageprops; REST summary only as fallback
+    description = props.get("wikibase-shortdesc")
+    if not description:
+        try:
+            rest = f"https://en.wikipedia.org/api/rest_v1/page/summary/{canonical_title.replace(' ', '%20')}"
+            rr = s.get(rest, timeout=settings.http_timeout)
+            if rr.ok:
+                description = (rr.json() or {}).get("description")
+        except Exception:
+            pass
 
     return WikipediaResolved(
         title=canonical_title,
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from ..utils.slug import slugify
 from ..utils.filesystem import write_json
+from ..utils.metrics import metrics
 from .models import ImageCandidate, ImageManifest
+from .year_index import DEFAULT_FACE_QUALITY, YearIndex
 
 
 # ---------------------------------------------------------------------
@@ -17,6 +20,13 @@ MAX_ANCHORS = 8
 MIN_ANCHORS = 5
 MIN_YEAR_GAP = 3  # minimum spacing between anchors (years)
 
+# Scoring weights (per-anchor scores are in [0, 1] before weighting)
+CONFIDENCE_WEIGHT = 0.6
+FACE_QUALITY_WEIGHT = 0.4
+COVERAGE_WEIGHT = 2.0  # covering the full dated span is worth ~2 perfect anchors
+
+INDEX_PER_YEAR = 3  # best-scored candidates per year kept for the DP
+
 
 # ---------------------------------------------------------------------
 # DATA MODEL
@@ -30,138 +40,313 @@ class Anchor:
     image_path: str
     source: str
     verified: bool
+    score: float = 0.0
+    explain: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _Scored:
+    year: int
+    score: float
+    candidate: ImageCandidate
+    parts: Dict[str, Any]
 
 
 # ---------------------------------------------------------------------
-# CORE LOGIC
+# SCORING
 # ---------------------------------------------------------------------
 
 
-def select_anchors(
-    manifest: ImageManifest,
-    birth_year: int,
-) -> List[Anchor]:
-    """
-    Select timeline anchors from collected images.
+def _face_quality(c: ImageCandidate) -> float:
+    raw = c.meta.get("face_quality")
+    if raw is None:
+        return DEFAULT_FACE_QUALITY
+    try:
+        return min(1.0, max(0.0, float(raw)))
+    except (TypeError, ValueError):
+        return DEFAULT_FACE_QUALITY
 
-    Strategy:
-    1. Prefer VERIFIED images
-    2. Sort chronologically
-    3. Enforce year spacing
-    4. Cap to MAX_ANCHORS
-    """
 
-    # Step 1 — keep only images with known year and local file
-    dated: List[ImageCandidate] = []
-    for c in manifest.candidates:
-        if not c.verified:
-            continue
-        if c.verified_date is None:
-            continue
-        if c.local_path is None:
+def _anchor_score(confidence: float, face_quality: float) -> float:
+    return CONFIDENCE_WEIGHT * confidence + FACE_QUALITY_WEIGHT * face_quality
+
+
+def _score_candidate(c: ImageCandidate) -> _Scored:
+    vd = c.verified_date
+    assert vd is not None
+
+    confidence = min(1.0, max(0.0, float(vd.confidence)))
+    face_q = _face_quality(c)
+    score = _anchor_score(confidence, face_q)
+
+    return _Scored(
+        year=vd.year,
+        score=score,
+        candidate=c,
+        parts={
+            "confidence": round(confidence, 3),
+            "date_method": vd.method,
+            "face_quality": round(face_q, 3),
+        },
+    )
+
+
+def _eligible(manifest: ImageManifest) -> List[ImageCandidate]:
+    """
+    Keep only verified images with a known year and a local file, the
+    INDEX_PER_YEAR best by anchor score in each year.
+
+    Walks the per-year index (old manifests get it rebuilt once). Its
+    entries are ordered by confidence, which can rank a sharper face
+    below a blurrier one; an entry can score at most
+    _anchor_score(confidence, 1.0), so the walk stops once the kept
+    candidates beat that bound.
+    """
+    index = YearIndex.from_manifest(manifest)
+
+    out: List[ImageCandidate] = []
+    for _, entries in index.walk(top_n=len(index)):
+        kept: List[_Scored] = []
+        for e in entries:
+            if len(kept) >= INDEX_PER_YEAR and kept[-1].score >= _anchor_score(
+                e.confidence, 1.0
+            ):
+                break
+            c = manifest.candidates[e.idx]
+            if c.verified_date is not None and c.local_path is not None:
+                kept.append(_score_candidate(c))
+                kept.sort(key=lambda sc: -sc.score)
+                del kept[INDEX_PER_YEAR:]
+        out.extend(sc.candidate for sc in kept)
+    return _drop_duplicate_photos(out)
+
+
+def _drop_duplicate_photos(cands: List[ImageCandidate]) -> List[ImageCandidate]:
+    """
+    The same photo re-uploaded under another title or source (often with
+    a different date) would fill two anchor slots. Collapse near-identical
+    face embeddings (face_key, set by the collector's identity check) to
+    the most confidently dated copy.
+    """
+    keyed = [c for c in cands if c.meta.get("face_key")]
+    if len(keyed) < 2:
+        return cands
+    try:
+        from ..face.embedding_index import embedding_index
+
+        index = embedding_index()
+    except ImportError:
+        return cands
+
+    keyed.sort(key=lambda c: -c.verified_date.confidence)  # type: ignore[union-attr]
+    kept: set[str] = set()
+    dropped: set[int] = set()
+    for c in keyed:
+        key = c.meta["face_key"]
+        if key in kept or any(m.key in kept for m in index.duplicates_of(key)):
+            dropped.add(id(c))
             continue
-        dated.append(c)
+        kept.add(key)
 
-    if not dated:
-        raise RuntimeError("No verified images available for anchor selection")
+    if dropped:
+        metrics.inc("anchor_duplicates", len(dropped))
+    return [c for c in cands if id(c) not in dropped]
 
-    # Step 2 — sort by year (safe: verified_date is guaranteed)
-    dated.sort(key=lambda c: c.verified_date.year)  # type: ignore[arg-type]
 
-    anchors: List[Anchor] = []
-    last_year: int | None = None
+# ---------------------------------------------------------------------
+# CORE LOGIC
+# ---------------------------------------------------------------------
 
-    for c in dated:
-        vd = c.verified_date
-        lp = c.local_path
 
-        # Explicit narrowing for type checker
-        assert vd is not None
-        assert lp is not None
+def _dp_select(
+    scored: List[_Scored],
+    min_gap: int,
+    max_anchors: int,
+) -> List[_Scored]:
+    """
+    Pick at most `max_anchors` items, pairwise at least `min_gap` years apart,
+    maximizing sum(score) + COVERAGE_WEIGHT * (covered span / full span).
 
-        year = vd.year
+    The coverage term telescopes (last_year - first_year), so it splits into a
+    per-item start/end bonus and the problem stays a chain DP:
 
-        if last_year is not None and (year - last_year) < MIN_YEAR_GAP:
-            continue
+        best[k][i] = score[i] + max(best[k-1][j] for year[j] <= year[i] - gap)
 
-        age = year - birth_year
+    The inner max is a prefix maximum found with one bisect per item, giving
+    O(n log n) for the sort + bisects and O(n * max_anchors) for the layers.
+    """
+    if not scored:
+        return []
+
+    items = sorted(scored, key=lambda s: (s.year, -s.score))
+    years = [s.year for s in items]
+    n = len(items)
+
+    full_span = max(1, years[-1] - years[0])
+    cov = COVERAGE_WEIGHT / full_span
+
+    # prev[i] = number of items that may precede item i in a chain
+    prev = [bisect_right(years, y - min_gap) for y in years]
+
+    neg = float("-inf")
+    layer = [s.score - cov * s.year for s in items]
+    layers: List[List[float]] = [layer]
+    backs: List[List[int]] = [[-1] * n]
+
+    for _ in range(1, max_anchors):
+        pm_val: List[float] = []
+        pm_idx: List[int] = []
+        run_val, run_idx = neg, -1
+        for j, v in enumerate(layer):
+            if v > run_val:
+                run_val, run_idx = v, j
+            pm_val.append(run_val)
+            pm_idx.append(run_idx)
+
+        cur = [neg] * n
+        back = [-1] * n
+        for i in range(n):
+            p = prev[i]
+            if p == 0 or pm_val[p - 1] == neg:
+                continue
+            cur[i] = items[i].score + pm_val[p - 1]
+            back[i] = pm_idx[p - 1]
+
+        if all(v == neg for v in cur):
+            break
+
+        layers.append(cur)
+        backs.append(back)
+        layer = cur
+
+    best_val, best_k, best_i = neg, -1, -1
+    for k, vals in enumerate(layers):
+        for i, v in enumerate(vals):
+            if v == neg:
+                continue
+            total = v + cov * items[i].year
+            if total > best_val:
+                best_val, best_k, best_i = total, k, i
+
+    chosen: List[_Scored] = []
+    k, i = best_k, best_i
+    while k >= 0 and i >= 0:
+        chosen.append(items[i])
+        i = backs[k][i]
+        k -= 1
+    chosen.reverse()
+
+    first, last = chosen[0].year, chosen[-1].year
+    for pos, s in enumerate(chosen):
+        gap_before = s.year - chosen[pos - 1].year if pos > 0 else 0
+        s.parts["coverage"] = round(
+            COVERAGE_WEIGHT * gap_before / full_span, 3
+        )
+        s.parts["gap_before"] = gap_before
+        s.parts["span"] = [first, last]
+        s.parts["min_gap"] = min_gap
+        s.parts["rank_in_year"] = 1 + sum(
+            1 for o in items if o.year == s.year and o.score > s.score
+        )
+
+    return chosen
+
+
+def _to_anchors(chosen: List[_Scored], birth_year: int) -> List[Anchor]:
+    anchors: List[Anchor] = []
+    for s in chosen:
+        lp = s.candidate.local_path
+        vd = s.candidate.verified_date
+        assert lp is not None and vd is not None
+
+        p = s.parts
+        reason = (
+            f"best {s.year} image (confidence={p['confidence']} via "
+            f"{p['date_method']}, face_quality={p['face_quality']})"
+        )
+        if p["gap_before"]:
+            reason += f"; extends timeline by {p['gap_before']}y"
+        else:
+            reason += "; opens timeline"
 
         anchors.append(
             Anchor(
-                year=year,
-                age=age,
+                year=s.year,
+                age=s.year - birth_year,
                 image_path=lp,
-                source=c.source,
-                verified=True,
+                source=s.candidate.source,
+                verified=not vd.estimated,  # age-estimated year
+                score=round(s.score, 4),
+                explain={**p, "reason": reason},
             )
         )
+    return anchors
 
-        last_year = year
 
-        if len(anchors) >= MAX_ANCHORS:
-            break
+@metrics.timed("anchor_select")
+def select_anchors(
+    manifest: ImageManifest,
+    birth_year: int,
+    min_year_gap: int = MIN_YEAR_GAP,
+    max_anchors: int = MAX_ANCHORS,
+) -> List[Anchor]:
+    """
+    Select timeline anchors from collected images.
+
+    Strategy:
+    1. Keep dated images with a local file (metadata dates, or the lower
+       confidence age estimates for otherwise undated faces)
+    2. Score each by date confidence + face quality
+    3. DP over the sorted timeline for the best spaced set, with a bonus
+       for the span it covers
+    4. Relax spacing if fewer than MIN_ANCHORS survive
+    """
+    if min_year_gap < 1:
+        # The DP spaces anchors by year; a gap of 0 could pick one twice
+        raise ValueError(f"min_year_gap must be at least 1, got {min_year_gap}")
 
-    # Step 3 — fallback if spacing was too strict
-    if len(anchors) < MIN_ANCHORS:
-        anchors = _relaxed_selection(dated, birth_year)
+    dated = _eligible(manifest)
+    if not dated:
+        raise RuntimeError("No verified images available for anchor selection")
 
-    return anchors
+    scored = [_score_candidate(c) for c in dated]
+    chosen = _dp_select(scored, min_year_gap, max_anchors)
+
+    if len(chosen) < MIN_ANCHORS:
+        relaxed = _relaxed_selection(dated, birth_year, max_anchors=max_anchors)
+        if len(relaxed) > len(chosen):
+            return relaxed
+
+    return _to_anchors(chosen, birth_year)
 
 
 def _relaxed_selection(
     candidates: List[ImageCandidate],
     birth_year: int,
+    max_anchors: int = MAX_ANCHORS,
+    step: Optional[int] = None,
 ) -> List[Anchor]:
     """
     Fallback selection if strict spacing fails.
-    Picks evenly across the timeline.
+    Re-runs the DP with spacing derived from the timeline span.
     """
 
-    valid = []
-    for c in candidates:
-        if c.verified_date is None or c.local_path is None:
-            continue
-        valid.append(c)
+    valid = [
+        c for c in candidates if c.verified_date is not None and c.local_path is not None
+    ]
 
-    years = sorted({c.verified_date.year for c in valid})  # type: ignore[arg-type]
+    years = sorted({c.verified_date.year for c in valid})  # type: ignore[union-attr]
 
     if len(years) < 2:
         raise RuntimeError("Not enough distinct years for anchor selection")
 
-    span = years[-1] - years[0]
-    step = max(1, span // MAX_ANCHORS)
-
-    anchors: List[Anchor] = []
-    used_years: set[int] = set()
-
-    for c in valid:
-        vd = c.verified_date
-        lp = c.local_path
+    if step is None:
+        span = years[-1] - years[0]
+        step = max(1, span // max_anchors)
 
-        assert vd is not None
-        assert lp is not None
-
-        y = vd.year
-
-        if any(abs(y - uy) < step for uy in used_years):
-            continue
-
-        anchors.append(
-            Anchor(
-                year=y,
-                age=y - birth_year,
-                image_path=lp,
-                source=c.source,
-                verified=True,
-            )
-        )
-
-        used_years.add(y)
-
-        if len(anchors) >= MAX_ANCHORS:
-            break
-
-    return anchors
+    scored = [_score_candidate(c) for c in valid]
+    chosen = _dp_select(scored, step, max_anchors)
+    return _to_anchors(chosen, birth_year)
 
 
 # ---------------------------------------------------------------------
@@ -191,6 +376,8 @@ def save_anchor_timeline(
                 "image_path": a.image_path,
                 "source": a.source,
                 "verified": a.verified,
+                "score": a.score,
+                "explain": a.explain,
             }
             for a in anchors
         ],
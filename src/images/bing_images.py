@@ -1,28 +1,46 @@
 from __future__ import annotations
 
-import requests
 import re
 from typing import List, Dict
 
+from ..utils.html_stream import iter_matches, iter_text
+from ..utils.metrics import metrics
+from ..utils.rate_limit import rate_limited_get
 
+
+# Full-size URL inside each result's metadata; the JSON is usually
+# entity-escaped inside an attribute (m="{&quot;murl&quot;:…}")
+MURL = re.compile(r'(?:"|&quot;)murl(?:"|&quot;):(?:"|&quot;)(.*?)(?:"|&quot;)')
+
+
+@metrics.timed("source_request", source="bing")
 def search_bing_images(query: str, limit: int = 10) -> List[Dict]:
     """
     Lightweight Bing Images scraper (no API key).
+
+    Scans the page as it streams in and stops reading after `limit` hits.
     """
     url = f"https://www.bing.com/images/search?q={query.replace(' ', '+')}&form=HDRSC2"
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=15)
-    r.raise_for_status()
+    r = rate_limited_get(
+        url, headers={"User-Agent": "Mozilla/5.0"}, timeout=15, stream=True
+    )
 
     results = []
-    matches = re.findall(r'"murl":"(.*?)"', r.text)
+    try:
+        r.raise_for_status()
 
-    for m in matches[:limit]:
-        results.append(
-            {
-                "title": "bing_image",
-                "image_url": m,
-                "page_url": url,
-            }
-        )
+        for m in iter_matches(iter_text(r, "bing"), MURL):
+            results.append(
+                {
+                    "title": "bing_image",
+                    "image_url": m,
+                    "page_url": url,
+                }
+            )
+            if len(results) >= limit:
+                break
+    finally:
+        r.close()
 
+    metrics.inc("source_results", len(results), source="bing")
     return results
@@ -1,35 +1,59 @@
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from ..config.settings import settings
 from ..utils.logger import get_logger
-from ..utils.filesystem import read_json, write_json
+from ..utils.filesystem import link_or_copy, read_json, write_json
 from ..utils.slug import slugify
+from ..utils.metrics import metrics
 
-from .models import ImageCandidate, ImageManifest, VerifiedDate
-from .downloader import download_file
-from .exif import extract_exif_date
+from PIL import Image
+
+from .commons_index import commons_files
+from .models import AGE_ESTIMATE_METHOD, ImageCandidate, ImageManifest, VerifiedDate
+from .downloader import ImageProbe, download_file, probe_image
+from .exif import ExifDateSniffer, extract_exif_date
+from .year_index import YearIndex
+from .dedup import PerceptualDeduper, dhash
+from .search_planner import CoveragePlanner
 
 # Image sources
-from .wikimedia import (
-    search_commons_files,
-    fetch_commons_images,
-    extract_verified_date_from_commons,
-)
-from .wikipedia_page import fetch_wikipedia_page_images
-from .imdb_images import fetch_imdb_images
-from .bing_images import search_bing_images
-from .serpapi_images import (
-    serpapi_enabled,
-    search_google_images_serpapi,
-    to_candidate_items,
+from .serpapi_images import budget as serpapi_budget, cached_results
+from .sources import (
+    BingSource,
+    CommonsSource,
+    ImdbSource,
+    SerpApiSource,
+    SourceAdapter,
+    WikipediaPageSource,
+    build_portrait_query,
+    merge,
 )
 
 log = get_logger("images")
 
 
+# Probe thresholds: below these a full download can't yield a usable face
+MIN_IMAGE_SIDE = 256
+MIN_IMAGE_BYTES = 15_000
+
+MAX_DOWNLOADS = 140
+
+# Sources whose streams start once Commons is done. Until the first of
+# their candidates arrives, Commons may still be queueing, so the other
+# undated sources (Wikipedia page images, IMDb) wait for download slots.
+AFTER_COMMONS_SOURCES = ("bing", "serpapi")
+
+# Age-estimated dates: confidence falls linearly with the estimate's
+# spread (years), reaching 0 at AGE_MAX_SPREAD; below AGE_MIN_CONFIDENCE
+# the image stays undated
+AGE_MAX_SPREAD = 20.0
+AGE_MIN_CONFIDENCE = 0.1
+
+
 # ---------------------------------------------------------------------
 # PATH HELPERS
 # ---------------------------------------------------------------------
@@ -43,6 +67,10 @@ def raw_dir(celebrity_name: str) -> Path:
     return Path("images/raw") / slugify(celebrity_name)
 
 
+def thumbs_dir(celebrity_name: str) -> Path:
+    return Path("images/thumbs") / slugify(celebrity_name)
+
+
 # ---------------------------------------------------------------------
 # INTERNAL HELPERS
 # ---------------------------------------------------------------------
@@ -60,51 +88,276 @@ def _year_from_date(date_str: str) -> int:
     return int(date_str[:4])
 
 
-def build_portrait_query(name: str, year: int) -> str:
+def _apply_exif_date(
+    candidate: ImageCandidate, d: Optional[str], tag: Optional[str]
+) -> ImageCandidate:
+    if not d:
+        return candidate
+
+    candidate.verified = True
+    candidate.verified_date = VerifiedDate(
+        date=d,
+        year=_year_from_date(d),
+        method=f"exif:{tag}",
+        confidence=0.98 if tag == "DateTimeOriginal" else 0.93,
+    )
+    return candidate
+
+
+def _verify_with_exif(
+    candidate: ImageCandidate, sniffer: Optional[ExifDateSniffer] = None
+) -> ImageCandidate:
+    if candidate.local_path is None:
+        return candidate
+
+    # Dated during download when the sniffer saw the metadata segment
+    if sniffer is not None and sniffer.conclusive:
+        d, tag = sniffer.result
+        metrics.inc("exif_reads", via="stream", dated=bool(d))
+    else:
+        d, tag = extract_exif_date(Path(candidate.local_path))
+        metrics.inc("exif_reads", via="file", dated=bool(d))
+    return _apply_exif_date(candidate, d, tag)
+
+
+def _face_screener():
     """
-    Generic, celebrity-agnostic, face-centric query.
+    FaceQualityFilter for thumbnail screening, or None when the face stack
+    (dlib + landmark model) isn't available; screening is then dedup-only.
     """
-    return f"{name} portrait image facing camera directly {year}"
+    try:
+        from ..face.quality_filter import FaceQualityFilter
+
+        return FaceQualityFilter()
+    except (ImportError, FileNotFoundError) as e:
+        log.warning(f"⚠️ Face screening disabled: {e}")
+        return None
 
 
-def _verify_with_commons(candidate: ImageCandidate) -> ImageCandidate:
+def _reuse_commons_copy(candidate: ImageCandidate, kind: str, outpath: Path) -> bool:
+    """
+    Link a Commons file another collection already downloaded (group
+    photos match several celebrities) instead of fetching it again; its
+    face analysis comes along, so screening skips re-detection.
+    """
     if candidate.source != "wikimedia":
-        return candidate
+        return False
+    src = commons_files.local_copy(candidate.title, kind)
+    if src is None:
+        return False
+
+    from ..face.analysis import adopt_analysis
+
+    link_or_copy(src, outpath)
+    adopt_analysis(src, outpath)
+    candidate.meta["reused_from"] = src.as_posix()
+    metrics.inc("commons_reuse", kind=kind)
+    return True
+
+
+def _verify_identity(
+    celebrity_name: str, downloaded: List[ImageCandidate], year_index: YearIndex
+) -> None:
+    """
+    Compare every downloaded face with a reference built from the
+    Wikipedia/Commons portraits; mismatches (wrong person, someone else
+    in a group shot) are flagged and dropped from the year index, so no
+    later stage spends work on them. No-op without the face stack.
+    """
+    try:
+        from ..face.identity import REFERENCE_SOURCES, IdentityVerifier, save_reference
+
+        verifier = IdentityVerifier()
+    except (ImportError, FileNotFoundError) as e:
+        log.warning(f"⚠️ Identity check disabled: {e}")
+        return
+
+    files = [
+        (idx, c)
+        for idx, c in enumerate(downloaded)
+        if c.local_path and not c.meta.get("skipped")
+    ]
+    ref = verifier.reference(
+        [c.local_path for _, c in files if c.source in REFERENCE_SOURCES],
+        preferred=[c.local_path for _, c in files if c.source == "wikipedia_page"],
+    )
+    if ref is None:
+        log.warning("⚠️ No consistent reference portraits; identity check skipped")
+        return
+    save_reference(slugify(celebrity_name), ref)
+
+    checked = mismatched = 0
+    for idx, c in files:
+        key, emb = verifier.embed_with_key(c.local_path)
+        if emb is None:
+            continue  # no single usable face; the face filter decides
+        c.meta["face_key"] = key
+        d = ref.distance(emb)
+        checked += 1
+        c.meta["identity_distance"] = round(d, 3)
+        if d > ref.threshold:
+            c.meta["identity_mismatch"] = True
+            year_index.remove(idx)
+            mismatched += 1
+        metrics.inc("identity_checks", result="mismatch" if d > ref.threshold else "match")
+
+    log.info(
+        f"🪪 Identity: {mismatched}/{checked} faces rejected "
+        f"(reference: {len(ref.members)} portraits)"
+    )
+
 
-    date_str = candidate.meta.get("commons_date")
-    method = candidate.meta.get("commons_date_method")
+def _estimate_dates(
+    downloaded: List[ImageCandidate],
+    year_index: YearIndex,
+    birth_year: int,
+    end_year: int,
+) -> None:
+    """
+    Date the undated downloads (Bing, IMDb, Wikipedia, …) from the
+    apparent age of their face: year = birth_year + estimated age, at a
+    confidence below any metadata date. Only faces the identity check
+    confirmed are estimated, so nobody else's age dates a photo.
+    No-op without the age model.
+    """
+    todo = [
+        (idx, c)
+        for idx, c in enumerate(downloaded)
+        if c.local_path
+        and not c.verified
+        and "identity_distance" in c.meta
+        and not c.meta.get("identity_mismatch")
+    ]
+    if not todo:
+        return
 
-    if date_str and method:
-        candidate.verified = True
-        candidate.verified_date = VerifiedDate(
-            date=date_str,
-            year=_year_from_date(date_str),
-            method=str(method),
-            confidence=0.95,
+    try:
+        from ..face.age import AgeEstimator
+
+        estimator = AgeEstimator()
+    except (ImportError, FileNotFoundError) as e:
+        log.warning(f"⚠️ Age dating disabled: {e}")
+        return
+
+    estimates = estimator.estimate([c.local_path for _, c in todo])
+
+    dated = 0
+    for idx, c in todo:
+        est = estimates.get(c.local_path)  # type: ignore[arg-type]
+        if est is None:
+            continue
+        c.meta["estimated_age"] = round(est.age, 1)
+        c.meta["estimated_age_spread"] = round(est.spread, 1)
+
+        year = birth_year + int(round(est.age))
+        scale = 1.0 - est.spread / AGE_MAX_SPREAD
+        confidence = settings.age_estimate_confidence * scale
+        if not birth_year <= year <= end_year:
+            metrics.inc("age_dates", result="out_of_range")
+            continue
+        if confidence < AGE_MIN_CONFIDENCE:
+            metrics.inc("age_dates", result="uncertain")
+            continue
+
+        c.verified = True
+        c.verified_date = VerifiedDate(
+            date=f"{year}-07-01",  # year only; mid-year
+            year=year,
+            method=AGE_ESTIMATE_METHOD,
+            confidence=round(confidence, 3),
         )
-    return candidate
+        year_index.update(idx, c)
+        dated += 1
+        metrics.inc("age_dates", result="dated")
 
+    log.info(f"🎂 Age dating: {dated}/{len(todo)} undated faces dated")
 
-def _verify_with_exif(candidate: ImageCandidate) -> ImageCandidate:
-    if candidate.local_path is None:
-        return candidate
 
-    d, tag = extract_exif_date(Path(candidate.local_path))
-    if not d:
+def _screen_thumbnail(
+    candidate: ImageCandidate,
+    idx: int,
+    celebrity_name: str,
+    screener,
+    deduper: PerceptualDeduper,
+) -> Optional[str]:
+    """
+    Tier 1: fetch the ~800 px Commons thumbnail, dedup it perceptually and
+    run the face filter on it. Returns a rejection reason, or None if the
+    original is worth downloading.
+    """
+    thumb_url = candidate.meta.get("thumb_url")
+    if not thumb_url:
+        return None
+
+    outdir = thumbs_dir(celebrity_name)
+    outpath = outdir / f"{idx:03d}_{slugify(candidate.title)[:60]}{_safe_ext(thumb_url)}"
+
+    if not _reuse_commons_copy(candidate, "thumb", outpath):
+        try:
+            download_file(thumb_url, outpath)
+        except Exception as e:
+            candidate.meta["thumb_error"] = str(e)
+            return None  # fall back to the original
+        commons_files.record_copy(candidate.title, "thumb", outpath)
+
+    candidate.meta["thumb_path"] = outpath.as_posix()
+
+    h = dhash(outpath)
+    if h is not None:
+        dup = deduper.match(h)
+        if dup is not None:
+            return f"near-duplicate of {dup}"
+        deduper.add(h, candidate.title)
+
+    if screener is not None:
+        result, _ = screener.check(outpath)
+        if not result.ok:
+            return f"thumbnail screen: {result.reason}"
+
+    return None
+
+
+def _probe_skip_reason(
+    candidate: ImageCandidate, probe: ImageProbe, coverage_met: bool
+) -> Optional[str]:
+    """
+    Why the full download can be skipped, or None to download.
+    A failed probe never blocks the download itself.
+    """
+    if not probe.ok:
+        return None
+    if not probe.is_image:
+        return f"not an image ({probe.content_type})"
+    if probe.width and probe.height and min(probe.width, probe.height) < MIN_IMAGE_SIDE:
+        return f"too small ({probe.width}x{probe.height})"
+    if probe.size_bytes is not None and probe.size_bytes < MIN_IMAGE_BYTES:
+        return f"too small ({probe.size_bytes} bytes)"
+    if coverage_met and not candidate.verified:
+        return "undated; coverage already met"
+    return None
+
+
+def _record_dimensions(candidate: ImageCandidate) -> ImageCandidate:
+    """
+    Store pixel size for ranking; PIL only reads the header here.
+    """
+    if candidate.local_path is None or "width" in candidate.meta:
         return candidate
 
-    candidate.verified = True
-    candidate.verified_date = VerifiedDate(
-        date=d,
-        year=_year_from_date(d),
-        method=f"exif:{tag}",
-        confidence=0.98 if tag == "DateTimeOriginal" else 0.93,
-    )
+    try:
+        with Image.open(candidate.local_path) as img:
+            candidate.meta["width"], candidate.meta["height"] = img.size
+    except Exception:
+        pass
     return candidate
 
 
 def _download_candidate(
-    candidate: ImageCandidate, idx: int, celebrity_name: str
+    candidate: ImageCandidate,
+    idx: int,
+    celebrity_name: str,
+    sniffer: Optional[ExifDateSniffer] = None,
+    probe: Optional[ImageProbe] = None,
 ) -> ImageCandidate:
     outdir = raw_dir(celebrity_name)
     outdir.mkdir(parents=True, exist_ok=True)
@@ -113,20 +366,120 @@ def _download_candidate(
     filename = f"{idx:03d}_{slugify(candidate.title)[:60]}{ext}"
     outpath = outdir / filename
 
+    if _reuse_commons_copy(candidate, "original", outpath):
+        candidate.local_path = outpath.as_posix()
+        return candidate
+
     try:
-        download_file(candidate.image_url, outpath)
+        download_file(
+            candidate.image_url,
+            outpath,
+            on_chunk=sniffer.feed if sniffer is not None else None,
+            # Continue after the probe's bytes instead of refetching them
+            prefix=probe.head if probe is not None else b"",
+            total=probe.size_bytes if probe is not None else None,
+        )
         candidate.local_path = outpath.as_posix()
     except Exception as e:
         candidate.meta["download_error"] = str(e)
+        return candidate
 
+    if candidate.source == "wikimedia":
+        commons_files.record_copy(candidate.title, "original", outpath)
     return candidate
 
 
+# ---------------------------------------------------------------------
+# SOURCE STREAMS
+# ---------------------------------------------------------------------
+
+
+def _verified_years(cands: List[ImageCandidate]) -> List[int]:
+    return [c.verified_date.year for c in cands if c.verified_date is not None]
+
+
+async def _commons_stream(
+    src: CommonsSource, name: str, planner: CoveragePlanner, done: asyncio.Event
+) -> AsyncIterator[ImageCandidate]:
+    log.info("🔍 Wikimedia Commons (broad + year-aware)…")
+    try:
+        # A) Broad
+        broad = [c async for c in src.search(name)]
+        planner.add_verified(_verified_years(broad))
+        for c in broad:
+            yield c
+
+        # B) Year-aware (targeted) — gap years only, adaptive step
+        for year in planner.plan(base_step=2):
+            found = [c async for c in src.search(name, year)]
+            planner.record(year, _verified_years(found))
+            for c in found:
+                yield c
+    finally:
+        log.info(f"📅 Commons coverage: {planner.summary()}")
+        done.set()
+
+
+async def _broad_stream(
+    src: SourceAdapter, name: str, banner: str
+) -> AsyncIterator[ImageCandidate]:
+    log.info(banner)
+    async for c in src.search(name):
+        yield c
+
+
+async def _bing_stream(
+    src: BingSource, name: str, planner: CoveragePlanner, after: asyncio.Event
+) -> AsyncIterator[ImageCandidate]:
+    # Planned against Commons coverage, so start once Commons is done
+    await after.wait()
+    log.info("🔍 Bing Images (year-aware, gap years only)…")
+    for year in planner.plan(base_step=1):
+        try:
+            async for c in src.search(name, year):
+                yield c
+            planner.record(year, [], adapt=False)
+        except Exception as e:
+            log.warning(f"⚠️ Bing failed for year {year}: {e}")
+
+
+async def _serpapi_stream(
+    src: SerpApiSource,
+    name: str,
+    planner: CoveragePlanner,
+    after: asyncio.Event,
+    full: asyncio.Event,
+) -> AsyncIterator[ImageCandidate]:
+    await after.wait()
+
+    # Paid calls go to the weakest-covered years first; cached queries
+    # are free and don't count toward the per-celebrity cap. No paid
+    # calls once the download slots are `full`.
+    calls = min(settings.serpapi_calls_per_celebrity, serpapi_budget.remaining())
+    years = planner.weakest_years(settings.serpapi_calls_per_celebrity)
+
+    log.info(f"🔍 SerpAPI (weakest years first, {calls} paid calls available)…")
+    for year in years:
+        q = build_portrait_query(name, year)
+        cached = cached_results(q, src.limit) is not None
+        if not cached and (calls <= 0 or full.is_set()):
+            continue
+        try:
+            async for c in src.search(name, year):
+                yield c
+            if not cached:
+                calls -= 1
+            planner.record(year, [], adapt=False)
+        except Exception as e:
+            log.warning(f"⚠️ SerpAPI failed for year {year}: {e}")
+
+
 # ---------------------------------------------------------------------
 # MAIN COLLECTOR
 # ---------------------------------------------------------------------
 
 
+@metrics.timed("collect")
 def collect_images_for_celebrity(
     celebrity_name: str,
     birth_year: int,
@@ -138,15 +491,23 @@ def collect_images_for_celebrity(
 
     Notes:
     - Verified years come mostly from Wikimedia date metadata and EXIF.
-    - Bing/IMDb/Wikipedia images typically lack reliable dating; they still help
-      with face stock, but won't appear in verified_years unless EXIF exists.
+    - Bing/IMDb/Wikipedia images typically lack reliable dating; without EXIF
+      they are dated from the face's estimated age (method age_estimate,
+      low confidence), listed in estimated_years rather than verified_years.
 
     Strategy:
     - Start from birth_year + 10
     - Pull Wikimedia broad + Wikimedia year-aware
     - Add Wikipedia page portraits + IMDb stills
     - Add Bing year-aware portrait searches
-    - Add SerpAPI year-aware searches if enabled
+    - Add SerpAPI searches for the weakest-covered years if enabled (budgeted)
+    - Year-aware searches only target gap years (CoveragePlanner) and stop
+      once verified coverage satisfies the anchor selector
+    - Sources run concurrently as one merged stream (see sources.py);
+      downloads start with the first candidates instead of after all
+      searches finish
+    - Faces that don't match the celebrity's reference portraits are
+      flagged and kept out of anchor selection
     """
 
     settings.ensure_dirs()
@@ -158,203 +519,234 @@ def collect_images_for_celebrity(
         cached = read_json(mp)
         return ImageManifest.model_validate(cached)
 
-    candidates: List[ImageCandidate] = []
-
-    current_year = target_year_end
     start_year = birth_year + 10  # practical minimum
-
     log.info(
-        f"📅 Year-aware search: {celebrity_name} from {start_year} → {current_year}"
+        f"📅 Year-aware search: {celebrity_name} from {start_year} → {target_year_end}"
     )
 
-    # Dedup trackers
-    seen_urls: set[str] = set()
-    seen_titles: set[str] = set()
-
-    def push_candidate(cand: ImageCandidate) -> None:
-        if cand.image_url in seen_urls:
-            return
-        if cand.title in seen_titles:
-            return
-        seen_urls.add(cand.image_url)
-        seen_titles.add(cand.title)
-        candidates.append(cand)
+    downloaded, year_index = asyncio.run(
+        _collect_async(celebrity_name, start_year, target_year_end)
+    )
+    _verify_identity(celebrity_name, downloaded, year_index)
+    _estimate_dates(downloaded, year_index, birth_year, target_year_end)
 
     # ==============================================================
-    # SOURCE 1 — WIKIMEDIA COMMONS (BROAD + YEAR-AWARE)
+    # BUILD MANIFEST
     # ==============================================================
 
-    log.info("🔍 Wikimedia Commons (broad + year-aware)…")
-    try:
-        # A) Broad
-        titles = search_commons_files(celebrity_name, limit=40)
-        commons_imgs = fetch_commons_images(titles)
-        for ci in commons_imgs:
-            date_str, method = extract_verified_date_from_commons(ci.extmeta)
-            cand = ImageCandidate(
-                source="wikimedia",
-                title=ci.title,
-                page_url=ci.page_url,
-                image_url=ci.image_url,
-                meta={
-                    "commons_date": date_str,
-                    "commons_date_method": method,
-                },
-            )
-            push_candidate(_verify_with_commons(cand))
-
-        # B) Year-aware (targeted)
-        year_step = 2
-        per_year_limit = 8
-
-        for year in range(start_year, current_year + 1, year_step):
-            q = f"{celebrity_name} {year}"
-            year_titles = search_commons_files(q, limit=per_year_limit)
-            if not year_titles:
-                continue
-
-            year_imgs = fetch_commons_images(year_titles)
-            for ci in year_imgs:
-                date_str, method = extract_verified_date_from_commons(ci.extmeta)
-                cand = ImageCandidate(
-                    source="wikimedia",
-                    title=ci.title,
-                    page_url=ci.page_url,
-                    image_url=ci.image_url,
-                    meta={
-                        "commons_date": date_str,
-                        "commons_date_method": method,
-                        "query_year": year,
-                    },
-                )
-                push_candidate(_verify_with_commons(cand))
+    documented = [
+        c
+        for c in downloaded
+        if c.verified and c.verified_date and not c.verified_date.estimated
+    ]
+    verified_years = sorted({c.verified_date.year for c in documented})  # type: ignore[union-attr]
+    verified_count = len(documented)
+    estimated_years = sorted(
+        {
+            c.verified_date.year
+            for c in downloaded
+            if c.verified and c.verified_date and c.verified_date.estimated
+        }
+        - set(verified_years)
+    )
 
-    except Exception as e:
-        log.warning(f"⚠️ Wikimedia Commons failed: {e}")
+    manifest = ImageManifest(
+        celebrity_name=celebrity_name,
+        celebrity_slug=slugify(celebrity_name),
+        target_year_end=target_year_end,
+        candidates=downloaded,
+        verified_years=verified_years,
+        verified_count=verified_count,
+        estimated_years=estimated_years,
+        year_index=year_index.to_dict(),
+    )
 
-    # ==============================================================
-    # SOURCE 2 — WIKIPEDIA PAGE IMAGES
-    # ==============================================================
+    write_json(mp, manifest.model_dump())
+    commons_files.save()
 
-    log.info("🧠 Wikipedia page images…")
-    try:
-        for it in fetch_wikipedia_page_images(celebrity_name, limit=10):
-            push_candidate(
-                ImageCandidate(
-                    source="wikipedia_page",
-                    title=str(it.get("title") or f"{celebrity_name} wikipedia"),
-                    page_url=str(it.get("page_url") or ""),
-                    image_url=str(it.get("image_url") or ""),
-                    meta={},
-                )
-            )
-    except Exception as e:
-        log.warning(f"⚠️ Wikipedia page images failed: {e}")
+    log.info(
+        f"✅ Collected {len(downloaded)} images | "
+        f"verified={verified_count} | "
+        f"verified_years={verified_years} | "
+        f"estimated_years={estimated_years}"
+    )
 
-    # ==============================================================
-    # SOURCE 3 — IMDb IMAGE STILLS
-    # ==============================================================
+    return manifest
 
-    log.info("🎬 IMDb image stills…")
-    try:
-        for it in fetch_imdb_images(celebrity_name, limit=20):
-            push_candidate(
-                ImageCandidate(
-                    source="imdb",
-                    title=str(it.get("title") or f"{celebrity_name} imdb"),
-                    page_url=str(it.get("page_url") or ""),
-                    image_url=str(it.get("image_url") or ""),
-                    meta={},
-                )
-            )
-    except Exception as e:
-        log.warning(f"⚠️ IMDb images failed: {e}")
 
-    # ==============================================================
-    # SOURCE 4 — BING YEAR-AWARE (PORTRAIT QUERIES)
-    # ==============================================================
+async def _collect_async(
+    celebrity_name: str, start_year: int, end_year: int
+) -> Tuple[List[ImageCandidate], YearIndex]:
+    candidates: List[ImageCandidate] = []
 
-    log.info("🔍 Bing Images (year-aware)…")
-    for year in range(start_year, current_year + 1):
-        q = build_portrait_query(celebrity_name, year)
-        try:
-            results = search_bing_images(q, limit=5)
-            if not results:
-                continue
-            for it in results:
-                push_candidate(
-                    ImageCandidate(
-                        source="bing",
-                        title=f"{celebrity_name} portrait {year}",
-                        page_url=it["page_url"],
-                        image_url=it["image_url"],
-                        meta={"query_year": year},
-                    )
-                )
-        except Exception as e:
-            log.warning(f"⚠️ Bing failed for year {year}: {e}")
+    # Dedup trackers (url/title → first candidate seen)
+    seen_urls: dict[str, ImageCandidate] = {}
+    seen_titles: dict[str, ImageCandidate] = {}
+
+    def push_candidate(cand: ImageCandidate) -> bool:
+        """
+        Register a candidate; False if it duplicates one already seen.
+        """
+        dup = seen_urls.get(cand.image_url) or seen_titles.get(cand.title)
+        if dup is not None:
+            # Keep every year query that surfaced this image
+            qy = cand.meta.get("query_year")
+            if qy is not None:
+                years = dup.meta.setdefault("query_years", [])
+                if qy not in years:
+                    years.append(qy)
+            return False
+        qy = cand.meta.get("query_year")
+        if qy is not None:
+            cand.meta["query_years"] = [qy]
+        seen_urls[cand.image_url] = cand
+        seen_titles[cand.title] = cand
+        candidates.append(cand)
+        metrics.inc("candidates", source=cand.source)
+        return True
 
     # ==============================================================
-    # SOURCE 5 — SERPAPI (OPTIONAL)
+    # SOURCES (merged stream)
     # ==============================================================
 
-    if serpapi_enabled():
-        log.info("🔍 SerpAPI (year-aware)…")
-        for year in range(start_year, current_year + 1, 3):
-            q = build_portrait_query(celebrity_name, year)
-            try:
-                raw = search_google_images_serpapi(q, limit=3)
-                for it in to_candidate_items(raw):
-                    push_candidate(
-                        ImageCandidate(
-                            source="serpapi",
-                            title=f"{celebrity_name} portrait {year}",
-                            page_url=it.get("page_url"),
-                            image_url=it["image_url"],
-                            meta={"query_year": year},
-                        )
-                    )
-            except Exception as e:
-                log.warning(f"⚠️ SerpAPI failed for year {year}: {e}")
+    planner = CoveragePlanner(start_year, end_year)
+    commons_done = asyncio.Event()
+    downloads_full = asyncio.Event()
+
+    serpapi = SerpApiSource()
+    streams: Dict[str, AsyncIterator[ImageCandidate]] = {
+        "Wikimedia Commons": _commons_stream(
+            CommonsSource(), celebrity_name, planner, commons_done
+        ),
+        "Wikipedia page images": _broad_stream(
+            WikipediaPageSource(), celebrity_name, "🧠 Wikipedia page images…"
+        ),
+        "IMDb images": _broad_stream(
+            ImdbSource(), celebrity_name, "🎬 IMDb image stills…"
+        ),
+        "Bing": _bing_stream(BingSource(), celebrity_name, planner, commons_done),
+    }
+    if serpapi.enabled():
+        streams["SerpAPI"] = _serpapi_stream(
+            serpapi, celebrity_name, planner, commons_done, downloads_full
+        )
 
     # ==============================================================
-    # DOWNLOAD & EXIF VERIFICATION
+    # DOWNLOAD & EXIF VERIFICATION (runs alongside the sources)
     # ==============================================================
 
     downloaded: List[ImageCandidate] = []
-    max_downloads = 140
-
-    log.info(f"⬇️ Downloading up to {min(len(candidates), max_downloads)} images…")
-
-    for idx, cand in enumerate(candidates[:max_downloads], start=1):
-        cand = _download_candidate(cand, idx, celebrity_name)
-        cand = _verify_with_exif(cand)
+    year_index = YearIndex()
+    stats = {"probed": 0, "avoided": 0}
+
+    screener = _face_screener()
+    deduper = PerceptualDeduper()
+
+    def download_original(
+        cand: ImageCandidate, idx: int, probe: Optional[ImageProbe]
+    ) -> ImageCandidate:
+        sniffer = ExifDateSniffer()
+        cand = _download_candidate(cand, idx, celebrity_name, sniffer, probe)
+        cand = _verify_with_exif(cand, sniffer)
+        return _record_dimensions(cand)
+
+    async def fetch_original(
+        cand: ImageCandidate, idx: int, probe: Optional[ImageProbe] = None
+    ) -> None:
+        cand = await asyncio.to_thread(download_original, cand, idx, probe)
         downloaded.append(cand)
+        year_index.add(len(downloaded) - 1, cand)
+        if cand.verified_date is not None:
+            planner.add_verified([cand.verified_date.year])
+
+    async def process(cand: ImageCandidate, idx: int) -> None:
+        # Tier 1 (Commons): screen the thumbnail; survivors skip the probe
+        if cand.meta.get("thumb_url"):
+            reason = await asyncio.to_thread(
+                _screen_thumbnail, cand, idx, celebrity_name, screener, deduper
+            )
+            if reason:
+                cand.meta["skipped"] = reason
+                metrics.inc("download_skipped", stage="thumbnail")
+                downloaded.append(cand)
+                return
+            if "thumb_path" in cand.meta:
+                await fetch_original(cand, idx)
+                return
+
+        # Probe: first 64 KB → type, size, dimensions, EXIF date
+        probe = await asyncio.to_thread(probe_image, cand.image_url)
+        stats["probed"] += probe.bytes_read
+        if probe.width and probe.height:
+            cand.meta["width"], cand.meta["height"] = probe.width, probe.height
+        if probe.size_bytes is not None:
+            cand.meta["size_bytes"] = probe.size_bytes
+        if not cand.verified:
+            cand = _apply_exif_date(cand, probe.exif_date, probe.exif_tag)
+        if cand.verified_date is not None:
+            planner.add_verified([cand.verified_date.year])
+
+        reason = _probe_skip_reason(cand, probe, planner.requirements_met())
+        if reason:
+            cand.meta["skipped"] = reason
+            metrics.inc("download_skipped", stage="probe")
+            stats["avoided"] += max(0, (probe.size_bytes or 0) - probe.bytes_read)
+            downloaded.append(cand)
+            return
 
-    # ==============================================================
-    # BUILD MANIFEST
-    # ==============================================================
+        await fetch_original(cand, idx, probe)
 
-    verified_years = sorted(
-        {c.verified_date.year for c in downloaded if c.verified and c.verified_date}
-    )
-    verified_count = sum(1 for c in downloaded if c.verified)
+    queue: asyncio.Queue = asyncio.Queue()
 
-    manifest = ImageManifest(
-        celebrity_name=celebrity_name,
-        celebrity_slug=slugify(celebrity_name),
-        target_year_end=target_year_end,
-        candidates=downloaded,
-        verified_years=verified_years,
-        verified_count=verified_count,
-    )
+    async def download_worker() -> None:
+        while (item := await queue.get()) is not None:
+            idx, cand = item
+            try:
+                await process(cand, idx)
+            except Exception as e:
+                log.warning(f"⚠️ Download pipeline failed for {cand.image_url}: {e}")
 
-    write_json(mp, manifest.model_dump())
+    worker = asyncio.create_task(download_worker())
 
+    log.info(f"⬇️ Downloading up to {MAX_DOWNLOADS} images as candidates arrive…")
+    queued = 0
+    # Undated candidates waiting until Commons has claimed its slots
+    held: Optional[List[ImageCandidate]] = []
+
+    def enqueue(cand: ImageCandidate) -> None:
+        nonlocal queued
+        if queued >= MAX_DOWNLOADS:
+            return
+        queued += 1
+        queue.put_nowait((queued, cand))
+        if queued >= MAX_DOWNLOADS:
+            downloads_full.set()
+
+    def release_held() -> None:
+        nonlocal held
+        for c in held or ():
+            enqueue(c)
+        held = None
+
+    async for cand in merge(streams):
+        if not push_candidate(cand):
+            continue
+        if cand.source in AFTER_COMMONS_SOURCES:
+            release_held()
+        if held is not None and cand.source != "wikimedia":
+            held.append(cand)
+        else:
+            enqueue(cand)
+    release_held()
+
+    await queue.put(None)
+    await worker
+
+    skipped = sum(1 for c in downloaded if c.meta.get("skipped"))
     log.info(
-        f"✅ Collected {len(downloaded)} images | "
-        f"verified={verified_count} | "
-        f"verified_years={verified_years}"
+        f"🔎 Screening: skipped {skipped} downloads | "
+        f"probed {stats['probed'] / 1e6:.1f} MB, avoided {stats['avoided'] / 1e6:.1f} MB"
     )
+    log.info(f"🧮 Candidates: {len(candidates)} unique, {queued} queued for download")
 
-    return manifest
+    return downloaded, year_index
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.settings import settings
+from ..utils.filesystem import file_sha1, read_json, write_json
+from ..utils.metrics import metrics
+from .wikimedia import DATE_KEYS, CommonsImage
+
+try:
+    import fcntl
+except ImportError:  # Windows: last writer wins
+    fcntl = None  # type: ignore[assignment]
+
+
+COMMONS_INDEX = settings.cache_dir / "commons_files.json"
+
+KINDS = ("thumb", "original")
+
+
+@dataclass
+class LocalCopy:
+    path: str
+    size: int
+    mtime_ns: int
+    sha1: str
+
+
+@dataclass
+class CommonsFile:
+    """
+    One Commons file as seen by any celebrity's collector: imageinfo
+    (dating extmetadata only) plus the local copies already downloaded.
+    """
+
+    title: str
+    page_url: str
+    image_url: str
+    extmeta: Dict[str, Any]
+    thumb_url: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    copies: Dict[str, LocalCopy] = field(default_factory=dict)
+
+    @classmethod
+    def from_image(cls, ci: CommonsImage) -> "CommonsFile":
+        return cls(
+            title=ci.title,
+            page_url=ci.page_url,
+            image_url=ci.image_url,
+            extmeta={k: ci.extmeta[k] for k in DATE_KEYS if k in ci.extmeta},
+            thumb_url=ci.thumb_url,
+            width=ci.width,
+            height=ci.height,
+        )
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CommonsFile":
+        copies = {k: LocalCopy(**c) for k, c in (d.get("copies") or {}).items()}
+        return cls(**{**d, "copies": copies})
+
+    def to_image(self) -> CommonsImage:
+        return CommonsImage(
+            title=self.title,
+            page_url=self.page_url,
+            image_url=self.image_url,
+            extmeta=dict(self.extmeta),
+            thumb_url=self.thumb_url,
+            width=self.width,
+            height=self.height,
+        )
+
+
+class CommonsFileIndex:
+    """
+    Commons files shared across celebrities (group photos match several).
+    Known titles skip the imageinfo request, and files already on disk
+    (with their persisted face analyses) are linked instead of downloaded.
+
+    Loaded once per process; save() merges into the file under a flock so
+    parallel collectors don't drop each other's entries.
+    """
+
+    def __init__(self, path: Path = COMMONS_INDEX) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._files: Optional[Dict[str, CommonsFile]] = None
+        self._dirty: set[str] = set()
+
+    def _all(self) -> Dict[str, CommonsFile]:
+        if self._files is None:
+            self._files = self._read()
+        return self._files
+
+    def _read(self) -> Dict[str, CommonsFile]:
+        out: Dict[str, CommonsFile] = {}
+        for title, d in (read_json(self.path, default={}) or {}).items():
+            try:
+                out[title] = CommonsFile.from_dict(d)
+            except TypeError:
+                continue  # older layout; refetched on demand
+        return out
+
+    # -----------------------------------------------------------------
+    # METADATA
+    # -----------------------------------------------------------------
+
+    def lookup(self, titles: List[str]) -> Tuple[Dict[str, CommonsImage], List[str]]:
+        """
+        (known title → image, titles never seen before).
+        """
+        with self._lock:
+            files = self._all()
+            known = {t: files[t].to_image() for t in titles if t in files}
+        missing = [t for t in titles if t not in known]
+        metrics.inc("commons_index", len(known), result="hit")
+        metrics.inc("commons_index", len(missing), result="miss")
+        return known, missing
+
+    def add(self, images: List[CommonsImage]) -> None:
+        with self._lock:
+            files = self._all()
+            for ci in images:
+                prev = files.get(ci.title)
+                entry = CommonsFile.from_image(ci)
+                if prev is not None:
+                    entry.copies = prev.copies
+                files[ci.title] = entry
+                self._dirty.add(ci.title)
+
+    # -----------------------------------------------------------------
+    # LOCAL COPIES
+    # -----------------------------------------------------------------
+
+    def local_copy(self, title: str, kind: str) -> Optional[Path]:
+        """
+        Path of an intact downloaded `kind` ("thumb" / "original") of
+        `title`, or None. Intact = same stat, or same hash after a touch.
+        """
+        with self._lock:
+            entry = self._all().get(title)
+            copy = entry.copies.get(kind) if entry else None
+        if copy is None:
+            return None
+
+        p = Path(copy.path)
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) == (copy.size, copy.mtime_ns):
+            return p
+        if st.st_size == copy.size and file_sha1(p) == copy.sha1:
+            return p
+        return None
+
+    def record_copy(self, title: str, kind: str, path: Path) -> None:
+        st = path.stat()
+        copy = LocalCopy(
+            path=path.as_posix(),
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            sha1=file_sha1(path),
+        )
+        with self._lock:
+            entry = self._all().get(title)
+            if entry is None:
+                return  # only indexed titles carry copies
+            entry.copies[kind] = copy
+            self._dirty.add(title)
+
+    # -----------------------------------------------------------------
+    # PERSISTENCE
+    # -----------------------------------------------------------------
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            ours = {t: self._all()[t] for t in self._dirty}
+
+            lock_path = self.path.with_suffix(".lock")
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(lock_path, "a+") as lf:
+                if fcntl is not None:
+                    fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    files = self._read()
+                    files.update(ours)
+                    write_json(
+                        self.path, {t: asdict(f) for t, f in sorted(files.items())}
+                    )
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lf, fcntl.LOCK_UN)
+
+            self._files = files
+            self._dirty.clear()
+
+
+commons_files = CommonsFileIndex()
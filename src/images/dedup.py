@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+
+HASH_SIZE = 8  # 64-bit dHash
+MAX_DISTANCE = 6  # Hamming distance treated as the same picture
+
+
+def dhash(path: Path, hash_size: int = HASH_SIZE) -> Optional[int]:
+    """
+    Difference hash: robust to rescaling and recompression, which is what
+    separates Commons crops/re-uploads of the same shot.
+    """
+    try:
+        with Image.open(path) as img:
+            img.draft("L", (hash_size * 8, hash_size * 8))  # cheap JPEG downscale
+            small = img.convert("L").resize(
+                (hash_size + 1, hash_size), Image.Resampling.LANCZOS
+            )
+    except Exception:
+        return None
+
+    px = list(small.getdata())
+    bits = 0
+    for row in range(hash_size):
+        base = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class PerceptualDeduper:
+    """
+    Remembers hashes of kept images; `match` finds a near-duplicate.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE) -> None:
+        self.max_distance = max_distance
+        self._seen: List[Tuple[int, str]] = []
+
+    def match(self, h: int) -> Optional[str]:
+        for other, key in self._seen:
+            if hamming(h, other) <= self.max_distance:
+                return key
+        return None
+
+    def add(self, h: int, key: str) -> None:
+        self._seen.append((h, key))
@@ -1,41 +1,202 @@
 from __future__ import annotations
 
+import io
 import os
+import re
 import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import requests
+from PIL import Image
 
 from ..config.settings import settings
+from ..utils.metrics import metrics
+from ..utils.rate_limit import host_of, rate_limited_get, rate_limited_request
+from .exif import exif_date_from_bytes
+
+
+PROBE_BYTES = 64 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+
+@dataclass
+class ImageProbe:
+    ok: bool  # probe request succeeded
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    exif_date: Optional[str] = None
+    exif_tag: Optional[str] = None
+    bytes_read: int = 0
+    # Leading bytes of the file a download can resume after (empty when
+    # the server ignored the range and the read was cut short)
+    head: bytes = field(default=b"", repr=False)
+
+    @property
+    def is_image(self) -> bool:
+        # Unknown type is given the benefit of the doubt
+        return self.content_type is None or self.content_type.startswith("image/")
+
+
+def _session() -> requests.Session:
+    s = requests.Session()
+    s.headers.update({"User-Agent": settings.user_agent})
+    return s
+
+
+def _total_size(r: requests.Response) -> Optional[int]:
+    m = _CONTENT_RANGE_RE.match(r.headers.get("Content-Range", ""))
+    if m:
+        return int(m.group(1))
+    if r.status_code == 200 and r.headers.get("Content-Length", "").isdigit():
+        return int(r.headers["Content-Length"])
+    return None
+
+
+@metrics.timed("probe")
+def probe_image(url: str, timeout: Optional[int] = None) -> ImageProbe:
+    """
+    Cheap look at a remote image before committing to the full download.
+
+    A ranged GET for the first PROBE_BYTES returns type, total size (via
+    Content-Range), dimensions and usually the EXIF date. Servers that
+    reject the range get a HEAD instead. Servers that ignore it are read
+    only up to PROBE_BYTES and closed. The bytes read are kept in
+    `head` so download_file can continue from them.
+    """
+    s = _session()
+    t = timeout or settings.http_timeout
+
+    try:
+        r = rate_limited_get(
+            url,
+            session=s,
+            stream=True,
+            timeout=t,
+            headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"},
+        )
+    except Exception:
+        return ImageProbe(ok=False)
+
+    try:
+        if r.status_code not in (200, 206):
+            h = rate_limited_request("HEAD", url, session=s, timeout=t, allow_redirects=True)
+            if not h.ok:
+                return ImageProbe(ok=False)
+            length = h.headers.get("Content-Length", "")
+            return ImageProbe(
+                ok=True,
+                content_type=h.headers.get("Content-Type"),
+                size_bytes=int(length) if length.isdigit() else None,
+            )
+
+        head = b""
+        for chunk in r.iter_content(chunk_size=16 * 1024):
+            head += chunk
+            if len(head) >= PROBE_BYTES:
+                break
+        head = head[:PROBE_BYTES]
+        # A 200 body is only a valid prefix if it was read to the end
+        resumable = r.status_code == 206 or len(head) < PROBE_BYTES
+    except Exception:
+        return ImageProbe(ok=False)
+    finally:
+        r.close()
+
+    probe = ImageProbe(
+        ok=True,
+        content_type=r.headers.get("Content-Type"),
+        size_bytes=_total_size(r),
+        bytes_read=len(head),
+        head=head if resumable else b"",
+    )
+
+    try:
+        with Image.open(io.BytesIO(head)) as img:  # header only, no decode
+            probe.width, probe.height = img.size
+    except Exception:
+        pass
+
+    probe.exif_date, probe.exif_tag = exif_date_from_bytes(head)
+    metrics.inc("probe_bytes", len(head), host=host_of(url))
+    return probe
 
 
 def download_file(
-    url: str, out_path: Path, timeout: Optional[int] = None, retries: int = 3
+    url: str,
+    out_path: Path,
+    timeout: Optional[int] = None,
+    retries: int = 3,
+    on_chunk: Optional[Callable[[bytes, int], None]] = None,
+    prefix: bytes = b"",
+    total: Optional[int] = None,
 ) -> None:
+    """
+    Stream url to out_path. `on_chunk(chunk, offset)` sees every chunk as it
+    is written; offset 0 marks a (re)started transfer.
+
+    `prefix` (a probe's leading bytes) is written first and only the rest
+    is requested with a Range header; no request at all when it already
+    holds all `total` bytes. A server answering 200 instead of 206 sends
+    the whole body, which then replaces the prefix.
+    """
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    s = requests.Session()
-    s.headers.update({"User-Agent": settings.user_agent})
+    s = _session()
 
+    host = host_of(url)
     last_err = None
     for attempt in range(1, retries + 1):
         try:
-            r = s.get(url, stream=True, timeout=timeout or settings.http_timeout)
-            r.raise_for_status()
-
+            t0 = time.perf_counter()
             tmp = out_path.with_suffix(out_path.suffix + ".part")
+            offset = fetched = 0
             with open(tmp, "wb") as f:
-                for chunk in r.iter_content(chunk_size=1024 * 256):
-                    if chunk:
-                        f.write(chunk)
+                if prefix:
+                    if on_chunk is not None:
+                        on_chunk(prefix, 0)
+                    f.write(prefix)
+                    offset = len(prefix)
+
+                if total is None or offset < total:
+                    r = rate_limited_get(
+                        url,
+                        session=s,
+                        stream=True,
+                        timeout=timeout or settings.http_timeout,
+                        headers={"Range": f"bytes={offset}-"} if offset else None,
+                    )
+                    if offset and r.status_code == 416:
+                        r.close()  # the prefix was the whole file
+                    else:
+                        r.raise_for_status()
+                        if offset and r.status_code != 206:
+                            f.seek(0)
+                            f.truncate()
+                            offset = 0
+                        for chunk in r.iter_content(chunk_size=1024 * 256):
+                            if chunk:
+                                if on_chunk is not None:
+                                    on_chunk(chunk, offset)
+                                f.write(chunk)
+                                offset += len(chunk)
+                                fetched += len(chunk)
 
             os.replace(tmp, out_path)
+            metrics.observe("download_seconds", time.perf_counter() - t0, host=host)
+            metrics.inc("download_bytes", fetched, host=host)
+            metrics.inc("downloads", host=host, result="ok")
             return
         except Exception as e:
             last_err = e
+            metrics.inc("downloads", host=host, result="retry")
             time.sleep(0.6 * attempt)
 
+    metrics.inc("downloads", host=host, result="failed")
     raise RuntimeError(
         f"Failed to download after {retries} attempts: {url} | {last_err}"
     )
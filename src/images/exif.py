@@ -1,66 +1,334 @@
 from __future__ import annotations
 
-from datetime import datetime
+import re
+import struct
+import zlib
+from datetime import date
 from pathlib import Path
 from typing import Optional, Tuple
 
-from PIL import Image, ExifTags
 
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
 
-# Common EXIF date tags
-_EXIF_DATE_TAGS = {"DateTimeOriginal", "DateTimeDigitized", "DateTime"}
+# Tag IDs (TIFF/EXIF spec), in preference order
+_DATE_TAGS: Tuple[Tuple[int, str], ...] = (
+    (0x9003, "DateTimeOriginal"),  # Exif IFD
+    (0x9004, "DateTimeDigitized"),  # Exif IFD
+    (0x0132, "DateTime"),  # IFD0
+)
+_EXIF_IFD_POINTER = 0x8769
+
+HEAD_BYTES = 64 * 1024  # first read from disk; APP1 is capped at 64 KB
+MAX_SNIFF_BYTES = 512 * 1024  # streaming sniffer gives up after this
+
+_DATE_RE = re.compile(r"^\s*(\d{4})[:\-/](\d{2})[:\-/](\d{2})")
+
+# Parse outcomes
+_FOUND, _ABSENT, _MORE = "found", "absent", "more"
+
+# ImageMagick-style PNG text chunks holding hex-encoded EXIF
+_PNG_RAW_PROFILES = (b"Raw profile type exif", b"Raw profile type APP1")
+
+ExifDate = Tuple[Optional[str], Optional[str]]
+# (status, tiff payload if found, bytes needed if more)
+_Located = Tuple[str, Optional[bytes], int]
+
+
+# ---------------------------------------------------------------------
+# NORMALIZATION
+# ---------------------------------------------------------------------
 
 
 def _normalize_exif_datetime(value: str) -> Optional[str]:
     """
     EXIF usually: "YYYY:MM:DD HH:MM:SS"
-    Normalize to YYYY-MM-DD if possible.
+    Normalize to YYYY-MM-DD if possible (also accepts ISO-ish values).
     """
     if not value or not isinstance(value, str):
         return None
-    v = value.strip()
-    # Typical: 2019:05:17 13:44:02
+
+    m = _DATE_RE.match(value)
+    if not m:
+        return None
+
+    y, mo, d = m.groups()
     try:
-        dt = datetime.strptime(v, "%Y:%m:%d %H:%M:%S")
-        return dt.strftime("%Y-%m-%d")
-    except Exception:
-        pass
-
-    # Sometimes already ISO-ish
-    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-        try:
-            dt = datetime.strptime(v, fmt)
-            return dt.strftime("%Y-%m-%d")
-        except Exception:
+        date(int(y), int(mo), int(d))  # rejects 0000, month 13, Feb 31, …
+    except ValueError:
+        return None
+    return f"{y}-{mo}-{d}"
+
+
+# ---------------------------------------------------------------------
+# CONTAINER PARSING (bytes only, no decode)
+# ---------------------------------------------------------------------
+
+
+def _locate_jpeg(buf: bytes) -> _Located:
+    """
+    Walk JPEG marker segments up to SOS looking for APP1 "Exif".
+    """
+    pos = 2
+    n = len(buf)
+    while True:
+        if pos + 4 > n:
+            return _MORE, None, pos + 4
+        if buf[pos] != 0xFF:
+            return _ABSENT, None, 0
+
+        marker = buf[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0xDA or marker == 0xD9:  # SOS / EOI: no more metadata
+            return _ABSENT, None, 0
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:  # standalone markers
+            pos += 2
             continue
 
-    return None
+        seg_len = struct.unpack(">H", buf[pos + 2 : pos + 4])[0]
+        end = pos + 2 + seg_len
+        if marker == 0xE1:
+            if end > n:
+                return _MORE, None, end
+            if buf[pos + 4 : pos + 10] == b"Exif\x00\x00":
+                return _FOUND, buf[pos + 10 : end], 0
+        pos = end
+
+
+def _png_raw_profile(ctype: bytes, data: bytes) -> Optional[bytes]:
+    """
+    Decode an ImageMagick "Raw profile type exif" text chunk, if it is one.
+    """
+    keyword, _, rest = data.partition(b"\x00")
+    if keyword not in _PNG_RAW_PROFILES:
+        return None
+
+    if ctype == b"zTXt":
+        text = zlib.decompress(rest[1:])  # skip compression method byte
+    elif ctype == b"tEXt":
+        text = rest
+    else:
+        return None
+
+    # "\nexif\n   <size>\n<hex…>"
+    parts = text.split(b"\n", 3)
+    if len(parts) < 4:
+        return None
+    raw = bytes.fromhex(parts[3].decode("ascii", "ignore").replace("\n", ""))
+    return raw[6:] if raw.startswith(b"Exif\x00\x00") else raw
+
+
+def _locate_png(buf: bytes) -> _Located:
+    pos = 8
+    n = len(buf)
+    while True:
+        if pos + 8 > n:
+            return _MORE, None, pos + 8
+        length = struct.unpack(">I", buf[pos : pos + 4])[0]
+        ctype = buf[pos + 4 : pos + 8]
+        start = pos + 8
+        end = start + length
+        if ctype in (b"IDAT", b"IEND"):
+            return _ABSENT, None, 0
+        if ctype in (b"eXIf", b"zTXt", b"tEXt"):
+            if end > n:
+                return _MORE, None, end
+            if ctype == b"eXIf":
+                return _FOUND, buf[start:end], 0
+            profile = _png_raw_profile(ctype, buf[start:end])
+            if profile:
+                return _FOUND, profile, 0
+        pos = end + 4  # skip CRC
+
+
+def _locate_webp(buf: bytes) -> _Located:
+    pos = 12
+    n = len(buf)
+    while True:
+        if pos + 8 > n:
+            # RIFF size bounds the file; past it there is nothing left
+            riff_end = 8 + struct.unpack("<I", buf[4:8])[0]
+            return (_ABSENT, None, 0) if pos >= riff_end else (_MORE, None, pos + 8)
+        ctype = buf[pos : pos + 4]
+        length = struct.unpack("<I", buf[pos + 4 : pos + 8])[0]
+        start = pos + 8
+        end = start + length
+        if ctype == b"EXIF":
+            if end > n:
+                return _MORE, None, end
+            if buf[start : start + 6] == b"Exif\x00\x00":
+                start += 6
+            return _FOUND, buf[start:end], 0
+        pos = end + (length & 1)  # chunks are padded to even size
+
+
+def _locate_tiff(buf: bytes) -> _Located:
+    """
+    Find the TIFF block inside JPEG / PNG / WebP bytes.
+    """
+    if len(buf) < 12:
+        return _MORE, None, 12
+    if buf[:2] == b"\xff\xd8":
+        return _locate_jpeg(buf)
+    if buf[:8] == b"\x89PNG\r\n\x1a\n":
+        return _locate_png(buf)
+    if buf[:4] == b"RIFF" and buf[8:12] == b"WEBP":
+        return _locate_webp(buf)
+    return _ABSENT, None, 0
+
+
+def _read_ifd_dates(tiff: bytes) -> ExifDate:
+    """
+    Read only the three date tags from IFD0 + Exif IFD.
+    """
+    if len(tiff) < 8:
+        return None, None
+
+    bo = tiff[:2]
+    if bo == b"II":
+        e = "<"
+    elif bo == b"MM":
+        e = ">"
+    else:
+        return None, None
+
+    def ifd_entries(offset: int):
+        if offset + 2 > len(tiff):
+            return
+        count = struct.unpack(e + "H", tiff[offset : offset + 2])[0]
+        for i in range(count):
+            p = offset + 2 + i * 12
+            if p + 12 > len(tiff):
+                return
+            tag, typ, cnt = struct.unpack(e + "HHI", tiff[p : p + 8])
+            yield tag, typ, cnt, p + 8
+
+    def ascii_value(cnt: int, value_pos: int) -> Optional[str]:
+        if cnt <= 4:
+            raw = tiff[value_pos : value_pos + cnt]
+        else:
+            off = struct.unpack(e + "I", tiff[value_pos : value_pos + 4])[0]
+            raw = tiff[off : off + cnt]
+        return raw.split(b"\x00", 1)[0].decode("ascii", "ignore")
+
+    found: dict[int, str] = {}
+    wanted = {t for t, _ in _DATE_TAGS}
+
+    ifd0 = struct.unpack(e + "I", tiff[4:8])[0]
+    exif_ifd: Optional[int] = None
+    for tag, typ, cnt, vp in ifd_entries(ifd0):
+        if tag == _EXIF_IFD_POINTER:
+            exif_ifd = struct.unpack(e + "I", tiff[vp : vp + 4])[0]
+        elif tag in wanted and typ == 2:
+            found[tag] = ascii_value(cnt, vp) or ""
+
+    if exif_ifd is not None:
+        for tag, typ, cnt, vp in ifd_entries(exif_ifd):
+            if tag in wanted and typ == 2:
+                found[tag] = ascii_value(cnt, vp) or ""
+
+    for tag_id, tag_name in _DATE_TAGS:
+        norm = _normalize_exif_datetime(found.get(tag_id, ""))
+        if norm:
+            return norm, tag_name
+    return None, None
+
+
+def _parse(buf: bytes) -> Tuple[str, ExifDate, int]:
+    """
+    Returns (status, (date, tag), bytes_needed_if_more).
+    """
+    try:
+        status, tiff, need = _locate_tiff(buf)
+        if status == _MORE:
+            return _MORE, (None, None), need
+        if status == _ABSENT or tiff is None:
+            return _ABSENT, (None, None), 0
+        return _FOUND, _read_ifd_dates(tiff), 0
+    except (struct.error, IndexError, ValueError, zlib.error):
+        return _ABSENT, (None, None), 0
+
+
+# ---------------------------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------------------------
 
 
-def extract_exif_date(path: Path) -> Tuple[Optional[str], Optional[str]]:
+def exif_date_from_bytes(data: bytes) -> ExifDate:
+    """
+    Date from the leading bytes of an image; (None, None) if absent or
+    if more bytes would be needed.
+    """
+    status, result, _ = _parse(data)
+    return result if status == _FOUND else (None, None)
+
+
+class ExifDateSniffer:
+    """
+    Incremental EXIF date reader fed with download chunks.
+
+    Dating finishes as soon as the metadata segment has arrived, usually
+    within the first few KB; later chunks are ignored.
+    """
+
+    def __init__(self, max_bytes: int = MAX_SNIFF_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.reset()
+
+    def reset(self) -> None:
+        self._buf = bytearray()
+        self._need = 12
+        self.done = False
+        self.conclusive = False
+        self.result: ExifDate = (None, None)
+
+    def feed(self, chunk: bytes, offset: int = -1) -> None:
+        """
+        offset == 0 means the stream restarted (download retry).
+        """
+        if offset == 0:
+            self.reset()
+        if self.done:
+            return
+
+        self._buf += chunk
+        if len(self._buf) < self._need:
+            if len(self._buf) >= self.max_bytes:
+                self.done = True  # inconclusive: caller may re-read the file
+            return
+
+        status, result, need = _parse(bytes(self._buf))
+        if status == _MORE and need <= self.max_bytes:
+            self._need = need
+            return
+
+        self.done = True
+        self.conclusive = status != _MORE
+        self.result = result
+        self._buf = bytearray()
+
+
+def extract_exif_date(path: Path) -> ExifDate:
     """
     Returns: (date_yyyy_mm_dd, method_tag)
     method_tag is one of DateTimeOriginal/DateTimeDigitized/DateTime
+
+    Reads only as many leading bytes as the metadata needs; the image
+    itself is never decoded.
     """
     try:
-        img = Image.open(path)
-        exif = img.getexif()
-        if not exif:
-            return None, None
-
-        tag_map = {}
-        for k, v in ExifTags.TAGS.items():
-            tag_map[v] = k
-
-        for tag_name in ("DateTimeOriginal", "DateTimeDigitized", "DateTime"):
-            tag_id = tag_map.get(tag_name)
-            if not tag_id:
-                continue
-            raw = exif.get(tag_id)
-            norm = _normalize_exif_datetime(raw) if raw else None
-            if norm:
-                return norm, tag_name
-
-        return None, None
-    except Exception:
+        with open(path, "rb") as f:
+            buf = f.read(HEAD_BYTES)
+            while True:
+                status, result, need = _parse(buf)
+                if status != _MORE:
+                    return result
+                more = f.read(need - len(buf))
+                if not more:
+                    return None, None
+                buf += more
+    except OSError:
         return None, None
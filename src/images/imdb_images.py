@@ -1,65 +1,122 @@
 from __future__ import annotations
 
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import threading
+from typing import List, Dict, Optional
+
+from ..config.settings import settings
+from ..utils.filesystem import read_json, write_json
+from ..utils.html_stream import iter_start_tags, iter_text
+from ..utils.metrics import metrics
+from ..utils.rate_limit import rate_limited_get
 
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
 }
 
+# name → mediaindex URL; skips the search page on repeat runs
+MEDIAINDEX_CACHE = settings.cache_dir / "imdb_mediaindex.json"
 
-def fetch_imdb_images(name: str, limit: int = 10) -> List[Dict]:
-    """
-    Scrape IMDb public image stills / portraits.
-    Safe for production (no selenium, no login).
-    """
+_mediaindex: Optional[Dict[str, str]] = None
+_mediaindex_lock = threading.Lock()
 
-    search_url = f"https://www.imdb.com/find?q={name.replace(' ', '+')}&s=nm"
 
-    r = requests.get(search_url, headers=HEADERS, timeout=15)
-    r.raise_for_status()
+def _cache_key(name: str) -> str:
+    return " ".join(name.lower().split())
 
-    soup = BeautifulSoup(r.text, "html.parser")
 
-    result_link = soup.select_one(".result_text a")
-    if not result_link or not result_link.get("href"):
-        return []
+def _find_profile_href(name: str) -> Optional[str]:
+    """
+    href of the first `.result_text a` on the name search page; reading
+    stops right there.
+    """
+    search_url = f"https://www.imdb.com/find?q={name.replace(' ', '+')}&s=nm"
 
-    profile_url = f"https://www.imdb.com{result_link['href']}"
-    images_url = f"{profile_url}mediaindex"
+    r = rate_limited_get(search_url, headers=HEADERS, timeout=15, stream=True)
+    try:
+        r.raise_for_status()
+        in_result = False
+        for tag, attrs in iter_start_tags(iter_text(r, "imdb")):
+            if "result_text" in attrs.get("class", "").split():
+                in_result = True
+            elif in_result and tag == "a" and attrs.get("href"):
+                return attrs["href"]
+    finally:
+        r.close()
+    return None
+
+
+def mediaindex_url(name: str) -> Optional[str]:
+    """
+    IMDb mediaindex page for `name`, cached in data/cache/imdb_mediaindex.json.
+    Misses aren't cached; a later run searches again.
+    """
+    global _mediaindex
+    key = _cache_key(name)
+    with _mediaindex_lock:
+        if _mediaindex is None:
+            _mediaindex = read_json(MEDIAINDEX_CACHE, default={}) or {}
+        cached = _mediaindex.get(key)
+    if cached:
+        metrics.inc("imdb_mediaindex", result="hit")
+        return cached
+
+    metrics.inc("imdb_mediaindex", result="miss")
+    href = _find_profile_href(name)
+    if not href:
+        return None
+
+    url = f"https://www.imdb.com{href}mediaindex"
+    with _mediaindex_lock:
+        _mediaindex[key] = url
+        write_json(MEDIAINDEX_CACHE, _mediaindex)
+    return url
+
+
+@metrics.timed("source_request", source="imdb")
+def fetch_imdb_images(name: str, limit: int = 10) -> List[Dict]:
+    """
+    Scrape IMDb public image stills / portraits.
+    Safe for production (no selenium, no login).
 
-    r = requests.get(images_url, headers=HEADERS, timeout=15)
-    r.raise_for_status()
+    The mediaindex page is parsed as it streams in and the connection is
+    dropped once `limit` images are found.
+    """
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    images_url = mediaindex_url(name)
+    if not images_url:
+        return []
 
     images: List[Dict] = []
 
-    for img in soup.select("img"):
-        src = img.get("src")
+    r = rate_limited_get(images_url, headers=HEADERS, timeout=15, stream=True)
+    try:
+        r.raise_for_status()
 
-        if not src:
-            continue
+        for tag, attrs in iter_start_tags(iter_text(r, "imdb")):
+            if tag != "img":
+                continue
 
-        src_str = str(src)
+            src_str = attrs.get("src") or ""
 
-        if "media-amazon" not in src_str:
-            continue
+            if "media-amazon" not in src_str:
+                continue
 
-        # Normalize to original resolution
-        clean_url = src_str.split("_")[0] + ".jpg"
+            # Normalize to original resolution
+            clean_url = src_str.split("_")[0] + ".jpg"
 
-        images.append(
-            {
-                "title": "imdb_image",
-                "image_url": clean_url,
-                "page_url": images_url,
-            }
-        )
+            images.append(
+                {
+                    "title": "imdb_image",
+                    "image_url": clean_url,
+                    "page_url": images_url,
+                }
+            )
 
-        if len(images) >= limit:
-            break
+            if len(images) >= limit:
+                break
+    finally:
+        r.close()
 
+    metrics.inc("source_results", len(images), source="imdb")
     return images
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
+# Year inferred from the apparent age of the face, not from metadata
+AGE_ESTIMATE_METHOD = "age_estimate"
+
+
 class VerifiedDate(BaseModel):
     date: str  # YYYY-MM-DD
     year: int
-    method: str  # exif:DateTimeOriginal | commons:DateTimeOriginal | commons:DateTime | none
+    method: str  # exif:DateTimeOriginal | commons:DateTimeOriginal | commons:DateTime | age_estimate | none
     confidence: float
 
+    @property
+    def estimated(self) -> bool:
+        return self.method == AGE_ESTIMATE_METHOD
+
 
 class ImageCandidate(BaseModel):
     source: str  # wikimedia | serpapi
@@ -28,6 +36,14 @@ class ImageCandidate(BaseModel):
     meta: Dict[str, Any] = Field(default_factory=dict)
 
 
+class YearIndexEntry(BaseModel):
+    idx: int  # position in ImageManifest.candidates
+    verified: bool
+    confidence: float
+    pixels: int = 0
+    face_quality: Optional[float] = None
+
+
 class ImageManifest(BaseModel):
     celebrity_name: str
     celebrity_slug: str
@@ -39,3 +55,8 @@ class ImageManifest(BaseModel):
     # Convenience indexes
     verified_years: list[int] = Field(default_factory=list)
     verified_count: int = 0
+    # Years dated only by age estimation (not in verified_years)
+    estimated_years: list[int] = Field(default_factory=list)
+
+    # year -> candidates ranked best-first (see year_index.YearIndex)
+    year_index: Dict[int, List[YearIndexEntry]] = Field(default_factory=dict)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Iterable, Iterator, List
+
+from ..utils.logger import get_logger
+from .anchor_selector import MIN_ANCHORS, MIN_YEAR_GAP
+
+log = get_logger("planner")
+
+
+class CoveragePlanner:
+    """
+    Adaptive year planner for year-targeted searches.
+
+    Tracks verified years as results arrive and only hands out years that
+    are still gaps. The step widens while queries keep landing new dates and
+    narrows when they come back empty. Planning stops once the anchor
+    selector's requirements (min_anchors spaced min_gap apart) are met.
+    """
+
+    def __init__(
+        self,
+        start_year: int,
+        end_year: int,
+        min_anchors: int = MIN_ANCHORS,
+        min_gap: int = MIN_YEAR_GAP,
+        max_step: int | None = None,
+    ) -> None:
+        self.start_year = start_year
+        self.end_year = end_year
+        self.min_anchors = min_anchors
+        self.min_gap = max(1, min_gap)
+        self.max_step = max_step or self.min_gap * 2
+
+        # A verified year covers its neighbours closer than half the spacing
+        self.radius = max(1, (self.min_gap + 1) // 2)
+
+        self.step = 1
+        self.queries = 0
+        self.hits = 0
+        self.skipped = 0
+        self._covered: List[int] = []
+
+    # -----------------------------------------------------------------
+    # STATE
+    # -----------------------------------------------------------------
+
+    def add_verified(self, years: Iterable[int]) -> int:
+        """
+        Register verified years; returns how many were new.
+        """
+        new = 0
+        for y in years:
+            i = bisect_left(self._covered, y)
+            if i < len(self._covered) and self._covered[i] == y:
+                continue
+            insort(self._covered, y)
+            new += 1
+        return new
+
+    def record(
+        self, year: int, verified_years: Iterable[int], adapt: bool = True
+    ) -> None:
+        """
+        Feed back the verified years a query for `year` produced.
+        Undated sources pass adapt=False so their empty dates don't
+        shrink the step.
+        """
+        self.queries += 1
+        hit = self.add_verified(verified_years) > 0
+        if hit:
+            self.hits += 1
+
+        if not adapt:
+            return
+        if hit:
+            self.step = min(self.max_step, self.step + 1)
+        else:
+            self.step = max(1, self.step - 1)
+
+    def is_covered(self, year: int) -> bool:
+        i = bisect_left(self._covered, year - self.radius + 1)
+        return i < len(self._covered) and self._covered[i] < year + self.radius
+
+    def spaced_count(self) -> int:
+        """
+        Max number of verified years pairwise >= min_gap apart
+        (earliest-first greedy is optimal here).
+        """
+        count = 0
+        last: int | None = None
+        for y in self._covered:
+            if last is None or y - last >= self.min_gap:
+                count += 1
+                last = y
+        return count
+
+    def requirements_met(self) -> bool:
+        return self.spaced_count() >= self.min_anchors
+
+    def gap_years(self) -> List[int]:
+        return [
+            y
+            for y in range(self.start_year, self.end_year + 1)
+            if not self.is_covered(y)
+        ]
+
+    def weakest_years(self, n: int) -> List[int]:
+        """
+        Up to n gap years ordered by how badly they need coverage:
+        farthest-point picks, each treated as covered before the next.
+        """
+        if n <= 0:
+            return []
+
+        anchors = list(self._covered)
+        gaps = self.gap_years()
+        picked: List[int] = []
+
+        def distance(y: int) -> int:
+            if not anchors:
+                return self.end_year - self.start_year + 1
+            i = bisect_left(anchors, y)
+            near = [abs(y - anchors[j]) for j in (i - 1, i) if 0 <= j < len(anchors)]
+            return min(near)
+
+        while gaps and len(picked) < n:
+            best = max(gaps, key=lambda y: (distance(y), -y))
+            if picked and distance(best) < self.min_gap:
+                break
+            picked.append(best)
+            insort(anchors, best)
+            gaps.remove(best)
+
+        return picked
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.queries if self.queries else 0.0
+
+    # -----------------------------------------------------------------
+    # PLANNING
+    # -----------------------------------------------------------------
+
+    def plan(self, base_step: int = 1) -> Iterator[int]:
+        """
+        Yield gap years from start to end. Reads state lazily, so `record`
+        calls made between iterations change the step and stop condition.
+        """
+        self.step = max(1, base_step)
+        y = self.start_year
+
+        while y <= self.end_year:
+            if self.requirements_met():
+                log.info(
+                    f"🎯 Coverage met ({self.spaced_count()} spaced years) "
+                    f"at {y}; stopping year-targeted queries"
+                )
+                return
+
+            if self.is_covered(y):
+                self.skipped += 1
+                y += 1
+                continue
+
+            yield y
+            y += self.step
+
+    def summary(self) -> str:
+        return (
+            f"queries={self.queries} skipped={self.skipped} "
+            f"hit_rate={self.hit_rate:.2f} covered={self._covered}"
+        )
@@ -1,19 +1,164 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
-
-import requests
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
 
 from ..config.settings import settings
+from ..utils.filesystem import read_json, write_json
 from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from ..utils.rate_limit import rate_limited_get
+
+try:  # cross-process locking (POSIX only; threads-only elsewhere)
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
 
 log = get_logger("serpapi")
 
 
+CACHE_TTL_SECONDS = 30 * 24 * 3600  # identical queries are free for 30 days
+
+
 def serpapi_enabled() -> bool:
     return bool(settings.serpapi_key)
 
 
+# ---------------------------------------------------------------------
+# RESULT CACHE
+# ---------------------------------------------------------------------
+
+
+def _cache_dir() -> Path:
+    return settings.cache_dir / "serpapi"
+
+
+def _cache_path(query: str, limit: int) -> Path:
+    key = f"{' '.join(query.lower().split())}|{limit}"
+    return _cache_dir() / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def cached_results(query: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Cached images_results for this query, or None if absent/expired.
+    """
+    data = read_json(_cache_path(query, limit))
+    if not isinstance(data, dict):
+        return None
+    if time.time() - float(data.get("fetched_at", 0)) > CACHE_TTL_SECONDS:
+        return None
+    return data.get("results") or []
+
+
+def _store_results(query: str, limit: int, results: List[Dict[str, Any]]) -> None:
+    write_json(
+        _cache_path(query, limit),
+        {"query": query, "limit": limit, "fetched_at": time.time(), "results": results},
+    )
+
+
+# ---------------------------------------------------------------------
+# BUDGET
+# ---------------------------------------------------------------------
+
+
+class SerpApiBudget:
+    """
+    Persistent daily/monthly ledger of paid SerpAPI calls.
+
+    A 401 marks the quota exhausted for the rest of the day so later
+    queries are skipped locally instead of being discovered one by one.
+    Updates are flock-guarded, and a call is reserved before it is made
+    (refunded if it fails), so parallel workers can't overspend.
+    """
+
+    def __init__(self, ledger_file: Optional[Path] = None) -> None:
+        self.ledger_file = ledger_file or settings.cache_dir / "serpapi_usage.json"
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        day, month = now.strftime("%Y-%m-%d"), now.strftime("%Y-%m")
+
+        data = read_json(self.ledger_file, default={}) or {}
+        if data.get("month") != month:
+            data = {"month": month, "month_calls": 0}
+        if data.get("day") != day:
+            data.update({"day": day, "day_calls": 0, "exhausted": False})
+        return data
+
+    @staticmethod
+    def _left(data: Dict[str, Any]) -> int:
+        if data.get("exhausted"):
+            return 0
+
+        left: List[int] = []
+        if settings.serpapi_daily_budget > 0:
+            left.append(settings.serpapi_daily_budget - data["day_calls"])
+        if settings.serpapi_monthly_budget > 0:
+            left.append(settings.serpapi_monthly_budget - data["month_calls"])
+        return max(0, min(left)) if left else 10**9
+
+    def remaining(self) -> int:
+        return self._left(self._load())
+
+    @contextmanager
+    def _update(self) -> Iterator[Dict[str, Any]]:
+        """
+        Read-modify-write of the ledger under the lock file.
+        """
+        with self._lock:
+            lock_path = self.ledger_file.with_suffix(".lock")
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(lock_path, "a+") as lf:
+                if fcntl is not None:
+                    fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    data = self._load()
+                    yield data
+                    write_json(self.ledger_file, data)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def reserve(self) -> bool:
+        """
+        Count one paid call up front; False (nothing counted) if none is left.
+        """
+        with self._update() as data:
+            if self._left(data) <= 0:
+                return False
+            data["day_calls"] += 1
+            data["month_calls"] += 1
+            return True
+
+    def refund(self) -> None:
+        """
+        Give back a reserved call that was not charged.
+        """
+        with self._update() as data:
+            data["day_calls"] = max(0, data["day_calls"] - 1)
+            data["month_calls"] = max(0, data["month_calls"] - 1)
+
+    def mark_exhausted(self) -> None:
+        with self._update() as data:
+            data["exhausted"] = True
+
+
+budget = SerpApiBudget()
+
+
+# ---------------------------------------------------------------------
+# SEARCH
+# ---------------------------------------------------------------------
+
+
+@metrics.timed("source_request", source="serpapi")
 def search_google_images_serpapi(
     query: str, limit: int = 10
 ) -> List[Dict[str, Any]]:
@@ -23,11 +168,24 @@ def search_google_images_serpapi(
     HARD RULE:
     - NEVER crash the pipeline
     - On 401 / quota / network issues → return []
+
+    Cached queries are served locally; a paid call is reserved against
+    the daily/monthly budget before the request and refunded if it fails.
     """
 
     if not settings.serpapi_key:
         return []
 
+    cached = cached_results(query, limit)
+    if cached is not None:
+        metrics.inc("serpapi_cache", result="hit")
+        return cached
+    metrics.inc("serpapi_cache", result="miss")
+
+    if not budget.reserve():
+        log.info(f"💸 SerpAPI budget exhausted. Skipping query: {query}")
+        return []
+
     params = {
         "engine": "google_images",
         "q": query,
@@ -37,8 +195,9 @@ def search_google_images_serpapi(
 
     headers = {"User-Agent": settings.user_agent}
 
+    settled = False  # reservation kept (charged) or refunded
     try:
-        r = requests.get(
+        r = rate_limited_get(
             "https://serpapi.com/search.json",
             params=params,
             headers=headers,
@@ -50,19 +209,32 @@ def search_google_images_serpapi(
                 "❌ SerpAPI unauthorized (401). "
                 "Key invalid, quota exhausted, or Google Images disabled."
             )
+            budget.refund()
+            settled = True
+            budget.mark_exhausted()
             return []
 
         if r.status_code != 200:
             log.warning(
                 f"⚠️ SerpAPI returned {r.status_code}. Skipping query: {query}"
             )
+            budget.refund()
+            settled = True
             return []
 
+        settled = True  # a 200 is a paid call
+        metrics.inc("serpapi_paid_calls")
+
         data = r.json()
-        return data.get("images_results", []) or []
+        results = data.get("images_results", []) or []
+        _store_results(query, limit, results)
+        metrics.inc("source_results", len(results), source="serpapi")
+        return results
 
     except Exception as e:
         log.warning(f"⚠️ SerpAPI request failed: {e}")
+        if not settled:
+            budget.refund()
         return []
 
 
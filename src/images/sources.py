@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Optional
+
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+from .commons_index import commons_files
+from .models import ImageCandidate, VerifiedDate
+from .wikimedia import (
+    CommonsImage,
+    extract_verified_date_from_commons,
+    fetch_commons_images,
+    search_commons_files,
+)
+from .wikipedia_page import fetch_wikipedia_page_images
+from .imdb_images import fetch_imdb_images
+from .bing_images import search_bing_images
+from .serpapi_images import (
+    search_google_images_serpapi,
+    serpapi_enabled,
+    to_candidate_items,
+)
+
+log = get_logger("sources")
+
+
+# ---------------------------------------------------------------------
+# INTERFACE
+# ---------------------------------------------------------------------
+
+
+def build_portrait_query(name: str, year: int) -> str:
+    """
+    Generic, celebrity-agnostic, face-centric query.
+    """
+    return f"{name} portrait image facing camera directly {year}"
+
+
+class SourceAdapter(ABC):
+    """
+    One image source. `search` yields ImageCandidates as soon as they are
+    parsed; year=None asks for the source's broad (undated) query.
+
+    The underlying clients are synchronous (requests + the shared per-host
+    rate limiter), so adapters run them in worker threads and stay
+    cooperative on the event loop.
+    """
+
+    name: str = ""
+    year_aware: bool = False
+
+    def enabled(self) -> bool:
+        return True
+
+    @abstractmethod
+    def search(
+        self, name: str, year: Optional[int] = None
+    ) -> AsyncIterator[ImageCandidate]:
+        ...
+
+
+def _candidate(
+    source: str, item: Dict, title: str, year: Optional[int]
+) -> ImageCandidate:
+    return ImageCandidate(
+        source=source,
+        title=str(item.get("title") or title),
+        page_url=str(item.get("page_url") or ""),
+        image_url=str(item.get("image_url") or ""),
+        meta={"query_year": year} if year is not None else {},
+    )
+
+
+# ---------------------------------------------------------------------
+# ADAPTERS
+# ---------------------------------------------------------------------
+
+
+class CommonsSource(SourceAdapter):
+    name = "wikimedia"
+    year_aware = True
+
+    def __init__(self, broad_limit: int = 40, year_limit: int = 8) -> None:
+        self.broad_limit = broad_limit
+        self.year_limit = year_limit
+
+    @staticmethod
+    def to_candidate(
+        ci: CommonsImage, query_year: Optional[int] = None
+    ) -> ImageCandidate:
+        date_str, method = extract_verified_date_from_commons(ci.extmeta)
+        meta: Dict = {
+            "commons_date": date_str,
+            "commons_date_method": method,
+        }
+        if ci.thumb_url:
+            meta["thumb_url"] = ci.thumb_url
+        if ci.width and ci.height:
+            meta["width"], meta["height"] = ci.width, ci.height
+        if query_year is not None:
+            meta["query_year"] = query_year
+
+        cand = ImageCandidate(
+            source="wikimedia",
+            title=ci.title,
+            page_url=ci.page_url,
+            image_url=ci.image_url,
+            meta=meta,
+        )
+        if date_str and method:
+            cand.verified = True
+            cand.verified_date = VerifiedDate(
+                date=date_str,
+                year=int(date_str[:4]),
+                method=str(method),
+                confidence=0.95,
+            )
+        return cand
+
+    async def search(
+        self, name: str, year: Optional[int] = None
+    ) -> AsyncIterator[ImageCandidate]:
+        query = name if year is None else f"{name} {year}"
+        limit = self.broad_limit if year is None else self.year_limit
+
+        titles = await asyncio.to_thread(search_commons_files, query, limit)
+        if not titles:
+            return
+
+        # imageinfo only for titles no collector has seen yet
+        known, missing = commons_files.lookup(titles)
+        if missing:
+            fetched = await asyncio.to_thread(fetch_commons_images, missing)
+            commons_files.add(fetched)
+            known.update({ci.title: ci for ci in fetched})
+
+        for ci in known.values():
+            yield self.to_candidate(ci, year)
+
+
+class WikipediaPageSource(SourceAdapter):
+    name = "wikipedia_page"
+
+    def __init__(self, limit: int = 10) -> None:
+        self.limit = limit
+
+    async def search(
+        self, name: str, year: Optional[int] = None
+    ) -> AsyncIterator[ImageCandidate]:
+        items = await asyncio.to_thread(fetch_wikipedia_page_images, name, self.limit)
+        for it in items:
+            yield _candidate(self.name, it, f"{name} wikipedia", None)
+
+
+class ImdbSource(SourceAdapter):
+    name = "imdb"
+
+    def __init__(self, limit: int = 20) -> None:
+        self.limit = limit
+
+    async def search(
+        self, name: str, year: Optional[int] = None
+    ) -> AsyncIterator[ImageCandidate]:
+        items = await asyncio.to_thread(fetch_imdb_images, name, self.limit)
+        for it in items:
+            yield _candidate(self.name, it, f"{name} imdb", None)
+
+
+class BingSource(SourceAdapter):
+    name = "bing"
+    year_aware = True
+
+    def __init__(self, limit: int = 5) -> None:
+        self.limit = limit
+
+    async def search(
+        self, name: str, year: Optional[int] = None
+    ) -> AsyncIterator[ImageCandidate]:
+        if year is None:
+            return
+        q = build_portrait_query(name, year)
+        for it in await asyncio.to_thread(search_bing_images, q, self.limit):
+            it = {**it, "title": None}  # Bing titles are meaningless; name by query
+            yield _candidate(self.name, it, f"{name} portrait {year}", year)
+
+
+class SerpApiSource(SourceAdapter):
+    name = "serpapi"
+    year_aware = True
+
+    def __init__(self, limit: int = 3) -> None:
+        self.limit = limit
+
+    def enabled(self) -> bool:
+        return serpapi_enabled()
+
+    async def search(
+        self, name: str, year: Optional[int] = None
+    ) -> AsyncIterator[ImageCandidate]:
+        if year is None:
+            return
+        q = build_portrait_query(name, year)
+        raw = await asyncio.to_thread(search_google_images_serpapi, q, self.limit)
+        for it in to_candidate_items(raw):
+            it = {**it, "title": None}
+            yield _candidate(self.name, it, f"{name} portrait {year}", year)
+
+
+# ---------------------------------------------------------------------
+# MERGING
+# ---------------------------------------------------------------------
+
+_DONE = object()
+
+
+async def merge(
+    streams: Dict[str, AsyncIterator[ImageCandidate]]
+) -> AsyncIterator[ImageCandidate]:
+    """
+    Interleave several candidate streams in arrival order. A failing
+    stream is logged and dropped; the others keep going.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump(label: str, stream: AsyncIterator[ImageCandidate]) -> None:
+        try:
+            async for cand in stream:
+                await queue.put(cand)
+        except Exception as e:
+            log.warning(f"⚠️ {label} failed: {e}")
+            metrics.inc("source_errors", source=label)
+        finally:
+            await queue.put(_DONE)
+
+    tasks = [asyncio.create_task(pump(label, s)) for label, s in streams.items()]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for t in tasks:
+            t.cancel()
+
@@ -6,6 +6,15 @@ from typing import Any, Dict, List, Optional, Tuple
 import requests
 
 from ..config.settings import settings
+from ..utils.metrics import metrics
+from ..utils.rate_limit import rate_limited_get
+
+
+# Screening thumbnail width (iiurlwidth); originals are fetched only for survivors
+THUMB_WIDTH = 800
+
+# extmetadata keys that can carry a capture date, most reliable first
+DATE_KEYS = ("DateTimeOriginal", "DateTimeDigitized", "DateTime", "Date")
 
 
 @dataclass
@@ -14,6 +23,9 @@ class CommonsImage:
     page_url: str
     image_url: str
     extmeta: Dict[str, Any]
+    thumb_url: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
 
 
 def _session() -> requests.Session:
@@ -25,7 +37,7 @@ def _session() -> requests.Session:
 def _commons_api(params: Dict[str, Any]) -> Dict[str, Any]:
     s = _session()
     url = "https://commons.wikimedia.org/w/api.php"
-    r = s.get(url, params=params, timeout=settings.http_timeout)
+    r = rate_limited_get(url, session=s, params=params, timeout=settings.http_timeout)
     r.raise_for_status()
     return r.json()
 
@@ -41,7 +53,7 @@ def _extract_extmeta_date(
     if not extmeta:
         return None, None
 
-    for key in ("DateTimeOriginal", "DateTimeDigitized", "DateTime", "Date"):
+    for key in DATE_KEYS:
         node = extmeta.get(key)
         if not node:
             continue
@@ -68,6 +80,7 @@ def _extract_extmeta_date(
     return None, None
 
 
+@metrics.timed("source_request", source="commons_search")
 def search_commons_files(query: str, limit: int = 20) -> List[str]:
     """
     Search Commons for file titles relevant to query.
@@ -89,28 +102,35 @@ def search_commons_files(query: str, limit: int = 20) -> List[str]:
         t = item.get("title")
         if t and isinstance(t, str) and t.startswith("File:"):
             titles.append(t)
+    metrics.inc("source_results", len(titles), source="commons_search")
     return titles
 
 
-def fetch_commons_images(file_titles: List[str]) -> List[CommonsImage]:
+@metrics.timed("source_request", source="commons_imageinfo")
+def fetch_commons_images(
+    file_titles: List[str], thumb_width: Optional[int] = THUMB_WIDTH
+) -> List[CommonsImage]:
     """
-    Given file titles, fetch direct image URL + extmetadata.
+    Given file titles, fetch direct image URL + extmetadata, original size
+    and (if thumb_width) a scaled thumbnail URL for screening.
     """
     if not file_titles:
         return []
 
     titles = "|".join(file_titles[:50])
-    j = _commons_api(
-        {
-            "action": "query",
-            "format": "json",
-            "prop": "imageinfo|info",
-            "titles": titles,
-            "iiprop": "url|extmetadata",
-            "inprop": "url",
-            "redirects": 1,
-        }
-    )
+    params: Dict[str, Any] = {
+        "action": "query",
+        "format": "json",
+        "prop": "imageinfo|info",
+        "titles": titles,
+        "iiprop": "url|size|extmetadata",
+        "inprop": "url",
+        "redirects": 1,
+    }
+    if thumb_width:
+        params["iiurlwidth"] = thumb_width
+
+    j = _commons_api(params)
 
     pages = j.get("query", {}).get("pages", {}) or {}
     out: List[CommonsImage] = []
@@ -125,12 +145,21 @@ def fetch_commons_images(file_titles: List[str]) -> List[CommonsImage]:
         image_url = ii.get("url")
         extmeta = ii.get("extmetadata") or {}
         if image_url:
+            thumb_url = ii.get("thumburl")
             out.append(
                 CommonsImage(
-                    title=title, page_url=fullurl, image_url=image_url, extmeta=extmeta
+                    title=title,
+                    page_url=fullurl,
+                    image_url=image_url,
+                    extmeta=extmeta,
+                    # Commons returns the original when it is already small
+                    thumb_url=thumb_url if thumb_url != image_url else None,
+                    width=ii.get("width"),
+                    height=ii.get("height"),
                 )
             )
 
+    metrics.inc("source_results", len(out), source="commons_imageinfo")
     return out
 
 
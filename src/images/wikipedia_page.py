@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import requests
 from typing import List, Dict
 
+from ..utils.metrics import metrics
+from ..utils.rate_limit import rate_limited_get
+
 WIKI_API = "https://en.wikipedia.org/w/api.php"
 
 
+@metrics.timed("source_request", source="wikipedia_page")
 def fetch_wikipedia_page_images(name: str, limit: int = 10) -> List[Dict]:
     """
     Fetch images directly embedded on a celebrity's Wikipedia page.
@@ -18,7 +21,7 @@ def fetch_wikipedia_page_images(name: str, limit: int = 10) -> List[Dict]:
         "titles": name,
     }
 
-    r = requests.get(WIKI_API, params=params, timeout=15)
+    r = rate_limited_get(WIKI_API, params=params, timeout=15)
     r.raise_for_status()
     data = r.json()
 
@@ -41,4 +44,5 @@ def fetch_wikipedia_page_images(name: str, limit: int = 10) -> List[Dict]:
             if len(images) >= limit:
                 break
 
+    metrics.inc("source_results", len(images), source="wikipedia_page")
     return images
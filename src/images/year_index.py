@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from bisect import insort
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .models import ImageCandidate, ImageManifest, YearIndexEntry
+
+
+# Face quality assumed for entries the face stage has not scored yet
+DEFAULT_FACE_QUALITY = 0.5
+
+
+def _rank_key(e: YearIndexEntry) -> Tuple[bool, float, float, int, int]:
+    """
+    Ascending sort key → best entry first.
+    Verified first, then date confidence, face quality, resolution.
+    """
+    fq = e.face_quality if e.face_quality is not None else DEFAULT_FACE_QUALITY
+    return (not e.verified, -e.confidence, -fq, -e.pixels, e.idx)
+
+
+def _index_year(cand: ImageCandidate) -> Optional[int]:
+    """
+    Verified year if known, else the year the candidate was searched for.
+    """
+    if cand.verified and cand.verified_date is not None:
+        return cand.verified_date.year
+
+    qy = cand.meta.get("query_year")
+    if isinstance(qy, int):
+        return qy
+    return None
+
+
+def _entry_for(idx: int, cand: ImageCandidate) -> YearIndexEntry:
+    vd = cand.verified_date
+    verified = bool(cand.verified and vd is not None)
+
+    w = cand.meta.get("width") or 0
+    h = cand.meta.get("height") or 0
+    fq = cand.meta.get("face_quality")
+
+    return YearIndexEntry(
+        idx=idx,
+        verified=verified,
+        confidence=float(vd.confidence) if verified and vd else 0.0,
+        pixels=int(w) * int(h),
+        face_quality=float(fq) if fq is not None else None,
+    )
+
+
+class YearIndex:
+    """
+    Incremental year → ranked-candidates index.
+
+    Built by the collector as downloads are verified and persisted with the
+    manifest, so anchor selection walks it instead of sorting every candidate.
+    """
+
+    def __init__(
+        self, buckets: Optional[Dict[int, List[YearIndexEntry]]] = None
+    ) -> None:
+        self._buckets: Dict[int, List[YearIndexEntry]] = {}
+        self._year_of: Dict[int, int] = {}
+
+        for year, entries in (buckets or {}).items():
+            bucket = sorted(entries, key=_rank_key)
+            self._buckets[int(year)] = bucket
+            for e in bucket:
+                self._year_of[e.idx] = int(year)
+
+    @classmethod
+    def from_manifest(cls, manifest: ImageManifest) -> "YearIndex":
+        """
+        Use the persisted index, or rebuild it for manifests written before
+        the index existed.
+        """
+        if manifest.year_index:
+            return cls(manifest.year_index)
+
+        index = cls()
+        for idx, cand in enumerate(manifest.candidates):
+            index.add(idx, cand)
+        return index
+
+    # -----------------------------------------------------------------
+    # MUTATION
+    # -----------------------------------------------------------------
+
+    def add(self, idx: int, cand: ImageCandidate) -> None:
+        if cand.local_path is None or cand.meta.get("identity_mismatch"):
+            return  # only downloaded files of the right person can become anchors
+
+        year = _index_year(cand)
+        if year is None:
+            return
+
+        self.remove(idx)
+        insort(self._buckets.setdefault(year, []), _entry_for(idx, cand), key=_rank_key)
+        self._year_of[idx] = year
+
+    def remove(self, idx: int) -> None:
+        year = self._year_of.pop(idx, None)
+        if year is None:
+            return
+
+        bucket = self._buckets[year]
+        bucket[:] = [e for e in bucket if e.idx != idx]
+        if not bucket:
+            del self._buckets[year]
+
+    def update(self, idx: int, cand: ImageCandidate) -> None:
+        """
+        Re-rank after the candidate changed (EXIF dated, face scored, …).
+        """
+        self.remove(idx)
+        self.add(idx, cand)
+
+    def set_face_quality(self, idx: int, face_quality: float) -> None:
+        year = self._year_of.get(idx)
+        if year is None:
+            return
+
+        bucket = self._buckets[year]
+        for e in bucket:
+            if e.idx == idx:
+                e.face_quality = float(face_quality)
+                break
+        bucket.sort(key=_rank_key)
+
+    # -----------------------------------------------------------------
+    # QUERIES
+    # -----------------------------------------------------------------
+
+    def years(self, verified_only: bool = True) -> List[int]:
+        return [
+            y
+            for y in sorted(self._buckets)
+            if not verified_only or self._buckets[y][0].verified
+        ]
+
+    def best(
+        self, year: int, n: int = 1, verified_only: bool = True
+    ) -> List[YearIndexEntry]:
+        out: List[YearIndexEntry] = []
+        for e in self._buckets.get(year, []):
+            if verified_only and not e.verified:
+                break  # verified entries always rank first
+            out.append(e)
+            if len(out) >= n:
+                break
+        return out
+
+    def walk(
+        self, top_n: int = 1, verified_only: bool = True
+    ) -> Iterator[Tuple[int, List[YearIndexEntry]]]:
+        """
+        Yield (year, best entries) in chronological order.
+        """
+        for year in sorted(self._buckets):
+            entries = self.best(year, top_n, verified_only)
+            if entries:
+                yield year, entries
+
+    def to_dict(self) -> Dict[int, List[YearIndexEntry]]:
+        return {y: list(self._buckets[y]) for y in sorted(self._buckets)}
+
+    def __len__(self) -> int:
+        return len(self._year_of)
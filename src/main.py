@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import argparse
 from datetime import datetime, date
+from typing import Callable, Optional
 
 from .config.settings import settings
 from .utils.logger import get_logger
 from .utils.celebrity_queue import get_next_celebrity
 from .utils.filesystem import read_json
+from .utils.metrics import metrics, metrics_dir
+from .utils.profiling import MODES as PROFILE_MODES, profiled
+from .utils.resources import cap_worker_memory
+from .utils.slug import slugify
 from .facts.resolver import resolve_celebrity_facts
 
 from .images.collector import (
@@ -14,6 +19,7 @@ from .images.collector import (
     manifest_path,
 )
 from .images.anchor_selector import (
+    Anchor,
     select_anchors,
     save_anchor_timeline,
 )
@@ -40,18 +46,27 @@ def extract_birth_year(birth_date: str | date) -> int:
     return int(birth_date[:4])
 
 
+def export_step_metrics(name: str, step: str) -> None:
+    """
+    Write this step's metrics report and log where the time went.
+    """
+    out = metrics.export(metrics_dir(slugify(name)), step)
+    log.info(f"⏱️ {step}: {metrics.summary()}")
+    log.info(f"📈 Metrics → {out}")
+
+
 # ---------------------------------------------------------------------
 # STEP 2 — FACT RESOLUTION
 # ---------------------------------------------------------------------
 
 
-def run_resolve_once(force: bool = False) -> None:
+def run_resolve_once(force: bool = False) -> Optional[str]:
     settings.ensure_dirs()
 
     name = get_next_celebrity()
     if not name:
         log.info("No celebrities left in queue (all used / queue empty).")
-        return
+        return None
 
     log.info(f"Resolving facts for: {name}")
     facts = resolve_celebrity_facts(name, force=force)
@@ -61,6 +76,8 @@ def run_resolve_once(force: bool = False) -> None:
         f"DOB={facts.birth_date} | "
         f"target_year_end={facts.target_year_end}"
     )
+    export_step_metrics(facts.name, "resolve")
+    return facts.name
 
 
 # ---------------------------------------------------------------------
@@ -68,13 +85,13 @@ def run_resolve_once(force: bool = False) -> None:
 # ---------------------------------------------------------------------
 
 
-def run_step3_collect_images(force: bool = False) -> None:
+def run_step3_collect_images(force: bool = False) -> Optional[str]:
     settings.ensure_dirs()
 
     name = get_next_celebrity()
     if not name:
         log.info("No celebrities left in queue (all used / queue empty).")
-        return
+        return None
 
     facts = resolve_celebrity_facts(name, force=False)
     birth_year = extract_birth_year(facts.birth_date)
@@ -94,8 +111,11 @@ def run_step3_collect_images(force: bool = False) -> None:
     log.info(
         f"✅ Step3 complete: {facts.name} | "
         f"verified={manifest.verified_count} | "
-        f"years={manifest.verified_years}"
+        f"years={manifest.verified_years} | "
+        f"estimated={manifest.estimated_years}"
     )
+    export_step_metrics(facts.name, "collect")
+    return facts.name
 
 
 # ---------------------------------------------------------------------
@@ -103,13 +123,33 @@ def run_step3_collect_images(force: bool = False) -> None:
 # ---------------------------------------------------------------------
 
 
-def run_step4_select_anchors() -> None:
+def _normalize_anchors(name: str, anchors: list[Anchor]) -> None:
+    """
+    Precompute the anchors' stabilizing warps and colour tables (cached),
+    so morph rendering only applies them.
+    """
+    try:
+        from .morphing.normalize import normalization_path, normalize_timeline
+
+        norm = normalize_timeline(slugify(name), anchors)
+    except ImportError as e:
+        log.warning(f"⚠️ Timeline normalization skipped: {e}")
+        return
+    except Exception as e:
+        # Optional stage: rendering falls back to the raw anchors
+        log.warning(f"⚠️ Timeline normalization failed: {e}")
+        return
+    if norm is not None:
+        log.info(f"🎞️ Normalization → {normalization_path(slugify(name))}")
+
+
+def run_step4_select_anchors() -> Optional[str]:
     settings.ensure_dirs()
 
     name = get_next_celebrity()
     if not name:
         log.info("No celebrities left in queue.")
-        return
+        return None
 
     facts = resolve_celebrity_facts(name, force=False)
     birth_year = extract_birth_year(facts.birth_date)
@@ -125,9 +165,12 @@ def run_step4_select_anchors() -> None:
     out = save_anchor_timeline(facts.name, anchors)
     mark_used(facts.name)
     log.info(f"✅ Marked as done: {facts.name}")
+    _normalize_anchors(facts.name, anchors)
 
 
     log.info(f"✅ Anchors selected: {len(anchors)} → {out}")
+    export_step_metrics(facts.name, "anchors")
+    return facts.name
 
 
 # ---------------------------------------------------------------------
@@ -162,18 +205,30 @@ def main() -> None:
         help="Force re-run (ignore caches)",
     )
 
-    args = parser.parse_args()
-
-    if args.resolve_once:
-        run_resolve_once(force=args.force)
-        return
-
-    if args.collect_images:
-        run_step3_collect_images(force=args.force)
-        return
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=PROFILE_MODES,
+        help="Profile the step (cprofile | sampling) → output/profiles/<slug>/<step>",
+    )
 
-    if args.select_anchors:
-        run_step4_select_anchors()
+    args = parser.parse_args()
+    cap_worker_memory()
+
+    steps: list[tuple[bool, str, Callable[[], Optional[str]]]] = [
+        (args.resolve_once, "resolve", lambda: run_resolve_once(force=args.force)),
+        (args.collect_images, "collect", lambda: run_step3_collect_images(force=args.force)),
+        (args.select_anchors, "anchors", run_step4_select_anchors),
+    ]
+
+    for enabled, step, run in steps:
+        if not enabled:
+            continue
+        with profiled(step, args.profile) as prof:
+            name = run()
+            if prof is not None and name:
+                prof.slug = slugify(name)
         return
 
     parser.print_help()
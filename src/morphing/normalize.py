@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from pydantic import BaseModel
+
+from ..config.settings import settings
+from ..face.analysis import (
+    OUTPUT_SIZE,
+    FaceAnalysis,
+    compose,
+    get_analysis,
+    warp_max_side,
+)
+from ..images.anchor_selector import Anchor
+from ..utils.filesystem import read_json, write_json
+from ..utils.image_io import SCREEN_MAX_SIDE, image_size, load_image
+from ..utils.logger import get_logger
+from ..utils.metrics import metrics
+
+
+log = get_logger("morphing.normalize")
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Bump when the stored transforms would come out differently
+NORMALIZE_VERSION = 1
+NORMALIZE_DIR = settings.cache_dir / "timeline_normalization"
+
+# Landmark trajectories: smoothing spline over anchor years (scipy needs
+# at least 5 anchors); None = smoothing chosen by generalized cross-validation
+SPLINE_MIN_ANCHORS = 5
+SPLINE_LAM: Optional[float] = None
+
+# LAB transfer gain bounds; keeps a near-monochrome anchor from having
+# its chroma noise blown up (or a vivid one flattened)
+MIN_GAIN = 0.5
+MAX_GAIN = 2.0
+
+# Face region when an anchor has no 68-point landmarks (canonical space)
+FALLBACK_CENTER = (OUTPUT_SIZE // 2, int(OUTPUT_SIZE * 0.5))
+FALLBACK_AXES = (int(OUTPUT_SIZE * 0.3), int(OUTPUT_SIZE * 0.4))
+
+Point = Tuple[float, float]
+
+
+# ---------------------------------------------------------------------
+# DATA MODEL
+# ---------------------------------------------------------------------
+
+
+class NormalizedAnchor(BaseModel):
+    """
+    Everything a renderer applies to one anchor image: warp the decoded
+    file with `transform`, then map its LAB pixels through `lut`.
+    """
+
+    year: int
+    image_path: str
+    # 2x3: original pixels → stabilized canonical OUTPUT_SIZE face
+    transform: List[List[float]]
+    # Smoothed 68 landmarks in canonical space (morph correspondences)
+    landmarks: Optional[List[Point]] = None
+    # 256 x 3 LAB lookup table (uint8 values) toward the reference anchor
+    lut: List[List[int]]
+
+
+class TimelineNormalization(BaseModel):
+    version: int = NORMALIZE_VERSION
+    digest: str  # anchor files (path + stat) this was computed from
+    reference: int  # index of the colour reference anchor
+    anchors: List[NormalizedAnchor]
+
+
+# ---------------------------------------------------------------------
+# LANDMARKS
+# ---------------------------------------------------------------------
+
+
+def _transform_points(M: np.ndarray, pts: np.ndarray) -> np.ndarray:
+    M = np.asarray(M, dtype=np.float64)
+    return np.asarray(pts, dtype=np.float64) @ M[:, :2].T + M[:, 2]
+
+
+def smooth_landmarks(years: np.ndarray, pts: np.ndarray) -> np.ndarray:
+    """
+    Fit one smoothing spline per landmark coordinate across the timeline
+    (all 136 series in a single vectorized fit) and evaluate it at the
+    anchor years. pts: (n, 68, 2) canonical landmarks, years increasing.
+    """
+    if len(years) < SPLINE_MIN_ANCHORS:
+        return pts
+
+    from scipy.interpolate import make_smoothing_spline
+
+    flat = pts.reshape(len(pts), -1)
+    spline = make_smoothing_spline(years, flat, lam=SPLINE_LAM, axis=0)
+    return spline(years).reshape(pts.shape)
+
+
+def _stabilizer(raw: np.ndarray, smoothed: np.ndarray) -> np.ndarray:
+    """
+    Similarity moving one anchor's landmarks onto their smoothed positions.
+    """
+    M, _ = cv2.estimateAffinePartial2D(
+        raw.astype(np.float32), smoothed.astype(np.float32), method=cv2.LMEDS
+    )
+    return M if M is not None else np.eye(2, 3)
+
+
+# ---------------------------------------------------------------------
+# COLOUR
+# ---------------------------------------------------------------------
+
+
+def _face_mask(landmarks: Optional[np.ndarray]) -> np.ndarray:
+    mask = np.zeros((OUTPUT_SIZE, OUTPUT_SIZE), dtype=np.uint8)
+    if landmarks is None:
+        cv2.ellipse(mask, FALLBACK_CENTER, FALLBACK_AXES, 0, 0, 360, 255, -1)
+    else:
+        hull = cv2.convexHull(np.round(landmarks).astype(np.int32))
+        cv2.fillConvexPoly(mask, hull, 255)
+    return mask
+
+
+def _lab_stats(face: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    lab = cv2.cvtColor(face, cv2.COLOR_BGR2LAB)
+    px = lab[mask > 0].astype(np.float64)
+    if len(px) == 0:
+        px = lab.reshape(-1, 3).astype(np.float64)
+    return px.mean(axis=0), px.std(axis=0)
+
+
+def color_luts(means: np.ndarray, stds: np.ndarray, ref: int) -> np.ndarray:
+    """
+    LAB mean/std transfer (Reinhard) toward anchor `ref`, as one 256-entry
+    table per channel: (n, 256, 3) uint8 for cv2.LUT on LAB images.
+    """
+    gain = np.clip(stds[ref] / np.maximum(stds, 1e-6), MIN_GAIN, MAX_GAIN)  # (n, 3)
+    v = np.arange(256, dtype=np.float64)[None, :, None]  # (1, 256, 1)
+    out = (v - means[:, None, :]) * gain[:, None, :] + means[ref][None, None, :]
+    return np.clip(np.round(out), 0, 255).astype(np.uint8)
+
+
+# ---------------------------------------------------------------------
+# TIMELINE
+# ---------------------------------------------------------------------
+
+
+def normalization_path(slug: str) -> Path:
+    return NORMALIZE_DIR / f"{slug}.json"
+
+
+def _digest(image_paths: Sequence[str]) -> str:
+    parts = []
+    for p in image_paths:
+        try:
+            st = Path(p).stat()
+            parts.append([p, st.st_size, st.st_mtime_ns])
+        except OSError:
+            parts.append([p, None, None])
+    raw = json.dumps([NORMALIZE_VERSION, parts])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def load_normalization(
+    slug: str, image_paths: Sequence[str]
+) -> Optional[TimelineNormalization]:
+    """
+    Cached normalization if it was computed from these exact anchor files.
+    """
+    data = read_json(normalization_path(slug), default=None)
+    if not data:
+        return None
+    try:
+        norm = TimelineNormalization.model_validate(data)
+    except Exception:
+        return None
+    if norm.version != NORMALIZE_VERSION or norm.digest != _digest(image_paths):
+        return None
+    return norm
+
+
+def _warp(image_path: str, M: np.ndarray) -> Optional[np.ndarray]:
+    """
+    OUTPUT_SIZE face through M (original pixels → canonical), decoded
+    at the resolution the warp needs.
+    """
+    size = image_size(Path(image_path))
+    loaded = load_image(image_path, warp_max_side(M, size) if size else None)
+    if loaded is None:
+        return None
+    s = loaded.scale
+    return cv2.warpAffine(
+        loaded.bgr,
+        compose(M, [[1.0 / s, 0.0, 0.0], [0.0, 1.0 / s, 0.0]]),
+        (OUTPUT_SIZE, OUTPUT_SIZE),
+        flags=cv2.INTER_CUBIC,
+        borderMode=cv2.BORDER_REFLECT,
+    )
+
+
+@metrics.timed("timeline_normalize")
+def normalize_timeline(
+    slug: str,
+    anchors: Sequence[Anchor],
+    force: bool = False,
+) -> Optional[TimelineNormalization]:
+    """
+    Stabilizing warps and colour LUTs for a celebrity's anchors, computed
+    once and cached until the anchor files change.
+
+    1. Canonical landmarks of every anchor (persisted face analyses)
+    2. Smoothing spline through each landmark trajectory over the years;
+       each anchor gets the similarity onto its smoothed landmarks,
+       folded into its alignment transform
+    3. LAB mean/std transfer of the face region toward the best-scored
+       anchor, stored as lookup tables
+    """
+    ordered = sorted(anchors, key=lambda an: an.year)
+    paths = [an.image_path for an in ordered]
+    if not force:
+        cached = load_normalization(slug, paths)
+        if cached is not None:
+            metrics.inc("timeline_normalize_cache", result="hit")
+            return cached
+    metrics.inc("timeline_normalize_cache", result="miss")
+
+    usable: List[Tuple[Anchor, FaceAnalysis]] = []
+    for an in ordered:
+        a = get_analysis(an.image_path, SCREEN_MAX_SIDE)
+        if a is None or a.align is None:
+            log.warning(f"⚠️ Anchor {an.year} has no aligned face; not normalized")
+            continue
+        usable.append((an, a))
+    if not usable:
+        return None
+
+    # Landmark trajectories (anchors with 68 points only)
+    aligns = [np.asarray(a.align, dtype=np.float64) for _, a in usable]
+    with_lm = [i for i, (_, a) in enumerate(usable) if a.landmarks68 is not None]
+    landmarks: List[Optional[np.ndarray]] = [None] * len(usable)
+    transforms = list(aligns)
+    if with_lm:
+        raw = np.stack(
+            [_transform_points(aligns[i], usable[i][1].landmarks68) for i in with_lm]
+        )
+        years = np.array([usable[i][0].year for i in with_lm], dtype=np.float64)
+        smoothed = smooth_landmarks(years, raw)
+        for j, i in enumerate(with_lm):
+            transforms[i] = compose(_stabilizer(raw[j], smoothed[j]), aligns[i])
+            landmarks[i] = smoothed[j]
+
+    # Colour statistics on the stabilized faces
+    means = np.zeros((len(usable), 3))
+    stds = np.ones((len(usable), 3))
+    for i, (an, _) in enumerate(usable):
+        face = _warp(an.image_path, transforms[i])
+        if face is not None:
+            means[i], stds[i] = _lab_stats(face, _face_mask(landmarks[i]))
+    ref = max(range(len(usable)), key=lambda i: usable[i][0].score)
+    luts = color_luts(means, stds, ref)
+
+    norm = TimelineNormalization(
+        digest=_digest(paths),
+        reference=ref,
+        anchors=[
+            NormalizedAnchor(
+                year=an.year,
+                image_path=an.image_path,
+                transform=np.asarray(transforms[i]).round(6).tolist(),
+                landmarks=(
+                    [(round(float(x), 2), round(float(y), 2)) for x, y in landmarks[i]]
+                    if landmarks[i] is not None
+                    else None
+                ),
+                lut=luts[i].tolist(),
+            )
+            for i, (an, _) in enumerate(usable)
+        ],
+    )
+    write_json(normalization_path(slug), norm.model_dump())
+    log.info(
+        f"🎞️ Timeline normalized: {len(usable)} anchors, "
+        f"{len(with_lm)} with landmark smoothing, colour reference {usable[ref][0].year}"
+    )
+    return norm
+
+
+# ---------------------------------------------------------------------
+# RENDERING
+# ---------------------------------------------------------------------
+
+
+def render_normalized(anchor: NormalizedAnchor) -> np.ndarray:
+    """
+    Stabilized, colour-matched OUTPUT_SIZE face for one anchor: one warp
+    and one table lookup, nothing re-estimated.
+    """
+    face = _warp(anchor.image_path, np.asarray(anchor.transform))
+    if face is None:
+        raise RuntimeError(f"Failed to read image: {anchor.image_path}")
+    lut = np.asarray(anchor.lut, dtype=np.uint8).reshape(1, 256, 3)
+    lab = cv2.LUT(cv2.cvtColor(face, cv2.COLOR_BGR2LAB), lut)
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import codecs
+import re
+from html import unescape
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from .metrics import metrics
+
+try:
+    from lxml import etree
+except ImportError:  # stdlib parser is incremental too, just slower
+    etree = None  # type: ignore[assignment]
+
+
+CHUNK_SIZE = 16 * 1024
+
+Tag = Tuple[str, Dict[str, str]]
+
+
+# ---------------------------------------------------------------------
+# RESPONSE → TEXT CHUNKS
+# ---------------------------------------------------------------------
+
+
+def iter_text(
+    r: requests.Response, source: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Decoded text of a streamed (stream=True) response, chunk by chunk.
+    Stopping early leaves the rest of the body unread; close `r` after.
+    """
+    decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+    for chunk in r.iter_content(chunk_size=chunk_size):
+        metrics.inc("html_bytes", len(chunk), source=source)
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+# ---------------------------------------------------------------------
+# START TAGS
+# ---------------------------------------------------------------------
+
+
+class _TagCollector(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.pending: List[Tag] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.pending.append((tag, {k: v or "" for k, v in attrs}))
+
+    handle_startendtag = handle_starttag
+
+
+def _lxml_tags(chunks: Iterable[str]) -> Iterator[Tag]:
+    parser = etree.HTMLPullParser(events=("start",))
+    for text in chunks:
+        parser.feed(text)
+        for _, el in parser.read_events():
+            if isinstance(el.tag, str):  # skip comments / PIs
+                yield el.tag.lower(), dict(el.attrib)
+
+
+def _stdlib_tags(chunks: Iterable[str]) -> Iterator[Tag]:
+    parser = _TagCollector()
+    for text in chunks:
+        parser.feed(text)
+        tags, parser.pending = parser.pending, []
+        yield from tags
+
+
+def iter_start_tags(chunks: Iterable[str]) -> Iterator[Tag]:
+    """
+    (tag, attributes) for every start tag, in document order, as soon as
+    the chunk containing it is parsed. Names are lower-case and entity
+    references in attribute values are resolved.
+    """
+    return _lxml_tags(chunks) if etree is not None else _stdlib_tags(chunks)
+
+
+# ---------------------------------------------------------------------
+# PATTERNS IN RAW TEXT
+# ---------------------------------------------------------------------
+
+
+def iter_matches(
+    chunks: Iterable[str], pattern: re.Pattern[str], overlap: int = 4096
+) -> Iterator[str]:
+    """
+    Group 1 of each `pattern` match across chunk boundaries, entity-
+    unescaped. Matches longer than `overlap` characters can be missed.
+    """
+    buf = ""
+    for text in chunks:
+        buf += text
+        end = 0
+        for m in pattern.finditer(buf):
+            yield unescape(m.group(1))
+            end = m.end()
+        # Keep an unmatched tail: a match may straddle the next chunk
+        buf = buf[max(end, len(buf) - overlap) :]
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ..config.settings import settings
+from .logger import get_logger
+from .metrics import metrics
+
+
+log = get_logger("image_io")
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# Enough for detection/landmarks and 512 px alignment
+SCREEN_MAX_SIDE = settings.face_max_side
+CACHE_SIZE = 8  # decoded images kept for reuse across stages
+
+# Formats libjpeg can shrink while decoding; others decode at full size first
+_REDUCIBLE_FORMATS = {"JPEG", "MPO"}
+
+_REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+# ---------------------------------------------------------------------
+# DATA MODEL
+# ---------------------------------------------------------------------
+
+
+@dataclass
+class LoadedImage:
+    """
+    A decoded image shared between stages. Arrays are read-only; stages that
+    need to draw on them must copy.
+    """
+
+    path: str
+    bgr: np.ndarray
+    orig_size: Tuple[int, int]  # (w, h) of the file on disk
+    scale: float  # decoded / original
+    _gray: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            g = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+            g.setflags(write=False)
+            self._gray = g
+        return self._gray
+
+
+# ---------------------------------------------------------------------
+# DECODING
+# ---------------------------------------------------------------------
+
+
+# EXIF orientations that turn the image by 90° (cv2.imread applies them)
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _header(path: Path) -> Optional[Tuple[Tuple[int, int], str]]:
+    """
+    ((w, h) as displayed, format). PIL reports the stored size; OpenCV
+    decodes with the EXIF rotation applied, so swap for 90° orientations.
+    """
+    try:
+        with Image.open(path) as img:
+            w, h = img.size
+            if img.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS:
+                w, h = h, w
+            return (w, h), img.format or ""
+    except Exception:
+        return None
+
+
+def image_size(path: Path) -> Optional[Tuple[int, int]]:
+    """
+    (w, h) from the file header without decoding pixels, EXIF rotation
+    applied (the orientation every decode here produces).
+    """
+    header = _header(path)
+    return header[0] if header else None
+
+
+def _reduction_factor(size: Tuple[int, int], max_side: int) -> int:
+    """
+    Largest DCT-domain reduction (1/2, 1/4, 1/8) that keeps at least half
+    of max_side; a free reduced decode beats a full decode + resize.
+    """
+    longest = max(size)
+    for f in (8, 4, 2):
+        if longest // f >= max_side // 2:
+            return f
+    return 1
+
+
+def decode_bytes(size: Tuple[int, int], fmt: str, factor: int) -> int:
+    """
+    Peak BGR buffer a decode will allocate. Only JPEG shrinks in the DCT
+    domain; other formats are decoded at full size before any resize.
+    """
+    w, h = size
+    if fmt not in _REDUCIBLE_FORMATS:
+        factor = 1
+    return (w // factor) * (h // factor) * 3
+
+
+def _decode(path: Path, max_side: Optional[int]) -> Optional[LoadedImage]:
+    header = _header(path)
+    size = header[0] if header else None
+    factor = _reduction_factor(size, max_side) if (size and max_side) else 1
+
+    if header and settings.max_decode_mb:
+        need = decode_bytes(size, header[1], factor)
+        if need > settings.max_decode_mb * 1_000_000:
+            log.warning(
+                f"⚠️ Skipping {path.name}: {size[0]}x{size[1]} {header[1]} needs "
+                f"{need / 1e6:.0f} MB to decode (MAX_DECODE_MB={settings.max_decode_mb})"
+            )
+            metrics.inc("decode_refused")
+            return None
+
+    flag = _REDUCED_FLAGS.get(factor, cv2.IMREAD_COLOR)
+    bgr = cv2.imread(str(path), flag)
+    if bgr is None:
+        return None
+
+    h, w = bgr.shape[:2]
+    orig = size or (w, h)
+    if (w > h) != (orig[0] > orig[1]) and w != h:
+        orig = (orig[1], orig[0])  # decoder rotated despite the header
+
+    # Cap what the DCT reduction left over
+    if max_side and max(w, h) > max_side:
+        r = max_side / max(w, h)
+        bgr = cv2.resize(
+            bgr, (round(w * r), round(h * r)), interpolation=cv2.INTER_AREA
+        )
+
+    # Per-axis ratios differ only by the decoders' rounding; average them
+    h, w = bgr.shape[:2]
+    scale = (w / orig[0] + h / orig[1]) / 2
+
+    bgr.setflags(write=False)
+    return LoadedImage(
+        path=str(path),
+        bgr=bgr,
+        orig_size=orig,
+        scale=scale,
+    )
+
+
+# ---------------------------------------------------------------------
+# SHARED CACHE
+# ---------------------------------------------------------------------
+
+_cache: "OrderedDict[tuple, LoadedImage]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def load_image(
+    path: Path | str, max_side: Optional[int] = SCREEN_MAX_SIDE
+) -> Optional[LoadedImage]:
+    """
+    Decode `path` (reduced to about max_side, None = full resolution),
+    reusing a buffer another stage already decoded in this process.
+    """
+    p = Path(path)
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+
+    key = (str(p.resolve()), st.st_mtime_ns, st.st_size, max_side)
+
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            metrics.inc("image_cache", result="hit")
+            return hit
+
+    metrics.inc("image_cache", result="miss")
+    with metrics.span("decode"):
+        img = _decode(p, max_side)
+    if img is None:
+        return None
+
+    with _cache_lock:
+        _cache[key] = img
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return img
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
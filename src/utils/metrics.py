@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple, TypeVar
+
+from .filesystem import write_json
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+PREFIX = "ageflow_"
+
+# Seconds; covers cache hits through slow multi-MB downloads
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# ---------------------------------------------------------------------
+# DATA MODEL
+# ---------------------------------------------------------------------
+
+
+@dataclass
+class Histogram:
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        for i, b in enumerate(self.buckets):
+            if value <= b:
+                self.counts[i] += 1
+                break
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "min": round(self.min, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "buckets": {str(b): c for b, c in zip(self.buckets, self.counts)},
+        }
+
+
+# ---------------------------------------------------------------------
+# REGISTRY
+# ---------------------------------------------------------------------
+
+
+class Metrics:
+    """
+    Process-wide counters, histograms and timed spans.
+
+    Names are bare (e.g. "download_bytes"); labels distinguish sources,
+    hosts and outcomes. Timed spans land in "<name>_seconds" histograms.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.started_at = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    # -----------------------------------------------------------------
+    # RECORDING
+    # -----------------------------------------------------------------
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = Histogram()
+            h.observe(value)
+
+    @contextmanager
+    def span(self, name: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block. The yielded dict can add or override labels (e.g. an
+        outcome) before the span closes; exceptions are labelled error=1.
+        """
+        extra: Dict[str, Any] = {}
+        t0 = time.perf_counter()
+        try:
+            yield extra
+        except BaseException:
+            extra.setdefault("error", 1)
+            raise
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - t0, **{**labels, **extra})
+
+    def timed(self, name: str, **labels: Any) -> Callable[[F], F]:
+        """
+        Decorator form of span().
+        """
+
+        def deco(fn: F) -> F:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name, **labels):
+                    return fn(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return deco
+
+    # -----------------------------------------------------------------
+    # EXPORT
+    # -----------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        def fmt(key: LabelKey) -> str:
+            return ",".join(f"{k}={v}" for k, v in key) or "_"
+
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "wall_seconds": round(time.time() - self.started_at, 3),
+                "counters": {
+                    n: {fmt(k): v for k, v in s.items()}
+                    for n, s in sorted(self._counters.items())
+                },
+                "histograms": {
+                    n: {fmt(k): h.to_dict() for k, h in s.items()}
+                    for n, s in sorted(self._histograms.items())
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        def labels(key: LabelKey, extra: str = "") -> str:
+            parts = [f'{k}="{v}"' for k, v in key]
+            if extra:
+                parts.append(extra)
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{PREFIX}{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, v in series.items():
+                    lines.append(f"{metric}{labels(key)} {v}")
+
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{PREFIX}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, h in series.items():
+                    cum = 0
+                    for b, c in zip(h.buckets, h.counts):
+                        cum += c
+                        le = labels(key, 'le="%s"' % b)
+                        lines.append(f"{metric}_bucket{le} {cum}")
+                    le = labels(key, 'le="+Inf"')
+                    lines.append(f"{metric}_bucket{le} {h.count}")
+                    lines.append(f"{metric}_sum{labels(key)} {h.total}")
+                    lines.append(f"{metric}_count{labels(key)} {h.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, out_dir: Path, name: str) -> Path:
+        """
+        Write <name>.json and <name>.prom (node_exporter textfile format).
+        """
+        out_dir.mkdir(parents=True, exist_ok=True)
+        json_path = out_dir / f"{name}.json"
+        write_json(json_path, self.snapshot())
+        (out_dir / f"{name}.prom").write_text(self.to_prometheus(), encoding="utf-8")
+        return json_path
+
+    def summary(self, top: int = 8) -> str:
+        """
+        Spans with the most total time, for the end-of-run log line.
+        """
+        snap = self.snapshot()["histograms"]
+        rows = [
+            (h["sum"], f"{n}{{{k}}}", h["count"])
+            for n, s in snap.items()
+            for k, h in s.items()
+            if n.endswith("_seconds")
+        ]
+        rows.sort(reverse=True)
+        return " | ".join(f"{name} {t:.2f}s/{c}" for t, name, c in rows[:top])
+
+
+metrics = Metrics()
+
+
+def metrics_dir(slug: str) -> Path:
+    return Path("output/metrics") / slug
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .filesystem import write_json
+from .logger import get_logger
+
+
+log = get_logger("profiling")
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+PROFILES_DIR = Path("output/profiles")
+MODES = ("cprofile", "sampling")
+
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 10  # deeper stacks cost more memory/time while tracing
+
+
+def profile_dir(slug: str, step: str) -> Path:
+    return PROFILES_DIR / (slug or "_unknown") / step
+
+
+# ---------------------------------------------------------------------
+# SESSION
+# ---------------------------------------------------------------------
+
+
+@dataclass
+class ProfileSession:
+    """
+    Handle yielded by profiled(). The step sets `slug` once it knows which
+    celebrity it worked on; reports land in output/profiles/<slug>/<step>.
+    """
+
+    step: str
+    mode: str
+    slug: str = ""
+    out_dir: Optional[Path] = None
+    summary: Dict[str, Any] = field(default_factory=dict)
+
+
+def _hot_functions(stats: pstats.Stats, top: int) -> List[Dict[str, Any]]:
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append(
+            {
+                "function": f"{Path(filename).name}:{line}({func})",
+                "calls": nc,
+                "self_s": round(tt, 4),
+                "cumulative_s": round(ct, 4),
+            }
+        )
+    rows.sort(key=lambda r: r["self_s"], reverse=True)
+    return rows[:top]
+
+
+def _write_cprofile(prof: cProfile.Profile, out_dir: Path) -> List[Dict[str, Any]]:
+    prof.dump_stats(str(out_dir / "profile.pstats"))
+
+    buf = io.StringIO()
+    stats = pstats.Stats(prof, stream=buf)
+    stats.sort_stats("cumulative").print_stats(60)
+    stats.sort_stats("tottime").print_stats(60)
+    (out_dir / "hotspots.txt").write_text(buf.getvalue(), encoding="utf-8")
+
+    return _hot_functions(stats, TOP_FUNCTIONS)
+
+
+def _write_sampling(sampler: Any, out_dir: Path) -> List[Dict[str, Any]]:
+    (out_dir / "profile.html").write_text(sampler.output_html(), encoding="utf-8")
+    text = sampler.output_text(unicode=True, color=False)
+    (out_dir / "hotspots.txt").write_text(text, encoding="utf-8")
+    return [{"function": line.rstrip()} for line in text.splitlines()[:TOP_FUNCTIONS]]
+
+
+def _write_memory(snapshot: tracemalloc.Snapshot, peak: int, out_dir: Path) -> List[Dict[str, Any]]:
+    top = snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+    lines = [f"peak traced: {peak / 1e6:.1f} MB", ""]
+    lines += [str(s) for s in top]
+    (out_dir / "memory.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    return [
+        {"where": str(s.traceback[0]), "mb": round(s.size / 1e6, 2), "blocks": s.count}
+        for s in top[:5]
+    ]
+
+
+def _start_sampler() -> Any:
+    """
+    pyinstrument is optional; fall back to cProfile when it's missing.
+    """
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        log.warning("⚠️ pyinstrument not installed; using cProfile instead")
+        return None
+    sampler = Profiler()
+    sampler.start()
+    return sampler
+
+
+# ---------------------------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------------------------
+
+
+@contextmanager
+def profiled(step: str, mode: Optional[str] = None) -> Iterator[Optional[ProfileSession]]:
+    """
+    Profile the enclosed block (mode None = disabled, yields None).
+
+    cProfile records every call (exact counts, higher overhead); "sampling"
+    uses pyinstrument when installed. tracemalloc runs in both modes and
+    reports peak traced memory plus the top allocation sites.
+    """
+    if not mode:
+        yield None
+        return
+
+    session = ProfileSession(step=step, mode=mode)
+
+    sampler = _start_sampler() if mode == "sampling" else None
+    prof: Optional[cProfile.Profile] = None
+    if sampler is None:
+        session.mode = "cprofile"
+        prof = cProfile.Profile()
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+
+    t0 = time.perf_counter()
+    if prof is not None:
+        prof.enable()
+    try:
+        yield session
+    finally:
+        if prof is not None:
+            prof.disable()
+        if sampler is not None:
+            sampler.stop()
+        wall = time.perf_counter() - t0
+
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if not was_tracing:
+            tracemalloc.stop()
+
+        out_dir = profile_dir(session.slug, step)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        session.out_dir = out_dir
+
+        hot = (
+            _write_cprofile(prof, out_dir)
+            if prof is not None
+            else _write_sampling(sampler, out_dir)
+        )
+        session.summary = {
+            "step": step,
+            "mode": session.mode,
+            "wall_seconds": round(wall, 3),
+            "peak_traced_mb": round(peak / 1e6, 2),
+            "hot_functions": hot,
+            "top_allocations": _write_memory(snapshot, peak, out_dir),
+        }
+        write_json(out_dir / "summary.json", session.summary)
+
+        log.info(format_summary(session.summary))
+        log.info(f"🔬 Profile → {out_dir}")
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """
+    Multi-line hot-function table for the end-of-step log.
+    """
+    lines = [
+        f"🔬 {summary['step']} ({summary['mode']}): "
+        f"{summary['wall_seconds']:.2f}s wall, "
+        f"peak {summary['peak_traced_mb']:.1f} MB traced"
+    ]
+    for row in summary["hot_functions"]:
+        if "self_s" in row:
+            lines.append(
+                f"   {row['self_s']:>8.3f}s self {row['cumulative_s']:>8.3f}s cum "
+                f"{row['calls']:>8} calls  {row['function']}"
+            )
+        else:
+            lines.append(f"   {row['function']}")
+    return "\n".join(lines)
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from ..config.settings import settings
+from .filesystem import read_json, write_json
+from .logger import get_logger
+from .metrics import metrics
+
+try:  # cross-process locking (POSIX only; threads-only elsewhere)
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+log = get_logger("ratelimit")
+
+
+# ---------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------
+
+# host -> (requests per second, burst)
+HOST_LIMITS: Dict[str, Tuple[float, float]] = {
+    "commons.wikimedia.org": (5.0, 10.0),
+    "upload.wikimedia.org": (4.0, 8.0),
+    "en.wikipedia.org": (5.0, 10.0),
+    "www.wikidata.org": (5.0, 10.0),
+    "www.bing.com": (1.0, 3.0),
+    "www.imdb.com": (0.5, 2.0),
+    "serpapi.com": (1.0, 2.0),
+}
+DEFAULT_LIMIT: Tuple[float, float] = (2.0, 4.0)
+
+THROTTLE_STATUSES = (429, 503)
+MIN_PENALTY = 1.0 / 16  # slowest adaptive rate = limit / 16
+PENALTY_RECOVERY = 1.1  # per successful request
+DEFAULT_BACKOFF = 5.0  # seconds, when a throttle carries no Retry-After
+MAX_BACKOFF = 300.0
+
+
+# ---------------------------------------------------------------------
+# HELPERS
+# ---------------------------------------------------------------------
+
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After is either delta-seconds or an HTTP-date.
+    """
+    if not value:
+        return None
+    v = value.strip()
+    if v.isdigit():
+        return float(v)
+    try:
+        return max(0.0, parsedate_to_datetime(v).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class _HostState:
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+    penalty: float = 1.0  # multiplier on the configured rate
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "tokens": self.tokens,
+            "updated": self.updated,
+            "blocked_until": self.blocked_until,
+            "penalty": self.penalty,
+        }
+
+
+# ---------------------------------------------------------------------
+# LIMITER
+# ---------------------------------------------------------------------
+
+
+class HostRateLimiter:
+    """
+    Per-host token buckets shared by every thread in the process and, via a
+    flock-guarded JSON state file, by every worker process on the machine.
+
+    Throttle responses (429/503) block the host until Retry-After (or an
+    exponential backoff) and halve its rate; successes slowly restore it.
+    """
+
+    def __init__(self, state_file: Optional[Path] = None, shared: bool = True):
+        self.state_file = state_file or settings.cache_dir / "rate_limits.json"
+        self.shared = shared and fcntl is not None
+        self._lock = threading.Lock()
+        self._local: Dict[str, _HostState] = {}
+
+    # -----------------------------------------------------------------
+    # STATE
+    # -----------------------------------------------------------------
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, _HostState]]:
+        with self._lock:
+            if not self.shared:
+                yield self._local
+                return
+
+            lock_path = self.state_file.with_suffix(".lock")
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(lock_path, "a+") as lf:
+                fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    raw = read_json(self.state_file, default={}) or {}
+                    states = {
+                        h: _HostState(**v) for h, v in raw.items() if isinstance(v, dict)
+                    }
+                    yield states
+                    write_json(
+                        self.state_file, {h: s.to_dict() for h, s in states.items()}
+                    )
+                finally:
+                    fcntl.flock(lf, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _limits(host: str) -> Tuple[float, float]:
+        if host in HOST_LIMITS:
+            return HOST_LIMITS[host]
+        for known, lim in HOST_LIMITS.items():
+            if host.endswith("." + known):
+                return lim
+        return DEFAULT_LIMIT
+
+    # -----------------------------------------------------------------
+    # PUBLIC API
+    # -----------------------------------------------------------------
+
+    def acquire(self, url: str) -> float:
+        """
+        Block until a token for the URL's host is available.
+        Returns the total time waited (seconds).
+        """
+        host = host_of(url)
+        rate, burst = self._limits(host)
+        waited = 0.0
+
+        while True:
+            with self._state() as states:
+                now = time.time()
+                st = states.get(host) or _HostState(tokens=burst, updated=now)
+                eff_rate = rate * st.penalty
+
+                st.tokens = min(burst, st.tokens + (now - st.updated) * eff_rate)
+                st.updated = now
+
+                if now < st.blocked_until:
+                    wait = st.blocked_until - now
+                elif st.tokens >= 1.0:
+                    st.tokens -= 1.0
+                    wait = 0.0
+                else:
+                    wait = (1.0 - st.tokens) / eff_rate
+
+                states[host] = st
+
+            if wait <= 0:
+                if waited:
+                    metrics.observe("ratelimit_wait_seconds", waited, host=host)
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def feedback(
+        self, url: str, status_code: int, retry_after: Optional[str] = None
+    ) -> None:
+        """
+        Adapt the host's pacing to the response it just gave.
+        """
+        host = host_of(url)
+        with self._state() as states:
+            now = time.time()
+            rate, burst = self._limits(host)
+            st = states.get(host) or _HostState(tokens=burst, updated=now)
+
+            if status_code in THROTTLE_STATUSES:
+                st.penalty = max(MIN_PENALTY, st.penalty / 2)
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = min(MAX_BACKOFF, DEFAULT_BACKOFF / st.penalty)
+                st.blocked_until = max(st.blocked_until, now + delay)
+                st.tokens = 0.0
+                metrics.inc("ratelimit_throttled", host=host, status=status_code)
+                log.warning(
+                    f"⏳ {host} throttled ({status_code}); "
+                    f"pausing {delay:.1f}s, rate x{st.penalty:.3f}"
+                )
+            elif status_code < 400:
+                st.penalty = min(1.0, st.penalty * PENALTY_RECOVERY)
+
+            states[host] = st
+
+
+_limiter: Optional[HostRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = HostRateLimiter(shared=settings.rate_limit_shared)
+        return _limiter
+
+
+def rate_limited_request(
+    method: str,
+    url: str,
+    session: Optional[requests.Session] = None,
+    throttle_retries: int = 2,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    requests.request with per-host pacing. Throttled responses are retried
+    (after the host's backoff) up to `throttle_retries` times; the last
+    response is returned as-is for the caller to handle.
+    """
+    limiter = get_rate_limiter()
+    send = session.request if session is not None else requests.request
+
+    attempt = 0
+    while True:
+        limiter.acquire(url)
+        r = send(method, url, **kwargs)
+        limiter.feedback(url, r.status_code, r.headers.get("Retry-After"))
+
+        if r.status_code not in THROTTLE_STATUSES or attempt >= throttle_retries:
+            return r
+
+        r.close()
+        attempt += 1
+
+
+def rate_limited_get(
+    url: str,
+    session: Optional[requests.Session] = None,
+    throttle_retries: int = 2,
+    **kwargs: Any,
+) -> requests.Response:
+    return rate_limited_request(
+        "GET", url, session=session, throttle_retries=throttle_retries, **kwargs
+    )
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import sys
+from typing import Optional
+
+from ..config.settings import settings
+from .logger import get_logger
+
+
+log = get_logger("resources")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+def cap_worker_memory(limit_mb: Optional[int] = None) -> bool:
+    """
+    Cap this process's address space (WORKER_MEMORY_MB, 0 = off) so one
+    oversized image fails with MemoryError instead of taking the host down.
+    Returns True when a cap is in effect.
+    """
+    mb = settings.worker_memory_mb if limit_mb is None else limit_mb
+    if not mb:
+        return False
+    if resource is None:
+        log.warning("⚠️ WORKER_MEMORY_MB is not supported on this platform")
+        return False
+
+    limit = mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+    log.info(f"🧱 Worker memory capped at {limit // (1024 * 1024)} MB")
+    return True
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far.
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1024